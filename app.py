@@ -1,11 +1,26 @@
-from flask import Flask, jsonify, request
+from flask import Flask, g, jsonify, request
 from flask_cors import CORS
 from flasgger import Swagger
-from database import SessionLocal
 from services.user_service import UserService
 from services.recipe_service import RecipeService
 from services.comment_service import CommentService
-from utils.jwt_utils import generate_token, token_required
+from services.health_service import HealthService
+from services.export_service import ExportService
+from utils.jwt_utils import generate_token, token_required, token_cache
+from database import engine, read_engine
+from utils.pool import pool_status
+from utils.db_errors import UserNotFoundError
+from utils.passwords import PasswordHasherBusy, password_hasher
+from utils.db_session import get_db, db_timings, init_app as init_db_session
+from utils.conditional import conditional_response
+from utils.cache import cached_response, response_cache, recipe_scope, recipe_comments_scope, RECIPES_SCOPE
+from utils.streaming import stream_format, stream_collection
+from utils.bulk import parse_bulk_body
+from utils.multi_get import wants_ids, parse_ids, ids_envelope
+from utils.recipe_filters import wants_filters, parse_recipe_filters
+from utils.ingredients import parse_ingredient_query, parse_pantry_query
+from utils.export import EXPORT_FORMATS, parse_since, stream_export
+from utils.pagination import wants_page, parse_cursor, parse_id_cursor, parse_limit, page_envelope, MAX_PAGE_SIZE
 from sqlalchemy.exc import ProgrammingError
 from swagger_config import swagger_config, swagger_template
 
@@ -22,6 +37,9 @@ CORS(app, resources={
 # Initialize Swagger UI
 swagger = Swagger(app, config=swagger_config, template=swagger_template)
 
+# One lazily created session per request, closed in teardown
+init_db_session(app)
+
 @app.route('/')
 def home():
     """
@@ -47,24 +65,125 @@ def home():
 @app.route('/health')
 def health():
     """
-    Health check endpoint
+    Liveness check: the process is up. Does not touch the database, so a
+    database outage never gets healthy workers restarted.
     ---
     tags:
       - Health
     responses:
       200:
-        description: System health status
+        description: Process is alive
         schema:
           type: object
           properties:
             status:
               type: string
               example: OK
-            database:
-              type: string
-              example: connected
+            uptime_seconds:
+              type: number
+              example: 3600.5
+    """
+    return jsonify(HealthService.liveness())
+
+@app.route('/ready')
+def ready():
+    """
+    Readiness check: whether this worker should receive traffic
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Ready. Reports database probe latency, pool saturation, in-flight requests and cache warmness
+      503:
+        description: Not ready (overloaded, pool saturated, or database slow or unreachable); reasons lists why
+    """
+    is_ready, report = HealthService.readiness()
+    return jsonify(report), (200 if is_ready else 503)
+
+@app.before_request
+def count_request_started():
+    HealthService.request_started()
+    g.counted_in_flight = True
+
+@app.teardown_request
+def count_request_finished(exception=None):
+    # Teardown also runs for contexts whose before_request hooks never did
+    if g.pop('counted_in_flight', False):
+        HealthService.request_finished()
+
+@app.route('/metrics/cache')
+def cache_metrics():
+    """
+    Response cache counters
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Backend name, size and hit/miss/eviction counters
+    """
+    return jsonify(response_cache.stats())
+
+@app.route('/metrics/db')
+def db_metrics():
+    """
+    Per-route database connection usage
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: For each route, checkout wait and connection hold times (count, avg, max, histogram in ms)
+    """
+    return jsonify(db_timings.snapshot())
+
+@app.route('/metrics/auth')
+def auth_metrics():
+    """
+    Verified-token cache counters
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Size, hit/miss/eviction/expiry counters and a jwt.decode latency histogram
+    """
+    return jsonify(token_cache.stats())
+
+@app.route('/metrics/passwords')
+def password_metrics():
+    """
+    Password hashing pool state
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: Workers, queue limit, in-flight and rejected operations, scrypt cost, KDF and queue-wait histograms
+    """
+    return jsonify(password_hasher.stats())
+
+@app.route('/metrics/pool')
+def pool_metrics():
+    """
+    Live connection pool state
+    ---
+    tags:
+      - Health
+    responses:
+      200:
+        description: For the write and read pools, size, checked in/out, overflow, waiting threads, timeouts, pings and a checkout latency histogram
     """
-    return jsonify({"status": "OK", "database": "connected"})
+    return jsonify({"write": pool_status(engine), "read": pool_status(read_engine)})
+
+def invalidate_comment_caches(recipe_id, rating_changed):
+    """Drop cached responses a comment write makes stale"""
+    scopes = [recipe_comments_scope(recipe_id)]
+    if rating_changed:
+        # Rating aggregates are part of the recipe detail and list payloads
+        scopes += [recipe_scope(recipe_id), RECIPES_SCOPE]
+    response_cache.invalidate(*scopes)
 
 @app.route('/protected')
 @token_required
@@ -109,6 +228,28 @@ def get_users():
     ---
     tags:
       - Users
+    parameters:
+      - name: ids
+        in: query
+        type: string
+        required: false
+        description: Comma-separated ids to fetch in one query (at most MULTI_GET_MAX_IDS). Returns {"items", "missing"} with items in the requested order
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from a previous page's next_cursor
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (capped by PAGE_SIZE_MAX). Sending cursor or limit returns {"items", "next_cursor"}
+      - name: stream
+        in: query
+        type: string
+        enum: [json, ndjson]
+        required: false
+        description: Stream every row as a JSON array or NDJSON instead of building the response in memory
     responses:
       200:
         description: List of all users
@@ -121,10 +262,22 @@ def get_users():
         schema:
           $ref: '#/definitions/Error'
     """
-    db = SessionLocal()
+    db = get_db()
     try:
+        if wants_ids(request.args):
+            users, missing = UserService.get_users_by_ids(db, parse_ids(request.args))
+            return jsonify(ids_envelope([user.model_dump() for user in users], missing))
+        fmt = stream_format(request)
+        if fmt:
+            return stream_collection(UserService.iter_users, fmt)
+        if wants_page(request.args):
+            after_id, limit = parse_id_cursor(request.args)
+            users, next_cursor = UserService.get_users_page(db, after_id, limit)
+            return jsonify(page_envelope([user.model_dump() for user in users], next_cursor))
         users = UserService.get_all_users(db)
         return jsonify([user.model_dump() for user in users])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except ProgrammingError as e:
         return jsonify({
             "error": "Las tablas no existen en la base de datos",
@@ -133,8 +286,6 @@ def get_users():
         }), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/users', methods=['POST'])
 def create_user():
@@ -159,17 +310,17 @@ def create_user():
         schema:
           $ref: '#/definitions/Error'
     """
-    db = SessionLocal()
+    db = get_db()
     try:
         user_data = request.json
         from schemas.user_schemas import UserCreate
         user_create = UserCreate(**user_data)
         user = UserService.create_user(db, user_create)
         return jsonify(user.model_dump()), 201
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        db.close()
 
 @app.route('/users/login', methods=['POST'])
 def login():
@@ -193,12 +344,16 @@ def login():
         description: Invalid credentials
         schema:
           $ref: '#/definitions/Error'
+      503:
+        description: Password hashing pool saturated; retry after the Retry-After delay
+        schema:
+          $ref: '#/definitions/Error'
       400:
         description: Missing required fields
         schema:
           $ref: '#/definitions/Error'
     """
-    db = SessionLocal()
+    db = get_db()
     try:
         login_data = request.json
         
@@ -223,10 +378,10 @@ def login():
             "user_id": user.id,
             "username": user.name
         }), 200
+    except PasswordHasherBusy as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/recipes', methods=['POST'])
 @token_required
@@ -262,16 +417,8 @@ def create_recipe(current_user):
         schema:
           $ref: '#/definitions/Error'
     """
-    db = SessionLocal()
+    db = get_db()
     try:
-        # Verify user still exists in database
-        user = UserService.get_user_by_id(db, current_user['user_id'])
-        if not user:
-            return jsonify({
-                "error": "User not found. Your account may have been deleted.",
-                "solution": "Please log in again or contact support."
-            }), 404
-        
         recipe_data = request.json
         from schemas.recipe_schemas import RecipeCreate
         
@@ -280,26 +427,143 @@ def create_recipe(current_user):
         
         recipe_create = RecipeCreate(**recipe_data)
         recipe = RecipeService.create_recipe(db, recipe_create)
+        response_cache.invalidate(RECIPES_SCOPE)
         return jsonify(recipe.model_dump()), 201
+    except UserNotFoundError:
+        # The token's user was deleted; the INSERT's foreign key caught it
+        return jsonify({
+            "error": "User not found. Your account may have been deleted.",
+            "solution": "Please log in again or contact support."
+        }), 404
     except Exception as e:
-        error_msg = str(e)
-        # Handle foreign key constraint errors
-        if "foreign key constraint fails" in error_msg.lower():
-            return jsonify({
-                "error": "Invalid user account. Please log in again.",
-                "details": "Your user account may not exist in the database."
-            }), 400
-        return jsonify({"error": error_msg}), 400
-    finally:
-        db.close()
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/recipes/bulk', methods=['POST'])
+@token_required
+def bulk_create_recipes(current_user):
+    """
+    Import many recipes in one request (authentication required)
+    ---
+    tags:
+      - Recipes
+    security:
+      - Bearer: []
+    consumes:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: body
+        in: body
+        required: true
+        description: A JSON array of recipes, or one recipe per line with Content-Type application/x-ndjson. Every recipe is owned by the caller.
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/RecipeCreate'
+    responses:
+      201:
+        description: Every row was created
+        schema:
+          $ref: '#/definitions/RecipeBulkResult'
+      207:
+        description: Some or all rows failed; see each row's result
+        schema:
+          $ref: '#/definitions/RecipeBulkResult'
+      400:
+        description: Body is not an array or NDJSON, or has too many rows
+        schema:
+          $ref: '#/definitions/Error'
+      401:
+        description: Unauthorized - missing or invalid token
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: User not found
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    try:
+        rows = parse_bulk_body(request)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    db = get_db()
+    try:
+        result = RecipeService.bulk_create_recipes(db, rows, current_user['user_id'])
+    except UserNotFoundError:
+        return jsonify({
+            "error": "User not found. Your account may have been deleted.",
+            "solution": "Please log in again or contact support."
+        }), 404
+    if result.created:
+        response_cache.invalidate(RECIPES_SCOPE)
+    return jsonify(result.model_dump()), 201 if result.failed == 0 else 207
 
 @app.route('/recipes', methods=['GET'])
+@conditional_response(RecipeService.get_recipes_version, use_last_modified=False)
+@cached_response(lambda: RECIPES_SCOPE)
 def get_recipes():
     """
     Get all recipes
     ---
     tags:
       - Recipes
+    parameters:
+      - name: ids
+        in: query
+        type: string
+        required: false
+        description: Comma-separated ids to fetch in one query (at most MULTI_GET_MAX_IDS). Returns {"items", "missing"} with items in the requested order
+      - name: dish_type
+        in: query
+        type: string
+        required: false
+        description: Only recipes of this dish type (exact match). Any filter returns {"items", "next_cursor"}
+      - name: origin
+        in: query
+        type: string
+        required: false
+        description: Only recipes of this origin (exact match)
+      - name: author
+        in: query
+        type: integer
+        required: false
+        description: Only recipes by this user id
+      - name: min_servings
+        in: query
+        type: integer
+        required: false
+        description: At least this many servings
+      - name: max_servings
+        in: query
+        type: integer
+        required: false
+        description: At most this many servings
+      - name: max_minutes
+        in: query
+        type: integer
+        required: false
+        description: Preparation time of at most this many minutes; recipes whose preparation_time could not be read are excluded
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from a previous page's next_cursor
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (capped by PAGE_SIZE_MAX). Sending cursor or limit returns {"items", "next_cursor"}
+      - name: stream
+        in: query
+        type: string
+        enum: [json, ndjson]
+        required: false
+        description: Stream every row as a JSON array or NDJSON instead of building the response in memory
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previous response
     responses:
       200:
         description: List of all recipes
@@ -307,21 +571,174 @@ def get_recipes():
           type: array
           items:
             $ref: '#/definitions/Recipe'
+      304:
+        description: Not modified since the ETag given in If-None-Match
       500:
         description: Server error
         schema:
           $ref: '#/definitions/Error'
     """
-    db = SessionLocal()
+    db = get_db()
     try:
+        if wants_ids(request.args):
+            recipes, missing = RecipeService.get_recipes_by_ids(db, parse_ids(request.args))
+            return jsonify(ids_envelope([recipe.model_dump() for recipe in recipes], missing))
+        if wants_filters(request.args):
+            filters = parse_recipe_filters(request.args)
+            after_id, limit = parse_id_cursor(request.args)
+            recipes, next_cursor = RecipeService.filter_recipes_page(db, filters, after_id, limit)
+            return jsonify(page_envelope([recipe.model_dump() for recipe in recipes], next_cursor))
+        fmt = stream_format(request)
+        if fmt:
+            return stream_collection(RecipeService.iter_recipes, fmt)
+        if wants_page(request.args):
+            after_id, limit = parse_id_cursor(request.args)
+            recipes, next_cursor = RecipeService.get_recipes_page(db, after_id, limit)
+            return jsonify(page_envelope([recipe.model_dump() for recipe in recipes], next_cursor))
         recipes = RecipeService.get_all_recipes(db)
         return jsonify([recipe.model_dump() for recipe in recipes])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/recipes/facets', methods=['GET'])
+@conditional_response(RecipeService.get_recipes_version, use_last_modified=False)
+@cached_response(lambda: RECIPES_SCOPE)
+def get_recipe_facets():
+    """
+    Recipe counts per dish type and origin, for filter menus
+    ---
+    tags:
+      - Recipes
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: false
+        description: Count only recipes matching this full-text search
+      - name: dish_type
+        in: query
+        type: string
+        required: false
+        description: Any GET /recipes filter (dish_type, origin, author, min_servings, max_servings, max_minutes) narrows the counts to matching recipes
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previous response
+    responses:
+      200:
+        description: Counts per facet value
+        schema:
+          $ref: '#/definitions/RecipeFacets'
+      304:
+        description: Not modified since the ETag given in If-None-Match
+      400:
+        description: Invalid filter
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    db = get_db()
+    try:
+        filters = parse_recipe_filters(request.args)
+        facets = RecipeService.get_facets(db, filters, request.args.get('q', '').strip())
+        return jsonify(facets.model_dump())
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/recipes/by-ingredients', methods=['GET'])
+@cached_response(lambda: RECIPES_SCOPE)
+def find_recipes_by_ingredients():
+    """
+    Recipes containing all or any of a set of ingredients
+    ---
+    tags:
+      - Search
+    parameters:
+      - name: ingredients
+        in: query
+        type: string
+        required: true
+        description: Comma-separated ingredient names, e.g. chickpeas,tomato. Quantities and plurals are ignored.
+      - name: match
+        in: query
+        type: string
+        enum: [all, any]
+        required: false
+        description: all (default) returns recipes using every ingredient; any returns recipes using at least one
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of results (capped by PAGE_SIZE_MAX)
+    responses:
+      200:
+        description: Recipes ranked by the number of requested ingredients they use, each with matched_count and matched_ingredients
+      400:
+        description: No ingredients, too many, or an invalid match or limit
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    db = get_db()
+    try:
+        names, match_all = parse_ingredient_query(request.args)
+        limit = parse_limit(request.args)
+        recipes = RecipeService.find_by_ingredients(db, names, match_all, limit)
+        return jsonify([recipe.model_dump() for recipe in recipes])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/recipes/pantry', methods=['GET'])
+@cached_response(lambda: RECIPES_SCOPE)
+def find_recipes_for_pantry():
+    """
+    What can I cook: recipes makeable from a pantry with at most a few missing ingredients
+    ---
+    tags:
+      - Search
+    parameters:
+      - name: ingredients
+        in: query
+        type: string
+        required: true
+        description: Comma-separated pantry ingredients, e.g. eggs,flour,milk. Quantities and plurals are ignored.
+      - name: max_missing
+        in: query
+        type: integer
+        required: false
+        description: Most ingredients a recipe may need beyond the pantry (default 2, capped by PANTRY_MAX_MISSING)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of results (capped by PAGE_SIZE_MAX)
+    responses:
+      200:
+        description: Recipes using at least one pantry ingredient, fewest missing ingredients first, then most pantry ingredients used; each with matched and missing ingredients
+      400:
+        description: No ingredients, too many, or an invalid max_missing or limit
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    db = get_db()
+    try:
+        names, max_missing = parse_pantry_query(request.args)
+        limit = parse_limit(request.args)
+        recipes = RecipeService.find_by_pantry(db, names, max_missing, limit)
+        return jsonify([recipe.model_dump() for recipe in recipes])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/recipes/<int:recipe_id>', methods=['GET'])
+@conditional_response(RecipeService.get_recipe_version)
+@cached_response(lambda recipe_id: recipe_scope(recipe_id))
 def get_recipe(recipe_id):
     """
     Get a specific recipe by ID
@@ -335,11 +752,23 @@ def get_recipe(recipe_id):
         required: true
         description: The recipe ID
         example: 1
+      - name: If-None-Match
+        in: header
+        type: string
+        required: false
+        description: ETag of a previous response
+      - name: If-Modified-Since
+        in: header
+        type: string
+        required: false
+        description: Last-Modified of a previous response
     responses:
       200:
         description: Recipe details
         schema:
           $ref: '#/definitions/Recipe'
+      304:
+        description: Not modified since the given ETag or date
       404:
         description: Recipe not found
         schema:
@@ -349,7 +778,7 @@ def get_recipe(recipe_id):
         schema:
           $ref: '#/definitions/Error'
     """
-    db = SessionLocal()
+    db = get_db()
     try:
         recipe = RecipeService.get_recipe_by_id(db, recipe_id)
         if recipe:
@@ -357,14 +786,52 @@ def get_recipe(recipe_id):
         return jsonify({"error": "Recipe not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
+
+@app.route('/recipes/<int:recipe_id>/full', methods=['GET'])
+@conditional_response(RecipeService.get_recipe_full_version)
+@cached_response(lambda recipe_id: recipe_scope(recipe_id))
+def get_recipe_full(recipe_id):
+    """
+    Get everything the recipe page shows in one request
+    ---
+    tags:
+      - Recipes
+    parameters:
+      - name: recipe_id
+        in: path
+        type: integer
+        required: true
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Comments to include (capped by PAGE_SIZE_MAX)
+    responses:
+      200:
+        description: The recipe with author, rating aggregates, comment count and the first page of comments with author names. comments_next_cursor continues at /recipes/{recipe_id}/comments?cursor=
+      304:
+        description: Not modified since the ETag given in If-None-Match
+      404:
+        description: Recipe not found
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    db = get_db()
+    try:
+        recipe = RecipeService.get_recipe_with_comments(db, recipe_id, parse_limit(request.args))
+        if recipe:
+            return jsonify(recipe.model_dump())
+        return jsonify({"error": "Recipe not found"}), 404
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 @app.route('/recipes/<int:recipe_id>', methods=['PUT'])
 @token_required
 def update_recipe(current_user, recipe_id):
     """Update a recipe - only the owner can update"""
-    db = SessionLocal()
+    db = get_db()
     try:
         # Check if recipe exists
         recipe = RecipeService.get_recipe_by_id(db, recipe_id)
@@ -382,18 +849,17 @@ def update_recipe(current_user, recipe_id):
         updated_recipe = RecipeService.update_recipe(db, recipe_id, recipe_update)
         
         if updated_recipe:
+            response_cache.invalidate(recipe_scope(recipe_id), RECIPES_SCOPE)
             return jsonify(updated_recipe.model_dump())
         return jsonify({"error": "Failed to update recipe"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        db.close()
 
 @app.route('/recipes/<int:recipe_id>', methods=['DELETE'])
 @token_required
 def delete_recipe(current_user, recipe_id):
     """Delete a recipe - only the owner can delete"""
-    db = SessionLocal()
+    db = get_db()
     try:
         # Check if recipe exists
         recipe = RecipeService.get_recipe_by_id(db, recipe_id)
@@ -407,66 +873,109 @@ def delete_recipe(current_user, recipe_id):
         # Delete the recipe
         success = RecipeService.delete_recipe(db, recipe_id)
         if success:
+            response_cache.invalidate(recipe_scope(recipe_id), recipe_comments_scope(recipe_id), RECIPES_SCOPE)
             return '', 204
         return jsonify({"error": "Failed to delete recipe"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/users/recipes', methods=['GET'])
 @token_required
 def get_current_user_recipes(current_user):
     """Get all recipes for the authenticated user"""
-    db = SessionLocal()
+    db = get_db()
     try:
         recipes = RecipeService.get_recipes_by_user(db, current_user['user_id'])
         return jsonify([recipe.model_dump() for recipe in recipes])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/users/recipes/search', methods=['GET'])
 @token_required
 def search_current_user_recipes(current_user):
-    """Search within the authenticated user's recipes"""
-    db = SessionLocal()
+    """
+    Search within the authenticated user's recipes by title
+    ---
+    tags:
+      - User Recipes
+    security:
+      - Bearer: []
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+      - name: cursor
+        in: query
+        type: string
+        required: false
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Sending cursor or limit returns {"items", "next_cursor"} ordered by title
+    responses:
+      200:
+        description: Matching recipes owned by the caller
+    """
+    db = get_db()
     try:
         search_query = request.args.get('q', '').strip()
         
         if not search_query:
             return jsonify([])
         
-        # Get all user recipes first, then filter by search
-        all_user_recipes = RecipeService.get_recipes_by_user(db, current_user['user_id'])
-        
-        # Filter recipes by title (case-insensitive)
-        filtered_recipes = [
-            recipe for recipe in all_user_recipes
-            if search_query.lower() in recipe.title.lower()
-        ]
-        
-        return jsonify([recipe.model_dump() for recipe in filtered_recipes])
+        # Filtering, ordering and limiting all happen in SQL, scoped to the owner
+        if wants_page(request.args):
+            after, limit = parse_cursor(request.args, 'title', 'id')
+            recipes, next_cursor = RecipeService.search_user_recipes(
+                db, current_user['user_id'], search_query, after, limit)
+            return jsonify(page_envelope([recipe.model_dump() for recipe in recipes], next_cursor))
+
+        recipes, _next_cursor = RecipeService.search_user_recipes(
+            db, current_user['user_id'], search_query, None, MAX_PAGE_SIZE)
+        return jsonify([recipe.model_dump() for recipe in recipes])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/users/<int:user_id>/recipes', methods=['GET'])
 def get_user_recipes(user_id):
-    db = SessionLocal()
+    db = get_db()
     try:
         recipes = RecipeService.get_recipes_by_user(db, user_id)
         return jsonify([recipe.model_dump() for recipe in recipes])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/recipes/search', methods=['GET'])
 def search_recipes():
-    db = SessionLocal()
+    """
+    Full-text recipe search
+    ---
+    tags:
+      - Search
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Words to find in title, ingredients, instructions and origin. The last word also matches as a prefix.
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of results (capped by PAGE_SIZE_MAX)
+    responses:
+      200:
+        description: Recipes ranked by relevance, each with a score and highlighted snippets
+      400:
+        description: Invalid limit
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    db = get_db()
     try:
         # Get search query from query parameters
         search_query = request.args.get('q', '').strip()
@@ -475,19 +984,20 @@ def search_recipes():
             # If no query provided, return empty list
             return jsonify([])
         
-        # Search recipes by title (case-insensitive)
-        recipes = RecipeService.search_recipes(db, search_query)
+        # Ranked search over the in-memory inverted index
+        limit = parse_limit(request.args)
+        recipes = RecipeService.search_recipes(db, search_query, limit)
         return jsonify([recipe.model_dump() for recipe in recipes])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/comments', methods=['POST'])
 @token_required
 def create_comment(current_user):
     """Create a comment - requires authentication"""
-    db = SessionLocal()
+    db = get_db()
     try:
         comment_data = request.json
         from schemas.comment_schemas import CommentCreate
@@ -495,26 +1005,42 @@ def create_comment(current_user):
         comment_data['user_id'] = current_user['user_id']
         comment_create = CommentCreate(**comment_data)
         comment = CommentService.create_comment(db, comment_create)
+        invalidate_comment_caches(comment.recipe_id, rating_changed=comment.rating is not None)
         return jsonify(comment.model_dump()), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        db.close()
 
 @app.route('/comments', methods=['GET'])
+@conditional_response(CommentService.get_comments_version, use_last_modified=False)
 def get_comments():
-    db = SessionLocal()
+    """
+    Get all comments, one keyset page of them when cursor/limit is given, a
+    stream with ?stream=json|ndjson, or the comments listed in ?ids= with
+    their authors
+    """
+    db = get_db()
     try:
+        if wants_ids(request.args):
+            comments, missing = CommentService.get_comments_by_ids(db, parse_ids(request.args))
+            return jsonify(ids_envelope([comment.model_dump() for comment in comments], missing))
+        fmt = stream_format(request)
+        if fmt:
+            return stream_collection(CommentService.iter_comments, fmt)
+        if wants_page(request.args):
+            after_id, limit = parse_id_cursor(request.args)
+            comments, next_cursor = CommentService.get_comments_page(db, after_id, limit)
+            return jsonify(page_envelope([comment.model_dump() for comment in comments], next_cursor))
         comments = CommentService.get_all_comments(db)
         return jsonify([comment.model_dump() for comment in comments])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/comments/<int:comment_id>', methods=['GET'])
+@conditional_response(CommentService.get_comment_version)
 def get_comment(comment_id):
-    db = SessionLocal()
+    db = get_db()
     try:
         comment = CommentService.get_comment_by_id(db, comment_id)
         if comment:
@@ -522,37 +1048,85 @@ def get_comment(comment_id):
         return jsonify({"error": "Comment not found"}), 404
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/recipes/<int:recipe_id>/comments', methods=['GET'])
+@conditional_response(CommentService.get_recipe_comments_version, use_last_modified=False)
+@cached_response(lambda recipe_id: recipe_comments_scope(recipe_id))
 def get_recipe_comments(recipe_id):
-    """Get all comments for a recipe with user information"""
-    db = SessionLocal()
+    """
+    Get comments for a recipe with user information
+    ---
+    tags:
+      - Comments
+    parameters:
+      - name: recipe_id
+        in: path
+        type: integer
+        required: true
+      - name: sort
+        in: query
+        type: string
+        enum: [newest, oldest, top]
+        default: newest
+        required: false
+        description: Page order; top is highest rated first, unrated last
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Opaque cursor from a previous page's next_cursor (only valid with the same sort)
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Page size (capped by PAGE_SIZE_MAX). Sending sort, cursor or limit returns {"items", "next_cursor"}; otherwise every comment is returned as an array
+      - name: stream
+        in: query
+        type: string
+        enum: [json, ndjson]
+        required: false
+        description: Stream every comment as a JSON array or NDJSON
+    responses:
+      200:
+        description: Comments with author name and email
+      304:
+        description: Not modified since the ETag given in If-None-Match
+      400:
+        description: Unknown sort or invalid cursor
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    db = get_db()
     try:
+        fmt = stream_format(request)
+        if fmt:
+            return stream_collection(CommentService.iter_recipe_comments_with_users, fmt, recipe_id)
+        if wants_page(request.args) or 'sort' in request.args:
+            position, limit = parse_cursor(request.args, 'sort', 'comment_date', 'id')
+            comments, next_cursor = CommentService.get_recipe_comments_page(
+                db, recipe_id, request.args.get('sort', 'newest'), position, limit)
+            return jsonify(page_envelope([comment.model_dump() for comment in comments], next_cursor))
         comments = CommentService.get_recipe_comments_with_users(db, recipe_id)
         return jsonify([comment.model_dump() for comment in comments])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/users/<int:user_id>/comments', methods=['GET'])
 def get_user_comments(user_id):
-    db = SessionLocal()
+    db = get_db()
     try:
         comments = CommentService.get_comments_by_user(db, user_id)
         return jsonify([comment.model_dump() for comment in comments])
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
 
 @app.route('/comments/<int:comment_id>', methods=['PUT'])
 @token_required
 def update_comment(current_user, comment_id):
     """Update a comment - only the owner can update"""
-    db = SessionLocal()
+    db = get_db()
     try:
         # Check if comment exists
         comment = CommentService.get_comment_by_id(db, comment_id)
@@ -570,18 +1144,18 @@ def update_comment(current_user, comment_id):
         updated_comment = CommentService.update_comment(db, comment_id, comment_update)
         
         if updated_comment:
+            invalidate_comment_caches(comment.recipe_id,
+                                      rating_changed=updated_comment.rating != comment.rating)
             return jsonify(updated_comment.model_dump())
         return jsonify({"error": "Failed to update comment"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 400
-    finally:
-        db.close()
 
 @app.route('/comments/<int:comment_id>', methods=['DELETE'])
 @token_required
 def delete_comment(current_user, comment_id):
     """Delete a comment - only the owner can delete"""
-    db = SessionLocal()
+    db = get_db()
     try:
         # Check if comment exists
         comment = CommentService.get_comment_by_id(db, comment_id)
@@ -595,27 +1169,103 @@ def delete_comment(current_user, comment_id):
         # Delete the comment
         success = CommentService.delete_comment(db, comment_id)
         if success:
+            invalidate_comment_caches(comment.recipe_id, rating_changed=comment.rating is not None)
             return '', 204
         return jsonify({"error": "Failed to delete comment"}), 500
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        db.close()
+
+@app.route('/export/<any(recipes, comments):entity>', methods=['GET'])
+@token_required
+def export_table(current_user, entity):
+    """
+    Export a whole table as a streamed NDJSON or CSV download (authentication required)
+    ---
+    tags:
+      - Export
+    security:
+      - Bearer: []
+    produces:
+      - application/x-ndjson
+      - text/csv
+      - application/gzip
+    parameters:
+      - name: entity
+        in: path
+        type: string
+        enum: [recipes, comments]
+        required: true
+        description: Users are only exported by export_data.py, since any signed-in user may call this route
+      - name: format
+        in: query
+        type: string
+        enum: [ndjson, csv]
+        default: ndjson
+        required: false
+      - name: gzip
+        in: query
+        type: boolean
+        required: false
+        description: Compress the download (the file name gets a .gz suffix)
+      - name: since
+        in: query
+        type: string
+        format: date-time
+        required: false
+        description: Only rows updated at or after this ISO 8601 time. Pass the previous export's X-Export-Next-Since header for incremental exports.
+    responses:
+      200:
+        description: The rows, streamed in constant memory
+        headers:
+          X-Export-Next-Since:
+            type: string
+            description: Time this export started, less EXPORT_OVERLAP_SECONDS; use it as the next export's since
+      400:
+        description: Unknown format or malformed since
+        schema:
+          $ref: '#/definitions/Error'
+      401:
+        description: Unauthorized - missing or invalid token
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    return stream_export(ExportService.iter_rows, ExportService.columns(entity), fmt, compress, entity,
+                         entity, since)
 
 if __name__ == '__main__':
     print("🚀 Starting Flask server...")
     print("📊 Available endpoints:")
     print("   GET  /")
     print("   GET  /health")
+    print("   GET  /ready")
     print("   GET  /users")
     print("   POST /users")
     print("   GET  /recipes")
     print("   POST /recipes")
+    print("   POST /recipes/bulk")
+    print("   GET  /recipes/facets")
+    print("   GET  /recipes/by-ingredients")
+    print("   GET  /recipes/pantry")
     print("   GET  /recipes/<id>")
+    print("   GET  /recipes/<id>/full")
     print("   GET  /users/<id>/recipes")
     print("   GET  /comments")
     print("   POST /comments")
     print("   GET  /comments/<id>")
     print("   GET  /recipes/<id>/comments")
     print("   GET  /users/<id>/comments")
+    print("   GET  /export/<recipes|comments|users>")
+    print("   GET  /metrics/cache")
+    print("   GET  /metrics/db")
+    print("   GET  /metrics/pool")
+    print("   GET  /metrics/auth")
+    print("   GET  /metrics/passwords")
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
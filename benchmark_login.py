@@ -0,0 +1,92 @@
+import argparse
+import json
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import app
+from database import SessionLocal
+from repositories.user_repository import UserRepository
+from utils.passwords import password_hasher
+
+BENCH_PASSWORD = "benchmark-password"
+
+
+def ensure_users(count):
+    """Create bench users bench0@example.com ... once; later runs reuse them"""
+    db = SessionLocal()
+    try:
+        emails = []
+        for i in range(count):
+            email = f"bench{i}@example.com"
+            if UserRepository.get_user_by_email(db, email) is None:
+                UserRepository.create_user(db, {"name": f"bench{i}", "email": email, "password": BENCH_PASSWORD})
+            emails.append(email)
+        return emails
+    finally:
+        db.close()
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def benchmark_login(concurrency, requests, users, target_p99_ms):
+    """
+    Fire POST /users/login from `concurrency` threads and report throughput,
+    latency percentiles and how many logins were shed with 503.
+    """
+    print(f"🔐 Login benchmark: {requests} logins, concurrency {concurrency}, "
+          f"{password_hasher.workers} KDF workers, queue limit {password_hasher.queue_limit}")
+    emails = ensure_users(users)
+    client = app.test_client()
+    latencies = []
+    statuses = {}
+    lock = threading.Lock()
+
+    def one_login(i):
+        body = json.dumps({"email": emails[i % len(emails)], "password": BENCH_PASSWORD})
+        started = time.perf_counter()
+        response = client.post('/users/login', data=body, content_type='application/json')
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with lock:
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.status_code == 200:
+                latencies.append(elapsed_ms)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one_login, range(requests)))
+    wall_seconds = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = percentile(latencies, 0.99)
+    print(f"📊 Status codes: {statuses}")
+    print(f"📊 Throughput: {statuses.get(200, 0) / wall_seconds:.1f} logins/s over {wall_seconds:.2f}s")
+    if latencies:
+        print(f"📊 Latency ms: p50 {percentile(latencies, 0.5):.1f}  p95 {percentile(latencies, 0.95):.1f}  "
+              f"p99 {p99:.1f}  max {latencies[-1]:.1f}  mean {statistics.mean(latencies):.1f}")
+    kdf = password_hasher.stats()["kdf"]
+    print(f"📊 KDF: {kdf['count']} hashes, avg {kdf['avg_ms']}ms")
+    if target_p99_ms is not None:
+        if p99 <= target_p99_ms:
+            print(f"✅ p99 {p99:.1f}ms within target {target_p99_ms}ms")
+        else:
+            print(f"❌ p99 {p99:.1f}ms above target {target_p99_ms}ms")
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure login throughput and latency")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--target-p99-ms", type=float, default=None)
+    args = parser.parse_args()
+    ok = benchmark_login(args.concurrency, args.requests, args.users, args.target_p99_ms)
+    exit(0 if ok else 1)
@@ -0,0 +1,85 @@
+import argparse
+import random
+import statistics
+import time
+
+from services.pantry_index import PantryIndex
+
+
+def percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def synthetic_recipes(count, vocabulary_size, seed):
+    """
+    (recipe_id, ingredient names) rows shaped like a real recipe table: 3 to
+    15 ingredients each, drawn from a Zipf-like vocabulary so a few staples
+    (salt, oil, onion...) appear in most recipes and most names in few.
+    """
+    rng = random.Random(seed)
+    vocabulary = [f"ingredient {rank}" for rank in range(vocabulary_size)]
+    cumulative = []
+    total = 0.0
+    for rank in range(vocabulary_size):
+        total += 1 / (rank + 1)
+        cumulative.append(total)
+    for recipe_id in range(1, count + 1):
+        names = rng.choices(vocabulary, cum_weights=cumulative, k=rng.randint(3, 15))
+        yield recipe_id, tuple(dict.fromkeys(names))
+
+
+def benchmark_pantry(recipes, vocabulary_size, queries, pantry_size, max_missing, target_p99_ms):
+    """Build the pantry index over synthetic recipes, then time match() for random pantries"""
+    print(f"🥕 Pantry benchmark: {recipes} recipes, {vocabulary_size} ingredients, "
+          f"{queries} pantries of {pantry_size}, max_missing {max_missing}")
+    index = PantryIndex()
+    started = time.perf_counter()
+    index._load(synthetic_recipes(recipes, vocabulary_size, seed=1))
+    build_seconds = time.perf_counter() - started
+    print(f"📊 Built in {build_seconds:.1f}s")
+
+    rng = random.Random(2)
+    # Pantries lean towards common ingredients, like real kitchens
+    common = [f"ingredient {rank}" for rank in range(min(vocabulary_size, 300))]
+    latencies = []
+    results = 0
+    for _ in range(queries):
+        pantry = rng.sample(common, pantry_size)
+        started = time.perf_counter()
+        hits = index.match(pantry, max_missing, 20)
+        latencies.append((time.perf_counter() - started) * 1000)
+        results += len(hits)
+
+    started = time.perf_counter()
+    for recipe_id in range(recipes + 1, recipes + 1001):
+        index._set(recipe_id, ("ingredient 0", "ingredient 7", f"ingredient {recipe_id % vocabulary_size}"))
+    # Seconds for 1000 recipes x 1e6 / 1000 = microseconds per recipe
+    update_us = (time.perf_counter() - started) * 1000
+
+    latencies.sort()
+    p99 = percentile(latencies, 0.99)
+    print(f"📊 Query ms: p50 {percentile(latencies, 0.5):.1f}  p95 {percentile(latencies, 0.95):.1f}  "
+          f"p99 {p99:.1f}  max {latencies[-1]:.1f}  mean {statistics.mean(latencies):.1f}")
+    print(f"📊 {results / queries:.1f} results per query; one recipe added in {update_us:.0f}µs")
+    if target_p99_ms is not None:
+        if p99 <= target_p99_ms:
+            print(f"✅ p99 {p99:.1f}ms within target {target_p99_ms}ms")
+        else:
+            print(f"❌ p99 {p99:.1f}ms above target {target_p99_ms}ms")
+            return False
+    return True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure pantry matching latency over synthetic recipes")
+    parser.add_argument("--recipes", type=int, default=500000)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--pantry-size", type=int, default=20)
+    parser.add_argument("--max-missing", type=int, default=2)
+    parser.add_argument("--target-p99-ms", type=float, default=None)
+    args = parser.parse_args()
+    ok = benchmark_pantry(args.recipes, args.vocabulary, args.queries, args.pantry_size,
+                          args.max_missing, args.target_p99_ms)
+    exit(0 if ok else 1)
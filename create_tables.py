@@ -1,22 +1,42 @@
+from sqlalchemy import inspect
+
 from database import engine, Base
+from migrations import MIGRATIONS, MigrationRunner
 
 # Import all models so they register with Base.metadata
 try:
     from models.user import User
     from models.recipe import Recipe
     from models.comment import Comment
+    from models.recipe_rating import RecipeRating
+    from models.ingredient import Ingredient, RecipeIngredient
+    from models.table_version import TableVersion
+    from models.recipe_facet_count import RecipeFacetCount
     print("✅ Models imported successfully")
 except ImportError as e:
     print(f"❌ Error importing models: {e}")
     print("Make sure all model files exist in the models/ directory")
     exit(1)
 
-def create_tables():
+def create_tables(bind=engine):
+    runner = MigrationRunner(bind, MIGRATIONS)
+    existing = set(inspect(bind).get_table_names()) & set(Base.metadata.tables)
+    if existing:
+        # create_all never alters a table that exists: bring those up to date
+        # through the migrations, whose steps skip what is already there
+        print(f"📦 Existing schema found ({len(existing)} tables), applying pending migrations...")
+        reports = runner.upgrade()
+        print(f"✅ {sum(report['status'] == 'applied' for report in reports)} migration step(s) applied")
     print("Creating tables...")
     print(f"📊 Found {len(Base.metadata.tables)} tables to create")
-    Base.metadata.create_all(bind=engine)
+    Base.metadata.create_all(bind=bind)
     print("✅ Tables created successfully!")
-    print("📊 Tables created: users, recipes, comments")
+    print("📊 Tables created: users, recipes, comments, recipe_ratings, ingredients, recipe_ingredients, table_versions, "
+          "recipe_facet_counts")
+    if not existing:
+        # create_all built the latest schema from nothing: record it so migrate.py skips it
+        runner.stamp()
+        print("✅ Schema stamped at the latest migration")
 
 if __name__ == "__main__":
     create_tables()
\ No newline at end of file
@@ -1,18 +1,67 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, DateTime
+from sqlalchemy.dialects import mysql
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-SQLALCHEMY_DATABASE_URL = "mysql+mysqlconnector://root:admin@db:3306/bdd"
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
+from utils.pool import InstrumentedQueuePool, install_idle_ping
+
+SQLALCHEMY_DATABASE_URL = os.getenv('DATABASE_URL', "mysql+mysqlconnector://root:admin@db:3306/bdd")
+
+# Pool sizing is per worker process: pool size + overflow times the number of
+# workers must stay below the server's max_connections.
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_READ_POOL_SIZE = int(os.getenv('DB_READ_POOL_SIZE', str(DB_POOL_SIZE)))
+DB_READ_MAX_OVERFLOW = int(os.getenv('DB_READ_MAX_OVERFLOW', str(DB_MAX_OVERFLOW)))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '3600'))
+# always: ping on every checkout | idle: only after DB_PING_IDLE_SECONDS in the pool | never
+DB_PRE_PING = os.getenv('DB_PRE_PING', 'idle')
+DB_PING_IDLE_SECONDS = float(os.getenv('DB_PING_IDLE_SECONDS', '30'))
+
+
+def _create_engine(pool_size: int, max_overflow: int, **kwargs):
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_PRE_PING == 'always',
+        **kwargs
+    )
+    if DB_PRE_PING == 'idle':
+        install_idle_ping(engine, DB_PING_IDLE_SECONDS)
+    return engine
+
+
+engine = _create_engine(DB_POOL_SIZE, DB_MAX_OVERFLOW)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only requests use their own pool in AUTOCOMMIT mode: every SELECT is
+# its own implicit transaction, so the session never issues COMMIT/ROLLBACK,
+# and with no transaction state to clean up the pool skips the reset
+# round trip when a connection is checked back in.
+read_engine = _create_engine(
+    DB_READ_POOL_SIZE,
+    DB_READ_MAX_OVERFLOW,
+    isolation_level="AUTOCOMMIT",
+    skip_autocommit_rollback=True,
+    pool_reset_on_return=None,
+)
+
+ReadSessionLocal = sessionmaker(autoflush=False, bind=read_engine)
+
 Base = declarative_base()
 
+# DATETIME with microseconds on MySQL: updated_at must change on every write,
+# including two writes landing in the same second, or ETags would collide.
+Timestamp = DateTime().with_variant(mysql.DATETIME(fsp=6), "mysql")
+
 def get_db():
     db = SessionLocal()
     try:
@@ -0,0 +1,70 @@
+import argparse
+import sys
+from datetime import datetime
+
+from database import ReadSessionLocal
+from services.export_service import EXPORT_ENTITIES, ExportService
+from utils.export import EXPORT_FORMATS, chunked, encode_rows, export_filename, gzipped, next_since, parse_since
+from utils.streaming import STREAM_BATCH_SIZE
+
+# Import all models so relationships resolve
+from models.user import User
+from models.recipe import Recipe
+from models.comment import Comment
+from models.recipe_rating import RecipeRating
+
+
+def export_table(entity, fmt="ndjson", since=None, compress=False, output=None):
+    """
+    Write one table to a file (or stdout with output="-") in constant memory,
+    with the same encoding as GET /export/<entity>. This is the only way to
+    export users: the HTTP route is open to every signed-in user.
+
+    Returns:
+        The since to pass on the next incremental run, see next_since()
+    """
+    started_at = datetime.utcnow()
+    path = output or export_filename(entity, fmt, compress)
+    db = ReadSessionLocal()
+    try:
+        body = chunked(encode_rows(ExportService.iter_rows(db, STREAM_BATCH_SIZE, entity, since),
+                                   ExportService.columns(entity), fmt))
+        if compress:
+            body = gzipped(body)
+        target = sys.stdout.buffer if path == "-" else open(path, "wb")
+        try:
+            written = 0
+            for chunk in body:
+                target.write(chunk)
+                written += len(chunk)
+        finally:
+            if target is not sys.stdout.buffer:
+                target.close()
+    finally:
+        db.close()
+    if path != "-":
+        print(f"✅ Exported {entity} to {path} ({written} bytes)")
+    return next_since(started_at)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export tables as NDJSON or CSV")
+    parser.add_argument("entities", nargs="*", choices=EXPORT_ENTITIES, default=list(EXPORT_ENTITIES),
+                        help="Tables to export (default: all)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--since", help="Only rows updated at or after this ISO 8601 time")
+    parser.add_argument("--gzip", action="store_true", help="Compress the output files")
+    parser.add_argument("--output", help="Output file, or - for stdout (only with a single table)")
+    args = parser.parse_args()
+
+    if args.output and len(args.entities) != 1:
+        parser.error("--output needs exactly one table")
+    try:
+        since = parse_since(args.since)
+    except ValueError as e:
+        parser.error(str(e))
+
+    following = None
+    for entity in args.entities:
+        following = following or export_table(entity, args.format, since, args.gzip, args.output)
+    print(f"📊 Next incremental run: --since {following.isoformat()}", file=sys.stderr)
@@ -0,0 +1,69 @@
+import argparse
+
+from database import engine
+from migrations import MIGRATIONS, MigrationRunner
+
+
+def print_reports(reports):
+    revision = None
+    for report in reports:
+        if report["revision"] != revision:
+            revision = report["revision"]
+            print(f"📦 {revision}")
+        icon = "✅" if report["status"] == "applied" else "⏭️ "
+        print(f"   {icon} {report['step']} ({report['status']}, {report['ms']:.1f} ms)")
+        for statement in report["sql"]:
+            print(f"      {statement}")
+
+
+def migrate(dry_run=False, sample_rows=0):
+    runner = MigrationRunner(engine, MIGRATIONS)
+    pending = runner.pending()
+    if not pending:
+        print("✅ Database is up to date")
+        return []
+    print(f"📊 {len(pending)} pending migration(s): {', '.join(m.revision for m in pending)}")
+    if dry_run:
+        print(f"🧪 Dry run against an in-memory SQLite copy of the schema ({sample_rows} sample rows per table)")
+        reports = runner.dry_run(sample_rows)
+    else:
+        reports = runner.upgrade()
+    print_reports(reports)
+    total_ms = sum(report["ms"] for report in reports)
+    print(f"✅ {'Dry run finished' if dry_run else 'Migrated'} in {total_ms:.1f} ms")
+    return reports
+
+
+def status():
+    runner = MigrationRunner(engine, MIGRATIONS)
+    applied = runner.applied()
+    for migration in MIGRATIONS:
+        if migration.revision in applied:
+            print(f"✅ {migration.revision} applied {applied[migration.revision].isoformat()}")
+        else:
+            print(f"⏳ {migration.revision} pending: {migration.description}")
+
+
+def stamp():
+    stamped = MigrationRunner(engine, MIGRATIONS).stamp()
+    print(f"✅ Stamped {len(stamped)} revision(s) as applied")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations")
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--dry-run", action="store_true",
+                       help="Run against an in-memory SQLite stand-in and show the SQL and timings")
+    group.add_argument("--status", action="store_true", help="List applied and pending revisions")
+    group.add_argument("--stamp", action="store_true",
+                       help="Mark every revision applied, for a database built by create_tables.py")
+    parser.add_argument("--sample-rows", type=int, default=0,
+                        help="With --dry-run, copy this many rows per table into the stand-in")
+    args = parser.parse_args()
+
+    if args.status:
+        status()
+    elif args.stamp:
+        stamp()
+    else:
+        migrate(args.dry_run, args.sample_rows)
@@ -0,0 +1,4 @@
+from .runner import Migration, MigrationRunner
+from .versions import MIGRATIONS
+
+__all__ = ["Migration", "MigrationRunner", "MIGRATIONS"]
@@ -0,0 +1,149 @@
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import Column, DateTime, Float, MetaData, String, Table, create_engine, insert, select
+from sqlalchemy.pool import StaticPool
+
+from migrations.steps import Step
+
+# Kept out of Base.metadata: create_all must never think it owns this table
+_tracking = MetaData()
+schema_migrations = Table(
+    "schema_migrations", _tracking,
+    Column("revision", String(64), primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+    Column("duration_ms", Float, nullable=False),
+)
+
+
+class Migration:
+
+    def __init__(self, revision: str, description: str, steps: Sequence[Step]):
+        self.revision = revision
+        self.description = description
+        self.steps = list(steps)
+
+    def __repr__(self):
+        return f"<Migration({self.revision}: {self.description})>"
+
+
+class MigrationRunner:
+    """
+    Applies migrations in order and records each one in schema_migrations.
+
+    Every step first checks whether the database already has its change, so
+    a database built by create_all, or one where a migration died half way,
+    picks up exactly the steps it is missing.
+    """
+
+    def __init__(self, engine, migrations: Sequence[Migration]):
+        self.engine = engine
+        self.migrations = list(migrations)
+
+    def applied(self) -> Dict[str, datetime]:
+        """Applied revisions and when they were applied"""
+        with self.engine.connect() as connection:
+            schema_migrations.create(connection, checkfirst=True)
+            connection.commit()
+            rows = connection.execute(select(schema_migrations.c.revision, schema_migrations.c.applied_at))
+            return {revision: applied_at for revision, applied_at in rows}
+
+    def pending(self) -> List[Migration]:
+        applied = self.applied()
+        return [migration for migration in self.migrations if migration.revision not in applied]
+
+    def upgrade(self) -> List[Dict]:
+        """
+        Apply every pending migration.
+
+        Returns:
+            One report per step: revision, step, status ("applied" or
+            "skipped"), the SQL it ran and how long it took in ms
+        """
+        return self._run(self.engine, self.pending(), record=True)
+
+    def stamp(self) -> List[str]:
+        """Mark every migration applied without running it, for databases created by create_all"""
+        pending = self.pending()
+        with self.engine.connect() as connection:
+            for migration in pending:
+                self._record(connection, migration, 0.0)
+            connection.commit()
+        return [migration.revision for migration in pending]
+
+    def dry_run(self, sample_rows: int = 0) -> List[Dict]:
+        """
+        Run the pending migrations against an in-memory SQLite copy of this
+        database's schema, optionally with its first sample_rows rows per
+        table, without touching the database itself.
+
+        The reports carry the stand-in's timings and, as "sql", the
+        statements the real database would run.
+        """
+        pending = self.pending()
+        standin = create_engine("sqlite://", poolclass=StaticPool)
+        self._copy_schema(standin, sample_rows)
+        reports = self._run(standin, pending, record=False)
+        with self.engine.connect() as connection:
+            target_sql = [step.statements(connection) for migration in pending for step in migration.steps]
+        for report, sql in zip(reports, target_sql):
+            report["sql"] = sql
+        return reports
+
+    def _run(self, engine, migrations: Sequence[Migration], record: bool) -> List[Dict]:
+        reports = []
+        with engine.connect() as connection:
+            for migration in migrations:
+                migration_started = time.perf_counter()
+                for step in migration.steps:
+                    started = time.perf_counter()
+                    if step.is_applied(connection):
+                        status, sql = "skipped", []
+                    else:
+                        status, sql = "applied", step.statements(connection)
+                        step.apply(connection)
+                        connection.commit()
+                    reports.append({
+                        "revision": migration.revision,
+                        "step": step.description,
+                        "status": status,
+                        "sql": sql,
+                        "ms": round((time.perf_counter() - started) * 1000, 3),
+                    })
+                if record:
+                    self._record(connection, migration, (time.perf_counter() - migration_started) * 1000)
+                    connection.commit()
+        return reports
+
+    @staticmethod
+    def _record(connection, migration: Migration, duration_ms: float):
+        connection.execute(insert(schema_migrations).values(
+            revision=migration.revision,
+            description=migration.description,
+            applied_at=datetime.utcnow(),
+            duration_ms=round(duration_ms, 3),
+        ))
+
+    def _copy_schema(self, standin, sample_rows: int):
+        metadata = MetaData()
+        metadata.reflect(bind=self.engine)
+        if schema_migrations.name in metadata.tables:
+            metadata.remove(metadata.tables[schema_migrations.name])
+        for table in metadata.tables.values():
+            for column in table.columns:
+                # MySQL-only types and server defaults have no SQLite spelling
+                column.server_default = None
+                try:
+                    column.type.compile(dialect=standin.dialect)
+                except Exception:
+                    column.type = column.type.as_generic()
+        metadata.create_all(standin)
+        if not sample_rows:
+            return
+        with self.engine.connect() as source, standin.begin() as target:
+            for table in metadata.sorted_tables:
+                rows = source.execute(select(table).limit(sample_rows)).mappings().all()
+                if rows:
+                    target.execute(insert(table), [dict(row) for row in rows])
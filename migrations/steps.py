@@ -0,0 +1,167 @@
+from typing import Callable, List, Optional, Sequence
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
+# Rows updated per transaction by backfills, so no single statement holds row
+# locks on a large table for long.
+BACKFILL_BATCH_SIZE = 5000
+
+
+def online_ddl(connection: Connection) -> str:
+    """
+    Suffix for ALTER TABLE that makes MySQL build in place without blocking
+    reads or writes, or fail immediately if it cannot, instead of silently
+    copying the table under a lock. Empty for other dialects.
+    """
+    return ", ALGORITHM=INPLACE, LOCK=NONE" if connection.dialect.name == "mysql" else ""
+
+
+class Step:
+    """One schema or data change within a migration"""
+
+    description = ""
+
+    def is_applied(self, connection: Connection) -> bool:
+        """True when the database already has this change, e.g. from create_all"""
+        return False
+
+    def statements(self, connection: Connection) -> List[str]:
+        """The SQL this step runs on connection's dialect, for display"""
+        return []
+
+    def apply(self, connection: Connection):
+        for statement in self.statements(connection):
+            connection.execute(text(statement))
+
+
+class AddIndex(Step):
+
+    def __init__(self, table: str, name: str, columns: Sequence[str]):
+        self.table = table
+        self.name = name
+        self.columns = list(columns)
+        self.description = f"index {name} on {table}({', '.join(self.columns)})"
+
+    def is_applied(self, connection: Connection) -> bool:
+        return any(index["name"] == self.name for index in inspect(connection).get_indexes(self.table))
+
+    def statements(self, connection: Connection) -> List[str]:
+        columns = ", ".join(self.columns)
+        if connection.dialect.name == "mysql":
+            return [f"ALTER TABLE {self.table} ADD INDEX {self.name} ({columns}){online_ddl(connection)}"]
+        return [f"CREATE INDEX {self.name} ON {self.table} ({columns})"]
+
+
+class AddColumn(Step):
+    """Add a nullable column; its type is compiled from the model's Column for the target dialect"""
+
+    def __init__(self, column):
+        self.column = column
+        self.table = column.table.name
+        self.description = f"column {self.table}.{column.name}"
+
+    def is_applied(self, connection: Connection) -> bool:
+        return any(column["name"] == self.column.name for column in inspect(connection).get_columns(self.table))
+
+    def statements(self, connection: Connection) -> List[str]:
+        column_type = self.column.type.compile(dialect=connection.dialect)
+        return [f"ALTER TABLE {self.table} ADD COLUMN {self.column.name} {column_type} NULL{online_ddl(connection)}"]
+
+
+class ChangeColumnType(Step):
+    """
+    Give an existing column the model Column's type, keeping its nullability.
+
+    MySQL cannot change a column's type in place: the table is copied with
+    writes blocked (reads go on) until the copy is done, so the statement
+    asks for ALGORITHM=COPY explicitly rather than failing on online_ddl().
+    SQLite keeps declared types as affinities only and needs no rewrite.
+    """
+
+    def __init__(self, column):
+        self.column = column
+        self.table = column.table.name
+        self.description = f"column type {self.table}.{column.name} {column.type.compile()}"
+
+    def is_applied(self, connection: Connection) -> bool:
+        current = next(column["type"] for column in inspect(connection).get_columns(self.table)
+                       if column["name"] == self.column.name)
+        return current.compile(dialect=connection.dialect) == self.column.type.compile(dialect=connection.dialect)
+
+    def statements(self, connection: Connection) -> List[str]:
+        if connection.dialect.name != "mysql":
+            return []
+        column_type = self.column.type.compile(dialect=connection.dialect)
+        nullable = "NULL" if self.column.nullable else "NOT NULL"
+        return [f"ALTER TABLE {self.table} MODIFY COLUMN {self.column.name} {column_type} {nullable}, "
+                f"ALGORITHM=COPY, LOCK=SHARED"]
+
+
+class CreateTable(Step):
+    """Create a model's table with its indexes; a new table needs no online DDL"""
+
+    def __init__(self, table):
+        self.table = table
+        self.description = f"table {table.name}"
+
+    def is_applied(self, connection: Connection) -> bool:
+        return inspect(connection).has_table(self.table.name)
+
+    def statements(self, connection: Connection) -> List[str]:
+        from sqlalchemy.schema import CreateIndex, CreateTable as CreateTableDDL
+        return [str(CreateTableDDL(self.table).compile(dialect=connection.dialect)).strip()] + \
+            [str(CreateIndex(index).compile(dialect=connection.dialect)) for index in self.table.indexes]
+
+    def apply(self, connection: Connection):
+        self.table.create(connection)
+
+
+class Backfill(Step):
+    """
+    Fill in values with an UPDATE run over primary-key ranges of batch_size
+    rows, committing after each range.
+    """
+
+    def __init__(self, table: str, assignments: str, where: str, description: str,
+                 batch_size: Optional[int] = None):
+        self.table = table
+        self.assignments = assignments
+        self.where = where
+        self.batch_size = batch_size
+        self.description = description
+
+    def statements(self, connection: Connection) -> List[str]:
+        return [f"UPDATE {self.table} SET {self.assignments} WHERE id BETWEEN :low AND :high AND ({self.where})"]
+
+    def apply(self, connection: Connection):
+        batch_size = self.batch_size or BACKFILL_BATCH_SIZE
+        low, high = connection.execute(text(f"SELECT MIN(id), MAX(id) FROM {self.table}")).one()
+        if low is None:
+            return
+        statement = text(self.statements(connection)[0])
+        for start in range(low, high + 1, batch_size):
+            connection.execute(statement, {"low": start, "high": start + batch_size - 1})
+            connection.commit()
+
+
+class RunPython(Step):
+    """Data step written against the ORM: fn(session) runs on the migration's connection"""
+
+    def __init__(self, fn: Callable[[Session], object], description: str):
+        self.fn = fn
+        self.description = description
+
+    def statements(self, connection: Connection) -> List[str]:
+        return [f"-- python: {self.fn.__qualname__}"]
+
+    def apply(self, connection: Connection):
+        # End the transaction is_applied opened, so the session owns the next
+        # one and fn's own commits (e.g. per batch) really commit.
+        connection.commit()
+        session = Session(bind=connection)
+        try:
+            self.fn(session)
+        finally:
+            session.close()
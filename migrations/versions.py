@@ -0,0 +1,73 @@
+from models.user import User  # noqa: F401 - resolves the models' relationships
+from models.recipe import Recipe
+from models.comment import Comment
+from models.recipe_rating import RecipeRating
+from models.ingredient import Ingredient, RecipeIngredient
+from models.table_version import TableVersion
+from models.recipe_facet_count import RecipeFacetCount
+from migrations.runner import Migration
+from migrations.steps import AddColumn, AddIndex, Backfill, ChangeColumnType, CreateTable, RunPython
+from repositories.ingredient_repository import IngredientRepository
+from repositories.recipe_facet_repository import RecipeFacetRepository
+from repositories.recipe_rating_repository import RecipeRatingRepository
+from repositories.recipe_repository import RecipeRepository
+
+# Append only: a revision's steps must never change once it has shipped.
+MIGRATIONS = [
+    Migration("0001_updated_at", "updated_at on recipes and comments for conditional GETs", [
+        AddColumn(Recipe.__table__.c.updated_at),
+        AddColumn(Comment.__table__.c.updated_at),
+        Backfill("recipes", "updated_at = COALESCE(creation_date, CURRENT_TIMESTAMP)", "updated_at IS NULL",
+                 "backfill recipes.updated_at from creation_date"),
+        Backfill("comments", "updated_at = COALESCE(comment_date, CURRENT_TIMESTAMP)", "updated_at IS NULL",
+                 "backfill comments.updated_at from comment_date"),
+        AddIndex("recipes", "ix_recipes_updated_at", ["updated_at"]),
+        AddIndex("comments", "ix_comments_updated_at", ["updated_at"]),
+    ]),
+    Migration("0002_recipe_ratings", "per-recipe rating aggregates", [
+        CreateTable(RecipeRating.__table__),
+        RunPython(RecipeRatingRepository.rebuild_all, "compute rating aggregates from comments"),
+    ]),
+    Migration("0003_recipe_owner_title_index", "owner-scoped title search", [
+        AddIndex("recipes", "ix_recipes_user_id_title", ["user_id", "title"]),
+    ]),
+    Migration("0004_comment_page_indexes", "keyset pages of a recipe's comments", [
+        AddIndex("comments", "ix_comments_recipe_id_comment_date_id", ["recipe_id", "comment_date", "id"]),
+        AddIndex("comments", "ix_comments_recipe_id_rating_comment_date_id",
+                 ["recipe_id", "rating", "comment_date", "id"]),
+    ]),
+    # recipes.user_id and comments.recipe_id are served by the leading column
+    # of ix_recipes_user_id_title and the comment page indexes, and
+    # recipes.dish_type by that of ix_recipes_dish_type_preparation_minutes (0006).
+    Migration("0005_lookup_indexes", "creation date and comment author lookups", [
+        AddIndex("recipes", "ix_recipes_creation_date", ["creation_date"]),
+        AddIndex("comments", "ix_comments_user_id", ["user_id"]),
+    ]),
+    Migration("0006_preparation_minutes", "parsed preparation time and filter indexes", [
+        AddColumn(Recipe.__table__.c.preparation_minutes),
+        RunPython(RecipeRepository.backfill_preparation_minutes, "parse preparation_time into minutes"),
+        AddIndex("recipes", "ix_recipes_preparation_minutes", ["preparation_minutes"]),
+        AddIndex("recipes", "ix_recipes_dish_type_preparation_minutes", ["dish_type", "preparation_minutes"]),
+        AddIndex("recipes", "ix_recipes_origin_dish_type_preparation_minutes",
+                 ["origin", "dish_type", "preparation_minutes"]),
+    ]),
+    Migration("0007_ingredient_index", "ingredient dictionary and recipe_ingredients", [
+        CreateTable(Ingredient.__table__),
+        CreateTable(RecipeIngredient.__table__),
+        RunPython(IngredientRepository.backfill, "extract the ingredients of existing recipes"),
+    ]),
+    Migration("0008_table_versions", "delete counters for cheap collection ETags", [
+        CreateTable(TableVersion.__table__),
+    ]),
+    Migration("0009_recipe_facet_counts", "recipe counts per dish type and origin", [
+        CreateTable(RecipeFacetCount.__table__),
+        RunPython(RecipeFacetRepository.rebuild_all, "count recipes per dish type and origin"),
+    ]),
+    Migration("0010_comment_rating_double", "double-precision comment ratings for exact keyset cursors", [
+        ChangeColumnType(Comment.__table__.c.rating),
+        # The widened values keep their single-precision error (4.3 became
+        # 4.300000190734863); six decimals is all a FLOAT in 0-5 ever held
+        Backfill("comments", "rating = ROUND(rating, 6)", "rating IS NOT NULL AND rating <> ROUND(rating, 6)",
+                 "round widened comment ratings"),
+    ]),
+]
@@ -1,7 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, Text, DateTime, ForeignKey, Float
+from sqlalchemy import Column, Integer, Text, DateTime, Double, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from database import Base
+from database import Base, Timestamp
 
 
 class Comment(Base):
@@ -10,13 +10,25 @@ class Comment(Base):
     id = Column(Integer, primary_key=True, index=True)
     content = Column(Text, nullable=False)
     comment_date = Column(DateTime, default=datetime.utcnow)
-    rating = Column(Float, nullable=True)  # Optional, can be None
+    # Optional, can be None. Double, not Float: MySQL's single-precision FLOAT
+    # stores 4.3 as 4.300000190734863, which never equals the 4.3 a keyset
+    # cursor carries back, so ties on rating would be lost between pages.
+    rating = Column(Double, nullable=True)
+    updated_at = Column(Timestamp, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
 
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
 
     user = relationship("User", back_populates="comments")
     recipe = relationship("Recipe", back_populates="comments")
 
+    __table_args__ = (
+        # Per-recipe comment pages: seek to one recipe, read in (comment_date, id)
+        # order in either direction without a filesort
+        Index("ix_comments_recipe_id_comment_date_id", "recipe_id", "comment_date", "id"),
+        # The same for the top-rated order, (rating, comment_date, id) descending
+        Index("ix_comments_recipe_id_rating_comment_date_id", "recipe_id", "rating", "comment_date", "id"),
+    )
+
     def __repr__(self):
         return f"<Comment(id={self.id}, user_id={self.user_id}, recipe_id={self.recipe_id})>"
\ No newline at end of file
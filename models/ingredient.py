@@ -0,0 +1,31 @@
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from database import Base
+
+
+class Ingredient(Base):
+    """Dictionary of normalized ingredient names (see utils.ingredients)"""
+    __tablename__ = "ingredients"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False, unique=True)
+
+    def __repr__(self):
+        return f"<Ingredient(id={self.id}, name='{self.name}')>"
+
+
+class RecipeIngredient(Base):
+    """Which ingredients a recipe uses, extracted from Recipe.ingredients"""
+    __tablename__ = "recipe_ingredients"
+
+    # The primary key serves "ingredients of a recipe" (and rewriting them)
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    ingredient_id = Column(Integer, ForeignKey("ingredients.id"), primary_key=True)
+
+    __table_args__ = (
+        # "Recipes containing X": seek to the ingredient, read its recipe ids
+        # from the index without touching the table
+        Index("ix_recipe_ingredients_ingredient_id_recipe_id", "ingredient_id", "recipe_id"),
+    )
+
+    def __repr__(self):
+        return f"<RecipeIngredient(recipe_id={self.recipe_id}, ingredient_id={self.ingredient_id})>"
@@ -1,7 +1,8 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
-from database import Base
+from database import Base, Timestamp
+from models.recipe_rating import RecipeRating  # noqa: F401 - target of Recipe.rating
 
 
 class Recipe(Base):
@@ -13,13 +14,27 @@ class Recipe(Base):
     ingredients = Column(Text, nullable=False)
     instructions = Column(Text, nullable=False)
     preparation_time = Column(String(50))
+    # preparation_time parsed by utils.prep_time, for range filters
+    preparation_minutes = Column(Integer, index=True)
     origin = Column(String(100))
     servings = Column(Integer)
-    creation_date = Column(DateTime, default=datetime.utcnow)
+    creation_date = Column(DateTime, default=datetime.utcnow, index=True)
+    updated_at = Column(Timestamp, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     user = relationship("User", back_populates="recipes")
     comments = relationship("Comment", back_populates="recipe")
+    rating = relationship("RecipeRating", back_populates="recipe", uselist=False, cascade="all, delete-orphan")
+
+    __table_args__ = (
+        # Owner-scoped title search: seek to one user's rows, read them in title order
+        Index("ix_recipes_user_id_title", "user_id", "title"),
+        # GET /recipes filters: a dish type (optionally within a cuisine) under
+        # a time limit is an equality prefix followed by one range. Plain
+        # dish_type lookups use the prefix of the first.
+        Index("ix_recipes_dish_type_preparation_minutes", "dish_type", "preparation_minutes"),
+        Index("ix_recipes_origin_dish_type_preparation_minutes", "origin", "dish_type", "preparation_minutes"),
+    )
 
     def __repr__(self):
         return f"<Recipe(id={self.id}, title='{self.title}', dish_type='{self.dish_type}')>"
\ No newline at end of file
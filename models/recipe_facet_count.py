@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String
+from database import Base
+
+# Stored for recipes without an origin; key columns cannot be NULL
+NO_ORIGIN = ""
+
+
+class RecipeFacetCount(Base):
+    """
+    Recipes per (dish_type, origin) pair, kept in step with recipes by delta
+    updates in each recipe write's transaction. Pairs are few, so reading
+    every per-facet count is a scan of a handful of rows.
+    """
+    __tablename__ = "recipe_facet_counts"
+
+    dish_type = Column(String(50), primary_key=True)
+    origin = Column(String(100), primary_key=True, default=NO_ORIGIN)
+    recipe_count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<RecipeFacetCount(dish_type='{self.dish_type}', origin='{self.origin}', count={self.recipe_count})>"
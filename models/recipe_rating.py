@@ -0,0 +1,42 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from sqlalchemy.orm import relationship
+from database import Base, Timestamp
+
+RATING_BUCKETS = 6  # whole stars 0..5
+
+
+def rating_bucket(rating: float) -> int:
+    """Histogram bucket of a 0-5 rating: the nearest whole star, halves rounding up"""
+    return min(RATING_BUCKETS - 1, max(0, int(rating + 0.5)))
+
+
+class RecipeRating(Base):
+    """Per-recipe rating aggregates, kept in step with Comment.rating by delta updates"""
+    __tablename__ = "recipe_ratings"
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    stars_0 = Column(Integer, nullable=False, default=0)
+    stars_1 = Column(Integer, nullable=False, default=0)
+    stars_2 = Column(Integer, nullable=False, default=0)
+    stars_3 = Column(Integer, nullable=False, default=0)
+    stars_4 = Column(Integer, nullable=False, default=0)
+    stars_5 = Column(Integer, nullable=False, default=0)
+    updated_at = Column(Timestamp, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    recipe = relationship("Recipe", back_populates="rating")
+
+    @property
+    def rating_avg(self):
+        if not self.rating_count:
+            return None
+        return round(self.rating_sum / self.rating_count, 2)
+
+    @property
+    def histogram(self):
+        return [getattr(self, f"stars_{bucket}") or 0 for bucket in range(RATING_BUCKETS)]
+
+    def __repr__(self):
+        return f"<RecipeRating(recipe_id={self.recipe_id}, count={self.rating_count}, sum={self.rating_sum})>"
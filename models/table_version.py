@@ -0,0 +1,17 @@
+from sqlalchemy import BigInteger, Column, String
+from database import Base
+
+
+class TableVersion(Base):
+    """
+    Per-table counter bumped by every delete. Collection ETags combine it
+    with max(id) and max(updated_at), which see creates and updates through
+    their indexes but cannot see a row disappear.
+    """
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(64), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<TableVersion(table_name='{self.table_name}', version={self.version})>"
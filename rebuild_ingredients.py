@@ -0,0 +1,31 @@
+from database import SessionLocal
+from repositories.ingredient_repository import IngredientRepository
+
+# Import all models so relationships resolve
+from models.user import User
+from models.recipe import Recipe
+from models.comment import Comment
+from models.recipe_rating import RecipeRating
+from models.ingredient import Ingredient, RecipeIngredient
+
+
+def rebuild_ingredients():
+    """
+    Re-extract every recipe's ingredients into recipe_ingredients.
+    Run it after changing the extraction rules in utils/ingredients.py.
+    """
+    db = SessionLocal()
+    try:
+        print("🔁 Extracting recipe ingredients...")
+        processed = IngredientRepository.backfill(db)
+        print(f"✅ Indexed ingredients of {processed} recipes ({db.query(Ingredient).count()} distinct ingredients)")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error extracting ingredients: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_ingredients()
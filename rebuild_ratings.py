@@ -0,0 +1,30 @@
+from database import SessionLocal
+from repositories.recipe_rating_repository import RecipeRatingRepository
+
+# Import all models so relationships resolve
+from models.user import User
+from models.recipe import Recipe
+from models.comment import Comment
+from models.recipe_rating import RecipeRating
+
+
+def rebuild_ratings():
+    """
+    Recompute every recipe's rating aggregates from the comments table.
+    Use it to repair drift or to backfill aggregates on an existing database.
+    """
+    db = SessionLocal()
+    try:
+        print("🔁 Rebuilding recipe rating aggregates...")
+        rebuilt = RecipeRatingRepository.rebuild_all(db)
+        print(f"✅ Rebuilt aggregates for {rebuilt} rated recipes")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error rebuilding ratings: {e}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_ratings()
@@ -1,5 +1,10 @@
 from .user_repository import UserRepository
 from .comment_repository import CommentRepository
 from .recipe_repository import RecipeRepository
+from .recipe_rating_repository import RecipeRatingRepository
+from .ingredient_repository import IngredientRepository
+from .table_version_repository import TableVersionRepository
+from .recipe_facet_repository import RecipeFacetRepository
 
-__all__ = ["UserRepository", "CommentRepository", "RecipeRepository"]
\ No newline at end of file
+__all__ = ["UserRepository", "CommentRepository", "RecipeRepository", "RecipeRatingRepository",
+           "IngredientRepository", "TableVersionRepository", "RecipeFacetRepository"]
\ No newline at end of file
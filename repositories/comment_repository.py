@@ -1,6 +1,21 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from datetime import datetime
+from operator import attrgetter
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from models.comment import Comment
+from repositories.recipe_rating_repository import RecipeRatingRepository
+from repositories.table_version_repository import TableVersionRepository
+from utils.keyset import walk_keyset, walk_select
+
+# Columns written by exports, in output order
+EXPORT_COLUMNS = (Comment.id, Comment.recipe_id, Comment.user_id, Comment.content, Comment.rating,
+                  Comment.comment_date, Comment.updated_at)
+
+
+# Orders of a recipe's comment pages
+COMMENT_SORTS = ("newest", "oldest", "top")
 
 
 class CommentRepository:
@@ -13,6 +28,52 @@ class CommentRepository:
     def get_comments_by_recipe(db: Session, recipe_id: int) -> List[Comment]:
         return db.query(Comment).filter(Comment.recipe_id == recipe_id).all()
 
+    @staticmethod
+    def get_comments_by_recipe_with_users(db: Session, recipe_id: int) -> List[Comment]:
+        return db.query(Comment).options(joinedload(Comment.user)) \
+            .filter(Comment.recipe_id == recipe_id).order_by(Comment.id).all()
+
+    @staticmethod
+    def get_recipe_comments_page(db: Session, recipe_id: int, sort: str,
+                                 after: Optional[Dict[str, Any]], limit: int) -> List[Comment]:
+        """
+        One keyset page of a recipe's comments, authors joined in the same query.
+
+        sort is "newest" or "oldest" (by comment_date, then id) or "top" (by
+        rating, unrated last, then newest). after is the last row of the
+        previous page. The recipe_id-prefixed composite indexes return rows
+        already in order, so a page costs the same however deep it is.
+        """
+        query = db.query(Comment).options(joinedload(Comment.user)).filter(Comment.recipe_id == recipe_id)
+        if sort == "oldest":
+            if after is not None:
+                query = query.filter(or_(
+                    Comment.comment_date > after["comment_date"],
+                    and_(Comment.comment_date == after["comment_date"], Comment.id > after["id"])
+                ))
+            return query.order_by(Comment.comment_date, Comment.id).limit(limit).all()
+
+        if after is not None:
+            older = or_(
+                Comment.comment_date < after["comment_date"],
+                and_(Comment.comment_date == after["comment_date"], Comment.id < after["id"])
+            )
+            if sort == "top":
+                # NULL ratings sort last in descending order on both MySQL and SQLite
+                if after["rating"] is None:
+                    older = and_(Comment.rating.is_(None), older)
+                else:
+                    older = or_(
+                        Comment.rating < after["rating"],
+                        and_(Comment.rating == after["rating"], older),
+                        Comment.rating.is_(None)
+                    )
+            query = query.filter(older)
+        order = (Comment.comment_date.desc(), Comment.id.desc())
+        if sort == "top":
+            order = (Comment.rating.desc(),) + order
+        return query.order_by(*order).limit(limit).all()
+
     @staticmethod
     def get_comments_by_user(db: Session, user_id: int) -> List[Comment]:
         return db.query(Comment).filter(Comment.user_id == user_id).all()
@@ -21,6 +82,75 @@ class CommentRepository:
     def get_all_comments(db: Session, skip: int = 0, limit: int = 100) -> List[Comment]:
         return db.query(Comment).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_comments_by_ids_with_users(db: Session, comment_ids: List[int]) -> List[Comment]:
+        if not comment_ids:
+            return []
+        return db.query(Comment).options(joinedload(Comment.user)).filter(Comment.id.in_(comment_ids)).all()
+
+    @staticmethod
+    def count_by_recipe_ids(db: Session, recipe_ids: Iterable[int]) -> Dict[int, int]:
+        """Comment count per recipe in one GROUP BY query; recipes without comments map to 0"""
+        recipe_ids = list(recipe_ids)
+        if not recipe_ids:
+            return {}
+        counts = dict.fromkeys(recipe_ids, 0)
+        rows = db.query(Comment.recipe_id, func.count(Comment.id)) \
+            .filter(Comment.recipe_id.in_(recipe_ids)) \
+            .group_by(Comment.recipe_id).all()
+        counts.update(rows)
+        return counts
+
+    @staticmethod
+    def get_version(db: Session, comment_id: int) -> Optional[Tuple]:
+        """Cheap change probe for one comment, or None if it does not exist"""
+        return db.query(Comment.id, Comment.updated_at).filter(Comment.id == comment_id).first()
+
+    @staticmethod
+    def get_recipe_comments_version(db: Session, recipe_id: int) -> Tuple:
+        """Count, newest id and newest updated_at of one recipe's comments"""
+        return db.query(func.count(Comment.id), func.max(Comment.id), func.max(Comment.updated_at)) \
+            .filter(Comment.recipe_id == recipe_id).one()
+
+    @staticmethod
+    def get_collection_version(db: Session) -> Tuple:
+        """Newest id, newest updated_at and the delete counter: index lookups, not a scan"""
+        return db.execute(select(
+            select(func.max(Comment.id)).scalar_subquery(),
+            select(func.max(Comment.updated_at)).scalar_subquery(),
+            TableVersionRepository.version_of(Comment.__tablename__),
+        )).one()
+
+    @staticmethod
+    def get_comments_after(db: Session, after_id: Optional[int], limit: int) -> List[Comment]:
+        query = db.query(Comment)
+        if after_id is not None:
+            query = query.filter(Comment.id > after_id)
+        return query.order_by(Comment.id).limit(limit).all()
+
+    @staticmethod
+    def stream_comments(db: Session, batch_size: int, recipe_id: Optional[int] = None) -> Iterator[Comment]:
+        """Comments in id order with their authors, one keyset page per batch_size rows"""
+        query = db.query(Comment).options(joinedload(Comment.user))
+        if recipe_id is not None:
+            query = query.filter(Comment.recipe_id == recipe_id)
+        query = query.order_by(Comment.id)
+
+        def page(after_id: Optional[int]) -> List[Comment]:
+            if after_id is None:
+                return query.limit(batch_size).all()
+            return query.filter(Comment.id > after_id).limit(batch_size).all()
+
+        return walk_keyset(page, batch_size, attrgetter("id"))
+
+    @staticmethod
+    def export_rows(db: Session, batch_size: int, since: Optional[datetime] = None) -> Iterator[Row]:
+        """Plain column tuples for EXPORT_COLUMNS by keyset pages; with since, only rows updated at or after it"""
+        if since is None:
+            return walk_select(db, select(*EXPORT_COLUMNS), (Comment.id,), batch_size)
+        return walk_select(db, select(*EXPORT_COLUMNS).where(Comment.updated_at >= since),
+                           (Comment.updated_at, Comment.id), batch_size)
+
     @staticmethod
     def create_comment(db: Session, comment_data: dict) -> Comment:
         db_comment = Comment(
@@ -30,6 +160,7 @@ class CommentRepository:
             recipe_id=comment_data["recipe_id"]
         )
         db.add(db_comment)
+        RecipeRatingRepository.apply_delta(db, db_comment.recipe_id, None, db_comment.rating)
         db.commit()
         db.refresh(db_comment)
         return db_comment
@@ -38,9 +169,11 @@ class CommentRepository:
     def update_comment(db: Session, comment_id: int, update_data: dict) -> Optional[Comment]:
         db_comment = db.query(Comment).filter(Comment.id == comment_id).first()
         if db_comment:
+            old_rating = db_comment.rating
             for key, value in update_data.items():
                 if value is not None:
                     setattr(db_comment, key, value)
+            RecipeRatingRepository.apply_delta(db, db_comment.recipe_id, old_rating, db_comment.rating)
             db.commit()
             db.refresh(db_comment)
         return db_comment
@@ -49,7 +182,9 @@ class CommentRepository:
     def delete_comment(db: Session, comment_id: int) -> bool:
         db_comment = db.query(Comment).filter(Comment.id == comment_id).first()
         if db_comment:
+            RecipeRatingRepository.apply_delta(db, db_comment.recipe_id, db_comment.rating, None)
             db.delete(db_comment)
+            TableVersionRepository.bump(db, Comment.__tablename__)
             db.commit()
             return True
         return False
@@ -0,0 +1,133 @@
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased
+from typing import Dict, Iterable, Iterator, List, Tuple
+from models.ingredient import Ingredient, RecipeIngredient
+from models.recipe import Recipe
+from utils.ingredients import parse_ingredients
+
+
+class IngredientRepository:
+
+    @staticmethod
+    def get_ids_by_names(db: Session, names: Iterable[str]) -> Dict[str, int]:
+        names = list(names)
+        if not names:
+            return {}
+        rows = db.execute(select(Ingredient.name, Ingredient.id).where(Ingredient.name.in_(names)))
+        return {name: ingredient_id for name, ingredient_id in rows}
+
+    @staticmethod
+    def ensure_ids(db: Session, names: Iterable[str]) -> Dict[str, int]:
+        """
+        Ids of the named ingredients, adding the ones the dictionary lacks.
+        Does not commit. Costs one SELECT when every name is known, and one
+        INSERT and one more SELECT for the new ones otherwise, however many
+        names there are.
+        """
+        names = list(dict.fromkeys(names))
+        ids = IngredientRepository.get_ids_by_names(db, names)
+        missing = [name for name in names if name not in ids]
+        if not missing:
+            return ids
+        # Only the new names are inserted: on MySQL every row INSERT IGNORE
+        # skips still uses up an auto-increment value. IGNORE covers a
+        # concurrent writer adding the same name, and the read-back returns
+        # whichever row won.
+        statement = insert(Ingredient.__table__) \
+            .prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+        db.execute(statement, [{"name": name} for name in missing])
+        ids.update(IngredientRepository.get_ids_by_names(db, missing))
+        return ids
+
+    @staticmethod
+    def link(db: Session, names_by_recipe: Dict[int, List[str]], replace: bool = False) -> None:
+        """
+        Record each recipe's ingredients; with replace, its previous ones are
+        removed first. Does not commit: callers run it inside the same
+        transaction as the recipe write.
+        """
+        if not names_by_recipe:
+            return
+        ids = IngredientRepository.ensure_ids(db, (name for names in names_by_recipe.values() for name in names))
+        if replace:
+            db.execute(delete(RecipeIngredient.__table__)
+                       .where(RecipeIngredient.recipe_id.in_(list(names_by_recipe))))
+        rows = [{"recipe_id": recipe_id, "ingredient_id": ids[name]}
+                for recipe_id, names in names_by_recipe.items() for name in names]
+        if rows:
+            db.execute(insert(RecipeIngredient.__table__), rows)
+
+    @staticmethod
+    def unlink_recipe(db: Session, recipe_id: int) -> None:
+        """Forget a recipe's ingredients before deleting it. Does not commit."""
+        db.execute(delete(RecipeIngredient.__table__).where(RecipeIngredient.recipe_id == recipe_id))
+
+    @staticmethod
+    def find_recipe_ids(db: Session, ingredient_ids: List[int], match_all: bool, limit: int) -> List[Row]:
+        """
+        Recipes using any (or, with match_all, every) one of the ingredients,
+        as (recipe_id, matched) rows ranked by how many they use. Among equal
+        matches, recipes with fewer other ingredients come first.
+
+        Reads only ix_recipe_ingredients_ingredient_id_recipe_id and the
+        primary key of recipe_ingredients.
+        """
+        if not ingredient_ids:
+            return []
+        matched = func.count(RecipeIngredient.ingredient_id).label("matched")
+        others = aliased(RecipeIngredient)
+        total = select(func.count(others.ingredient_id)) \
+            .where(others.recipe_id == RecipeIngredient.recipe_id).scalar_subquery()
+        query = select(RecipeIngredient.recipe_id, matched) \
+            .where(RecipeIngredient.ingredient_id.in_(ingredient_ids)) \
+            .group_by(RecipeIngredient.recipe_id)
+        if match_all:
+            query = query.having(matched == len(ingredient_ids))
+        query = query.order_by(matched.desc(), total, RecipeIngredient.recipe_id).limit(limit)
+        return db.execute(query).all()
+
+    @staticmethod
+    def get_matched_names(db: Session, recipe_ids: List[int], ingredient_ids: List[int]) -> List[Tuple[int, str]]:
+        """(recipe_id, ingredient name) for the given ingredients of the given recipes"""
+        if not recipe_ids or not ingredient_ids:
+            return []
+        return db.execute(
+            select(RecipeIngredient.recipe_id, Ingredient.name)
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .where(RecipeIngredient.recipe_id.in_(recipe_ids), RecipeIngredient.ingredient_id.in_(ingredient_ids))
+            .order_by(RecipeIngredient.recipe_id, Ingredient.name)
+        ).all()
+
+    @staticmethod
+    def recipe_ingredient_names(db: Session, batch_size: int) -> Iterator[Row]:
+        """(recipe_id, ingredient name) for every recipe, grouped by recipe in id order"""
+        return db.execute(
+            select(RecipeIngredient.recipe_id, Ingredient.name)
+            .join(Ingredient, Ingredient.id == RecipeIngredient.ingredient_id)
+            .order_by(RecipeIngredient.recipe_id)
+            .execution_options(yield_per=batch_size)
+        )
+
+    @staticmethod
+    def backfill(db: Session, batch_size: int = 500) -> int:
+        """
+        Re-extract the ingredients of every recipe, batch_size recipes per
+        transaction, walking the table by id. Safe to re-run, e.g. after the
+        extraction rules change.
+
+        Returns:
+            Number of recipes processed
+        """
+        processed = 0
+        last_id = 0
+        while True:
+            batch = db.execute(
+                select(Recipe.id, Recipe.ingredients).where(Recipe.id > last_id).order_by(Recipe.id).limit(batch_size)
+            ).all()
+            if not batch:
+                return processed
+            last_id = batch[-1].id
+            IngredientRepository.link(db, {row.id: parse_ingredients(row.ingredients) for row in batch}, replace=True)
+            db.commit()
+            processed += len(batch)
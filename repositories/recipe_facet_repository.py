@@ -0,0 +1,62 @@
+from collections import Counter
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional, Tuple
+from models.recipe import Recipe
+from models.recipe_facet_count import NO_ORIGIN, RecipeFacetCount
+from utils.db_upsert import increment_statement
+
+FacetPair = Tuple[str, Optional[str]]
+
+
+def facet_pair(recipe) -> FacetPair:
+    """A recipe's (dish_type, origin) (anything with those attributes)"""
+    return recipe.dish_type, recipe.origin
+
+
+class RecipeFacetRepository:
+
+    @staticmethod
+    def add_counts(db: Session, deltas: Dict[FacetPair, int]) -> None:
+        """
+        Add deltas to the counts of (dish_type, origin) pairs in one
+        statement. Does not commit: callers run it inside the same
+        transaction as the recipe write.
+        """
+        rows = [{"dish_type": dish_type, "origin": origin or NO_ORIGIN, "recipe_count": delta}
+                for (dish_type, origin), delta in deltas.items() if delta]
+        if rows:
+            statement = increment_statement(db, RecipeFacetCount.__table__, ["dish_type", "origin"], "recipe_count")
+            db.execute(statement, rows)
+
+    @staticmethod
+    def apply_delta(db: Session, old: Optional[FacetPair], new: Optional[FacetPair]) -> None:
+        """Move one recipe between pairs (None: created or deleted). Does not commit."""
+        if old == new:
+            return
+        deltas = Counter()
+        if old is not None:
+            deltas[old] -= 1
+        if new is not None:
+            deltas[new] += 1
+        RecipeFacetRepository.add_counts(db, deltas)
+
+    @staticmethod
+    def get_counts(db: Session) -> List[Row]:
+        """(dish_type, origin or None, count) of every pair with recipes"""
+        origin = func.nullif(RecipeFacetCount.origin, NO_ORIGIN)
+        return db.execute(
+            select(RecipeFacetCount.dish_type, origin, RecipeFacetCount.recipe_count)
+            .where(RecipeFacetCount.recipe_count > 0)
+        ).all()
+
+    @staticmethod
+    def rebuild_all(db: Session) -> int:
+        """Recompute every pair's count from the recipes with one INSERT ... SELECT"""
+        db.query(RecipeFacetCount).delete(synchronize_session=False)
+        origin = func.coalesce(Recipe.origin, NO_ORIGIN)
+        query = select(Recipe.dish_type, origin, func.count(Recipe.id)).group_by(Recipe.dish_type, origin)
+        db.execute(insert(RecipeFacetCount).from_select(["dish_type", "origin", "recipe_count"], query))
+        db.commit()
+        return db.query(RecipeFacetCount).count()
@@ -0,0 +1,108 @@
+from sqlalchemy import case, func, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from typing import Optional
+from models.comment import Comment
+from models.recipe_rating import RecipeRating, RATING_BUCKETS, rating_bucket
+
+
+def _bucket_column(bucket: int):
+    return getattr(RecipeRating, f"stars_{bucket}")
+
+
+def _bucket_count(bucket: int):
+    # SQL twin of rating_bucket(): count ratings whose nearest whole star is `bucket`
+    low = bucket - 0.5
+    if bucket == RATING_BUCKETS - 1:
+        condition = Comment.rating >= low
+    elif bucket == 0:
+        condition = Comment.rating < bucket + 0.5
+    else:
+        condition = (Comment.rating >= low) & (Comment.rating < bucket + 0.5)
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+class RecipeRatingRepository:
+
+    @staticmethod
+    def get_by_recipe_id(db: Session, recipe_id: int) -> Optional[RecipeRating]:
+        return db.query(RecipeRating).filter(RecipeRating.recipe_id == recipe_id).first()
+
+    @staticmethod
+    def apply_delta(db: Session, recipe_id: int, old_rating: Optional[float], new_rating: Optional[float]) -> None:
+        """
+        Adjust a recipe's aggregates for one rating change. Does not commit:
+        callers run it inside the same transaction as the comment write.
+        """
+        if old_rating == new_rating:
+            return
+
+        count_delta = 0
+        sum_delta = 0.0
+        bucket_deltas = {}
+        if old_rating is not None:
+            count_delta -= 1
+            sum_delta -= old_rating
+            bucket = rating_bucket(old_rating)
+            bucket_deltas[bucket] = bucket_deltas.get(bucket, 0) - 1
+        if new_rating is not None:
+            count_delta += 1
+            sum_delta += new_rating
+            bucket = rating_bucket(new_rating)
+            bucket_deltas[bucket] = bucket_deltas.get(bucket, 0) + 1
+
+        values = {
+            RecipeRating.rating_count: RecipeRating.rating_count + count_delta,
+            RecipeRating.rating_sum: RecipeRating.rating_sum + sum_delta,
+        }
+        for bucket, delta in bucket_deltas.items():
+            if delta:
+                values[_bucket_column(bucket)] = _bucket_column(bucket) + delta
+
+        # Relative UPDATE: row-locked and atomic, so concurrent writers never lose increments
+        updated = db.query(RecipeRating).filter(RecipeRating.recipe_id == recipe_id) \
+            .update(values, synchronize_session=False)
+        if updated:
+            return
+
+        # No aggregate row yet (first rating, or data from before aggregates
+        # existed): compute it from the comments, including this change.
+        db.flush()
+        try:
+            with db.begin_nested():
+                RecipeRatingRepository.rebuild_recipe(db, recipe_id)
+        except IntegrityError:
+            # A concurrent writer created the row first; its snapshot may not
+            # include our change, so apply the delta to it instead.
+            db.query(RecipeRating).filter(RecipeRating.recipe_id == recipe_id) \
+                .update(values, synchronize_session=False)
+
+    @staticmethod
+    def _aggregate_query(db: Session):
+        columns = [
+            Comment.recipe_id,
+            func.count(Comment.rating),
+            func.coalesce(func.sum(Comment.rating), 0.0),
+        ] + [_bucket_count(bucket) for bucket in range(RATING_BUCKETS)]
+        return db.query(*columns).filter(Comment.rating.isnot(None)).group_by(Comment.recipe_id)
+
+    @staticmethod
+    def _insert_from(query):
+        target = [RecipeRating.recipe_id, RecipeRating.rating_count, RecipeRating.rating_sum] + \
+                 [_bucket_column(bucket) for bucket in range(RATING_BUCKETS)]
+        return insert(RecipeRating).from_select([column.key for column in target], query.subquery().select())
+
+    @staticmethod
+    def rebuild_recipe(db: Session, recipe_id: int) -> None:
+        """Recompute one recipe's aggregates from its comments. Does not commit."""
+        db.query(RecipeRating).filter(RecipeRating.recipe_id == recipe_id).delete(synchronize_session=False)
+        query = RecipeRatingRepository._aggregate_query(db).filter(Comment.recipe_id == recipe_id)
+        db.execute(RecipeRatingRepository._insert_from(query))
+
+    @staticmethod
+    def rebuild_all(db: Session) -> int:
+        """Recompute every recipe's aggregates from scratch with one INSERT ... SELECT"""
+        db.query(RecipeRating).delete(synchronize_session=False)
+        db.execute(RecipeRatingRepository._insert_from(RecipeRatingRepository._aggregate_query(db)))
+        db.commit()
+        return db.query(RecipeRating).count()
@@ -1,6 +1,51 @@
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from collections import Counter
+from datetime import datetime
+from operator import attrgetter
+from sqlalchemy import and_, bindparam, func, insert, or_, select, text, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, joinedload
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from models.recipe import Recipe
+from models.comment import Comment
+from models.recipe_rating import RecipeRating
+from repositories.ingredient_repository import IngredientRepository
+from repositories.recipe_facet_repository import RecipeFacetRepository, facet_pair
+from repositories.table_version_repository import TableVersionRepository
+from utils.db_errors import UserNotFoundError, is_foreign_key_violation
+from utils.ingredients import parse_ingredients
+from utils.keyset import walk_keyset, walk_select
+from utils.prep_time import parse_minutes
+
+
+# Columns written by exports, in output order
+EXPORT_COLUMNS = (Recipe.id, Recipe.title, Recipe.dish_type, Recipe.ingredients, Recipe.instructions,
+                  Recipe.preparation_time, Recipe.origin, Recipe.servings, Recipe.user_id,
+                  Recipe.creation_date, Recipe.updated_at)
+
+# GET /recipes filters and the predicate each compiles to. Equality filters
+# come first in the composite indexes on (dish_type, preparation_minutes) and
+# (origin, dish_type, preparation_minutes); author uses ix_recipes_user_id_title.
+RECIPE_FILTERS = {
+    "dish_type": lambda value: Recipe.dish_type == value,
+    "origin": lambda value: Recipe.origin == value,
+    "author": lambda value: Recipe.user_id == value,
+    "min_servings": lambda value: Recipe.servings >= value,
+    "max_servings": lambda value: Recipe.servings <= value,
+    "max_minutes": lambda value: Recipe.preparation_minutes <= value,
+}
+
+# MySQL auto_increment_increment per server, read once: ids of a multi-row
+# insert are spaced by it (more than 1 on multi-primary and Galera clusters)
+_auto_increment_steps: Dict[str, int] = {}
+
+
+def _auto_increment_step(db: Session) -> int:
+    key = str(db.get_bind().url)
+    step = _auto_increment_steps.get(key)
+    if step is None:
+        step = _auto_increment_steps[key] = int(db.execute(text("SELECT @@auto_increment_increment")).scalar())
+    return step
 
 
 class RecipeRepository:
@@ -21,43 +66,277 @@ class RecipeRepository:
     def search_recipes_by_title(db: Session, title: str) -> List[Recipe]:
         return db.query(Recipe).filter(Recipe.title.ilike(f"%{title}%")).all()
 
+    @staticmethod
+    def search_user_recipes(db: Session, user_id: int, title: str,
+                            after: Optional[Dict[str, Any]], limit: int) -> List[Recipe]:
+        # Served by ix_recipes_user_id_title: the user_id prefix bounds the scan
+        # to one owner and rows come back already ordered by (title, id).
+        pattern = "%" + title.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        query = RecipeRepository.query_with_authors(db).filter(
+            Recipe.user_id == user_id,
+            Recipe.title.ilike(pattern, escape="\\")
+        )
+        if after is not None:
+            query = query.filter(or_(
+                Recipe.title > after["title"],
+                and_(Recipe.title == after["title"], Recipe.id > after["id"])
+            ))
+        return query.order_by(Recipe.title, Recipe.id).limit(limit).all()
+
     @staticmethod
     def get_all_recipes(db: Session, skip: int = 0, limit: int = 100) -> List[Recipe]:
         return db.query(Recipe).offset(skip).limit(limit).all()
 
+    # Version probes for conditional GETs: a few indexed columns that change
+    # whenever the rendered recipe would, read without building the response.
+
+    @staticmethod
+    def get_version(db: Session, recipe_id: int) -> Optional[Tuple]:
+        """The recipe's and its rating aggregates' updated_at, or None if it does not exist"""
+        return db.query(Recipe.id, Recipe.updated_at, RecipeRating.updated_at) \
+            .outerjoin(RecipeRating, RecipeRating.recipe_id == Recipe.id) \
+            .filter(Recipe.id == recipe_id).first()
+
+    @staticmethod
+    def get_collection_version(db: Session) -> Tuple:
+        """
+        Newest id, newest recipe and rating updated_at, and the delete
+        counter. Each is one index or primary-key lookup, so the probe costs
+        the same whatever the table size.
+        """
+        return db.execute(select(
+            select(func.max(Recipe.id)).scalar_subquery(),
+            select(func.max(Recipe.updated_at)).scalar_subquery(),
+            select(func.max(RecipeRating.updated_at)).scalar_subquery(),
+            TableVersionRepository.version_of(Recipe.__tablename__),
+        )).one()
+
+    # Eager-loaded variants: the author and rating aggregates are fetched in the
+    # same SELECT through LEFT OUTER JOINs, so touching recipe.user or
+    # recipe.rating afterwards costs no extra query.
+
+    @staticmethod
+    def query_with_authors(db: Session):
+        return db.query(Recipe).options(joinedload(Recipe.user), joinedload(Recipe.rating))
+
+    @staticmethod
+    def get_recipe_by_id_with_authors(db: Session, recipe_id: int) -> Optional[Recipe]:
+        return RecipeRepository.query_with_authors(db).filter(Recipe.id == recipe_id).first()
+
+    @staticmethod
+    def get_all_recipes_with_authors(db: Session, skip: int = 0, limit: int = 100) -> List[Recipe]:
+        return RecipeRepository.query_with_authors(db).offset(skip).limit(limit).all()
+
+    @staticmethod
+    def get_recipes_after(db: Session, after_id: Optional[int], limit: int) -> List[Recipe]:
+        # Keyset pagination: seek past the last id seen instead of OFFSET, so
+        # every page is a primary-key range scan no matter how deep it is.
+        query = RecipeRepository.query_with_authors(db)
+        if after_id is not None:
+            query = query.filter(Recipe.id > after_id)
+        return query.order_by(Recipe.id).limit(limit).all()
+
+    @staticmethod
+    def filter_predicates(filters: Dict[str, Any]) -> List:
+        return [RECIPE_FILTERS[name](value) for name, value in filters.items()]
+
+    @staticmethod
+    def filter_recipes_after(db: Session, filters: Dict[str, Any], after_id: Optional[int],
+                             limit: int) -> List[Recipe]:
+        """Recipes matching every filter in RECIPE_FILTERS, keyset-paged by id"""
+        query = RecipeRepository.query_with_authors(db).filter(*RecipeRepository.filter_predicates(filters))
+        if after_id is not None:
+            query = query.filter(Recipe.id > after_id)
+        return query.order_by(Recipe.id).limit(limit).all()
+
+    @staticmethod
+    def count_by_dish_type_and_origin(db: Session, filters: Dict[str, Any],
+                                      recipe_ids: Optional[List[int]] = None) -> List[Row]:
+        """
+        Matching recipes per (dish_type, origin) pair in one GROUP BY; pairs
+        are few, so per-facet counts are summed from them by the caller.
+        """
+        query = select(Recipe.dish_type, Recipe.origin, func.count(Recipe.id)) \
+            .where(*RecipeRepository.filter_predicates(filters))
+        if recipe_ids is not None:
+            query = query.where(Recipe.id.in_(recipe_ids))
+        return db.execute(query.group_by(Recipe.dish_type, Recipe.origin)).all()
+
+    @staticmethod
+    def facet_rows(db: Session, batch_size: int) -> Iterator[Row]:
+        """(id, dish_type, origin) of every recipe, one id-range query per batch_size rows"""
+        return walk_select(db, select(Recipe.id, Recipe.dish_type, Recipe.origin), (Recipe.id,), batch_size)
+
+    @staticmethod
+    def stream_recipes(db: Session, batch_size: int) -> Iterator[Recipe]:
+        """Recipes in id order with authors and ratings, one keyset page per batch_size rows"""
+        return walk_keyset(lambda after_id: RecipeRepository.get_recipes_after(db, after_id, batch_size),
+                           batch_size, attrgetter("id"))
+
+    @staticmethod
+    def export_rows(db: Session, batch_size: int, since: Optional[datetime] = None) -> Iterator[Row]:
+        """
+        Plain column tuples for EXPORT_COLUMNS, one keyset page per
+        batch_size rows. With since, only rows updated at or after it, read
+        along the updated_at index in (updated_at, id) order.
+        """
+        if since is None:
+            return walk_select(db, select(*EXPORT_COLUMNS), (Recipe.id,), batch_size)
+        return walk_select(db, select(*EXPORT_COLUMNS).where(Recipe.updated_at >= since),
+                           (Recipe.updated_at, Recipe.id), batch_size)
+
+    @staticmethod
+    def get_recipes_by_ids_with_authors(db: Session, recipe_ids: List[int]) -> List[Recipe]:
+        if not recipe_ids:
+            return []
+        return RecipeRepository.query_with_authors(db).filter(Recipe.id.in_(recipe_ids)).all()
+
+    @staticmethod
+    def get_recipes_by_user_with_authors(db: Session, user_id: int) -> List[Recipe]:
+        return RecipeRepository.query_with_authors(db).filter(Recipe.user_id == user_id).all()
+
+    @staticmethod
+    def get_recipes_by_dish_type_with_authors(db: Session, dish_type: str) -> List[Recipe]:
+        return RecipeRepository.query_with_authors(db).filter(Recipe.dish_type == dish_type).all()
+
     @staticmethod
     def create_recipe(db: Session, recipe_data: dict) -> Recipe:
+        """
+        Insert a recipe with its facet count and ingredient links, commit, and
+        return it with its author loaded.
+
+        Round trips: the recipe INSERT, the facet-count upsert, the
+        ingredient id SELECT (plus an INSERT and a SELECT when some names
+        are new), the link INSERT, COMMIT and the read-back SELECT. The
+        counter and the links share the recipe's transaction so the facet
+        counts and the ingredient index never disagree with the table.
+        """
         db_recipe = Recipe(
             title=recipe_data["title"],
             dish_type=recipe_data["dish_type"],
             ingredients=recipe_data["ingredients"],
             instructions=recipe_data["instructions"],
             preparation_time=recipe_data.get("preparation_time"),
+            preparation_minutes=parse_minutes(recipe_data.get("preparation_time")),
             origin=recipe_data.get("origin"),
             servings=recipe_data.get("servings"),
             user_id=recipe_data["user_id"]
         )
+        # No SELECT to check the author first: the foreign key does that as
+        # part of the INSERT, and a violation is translated below.
         db.add(db_recipe)
+        try:
+            db.flush()
+        except IntegrityError as e:
+            db.rollback()
+            if is_foreign_key_violation(e):
+                raise UserNotFoundError(recipe_data["user_id"]) from e
+            raise
+        recipe_id = db_recipe.id
+        RecipeFacetRepository.apply_delta(db, None, facet_pair(db_recipe))
+        IngredientRepository.link(db, {recipe_id: parse_ingredients(recipe_data["ingredients"])})
         db.commit()
-        db.refresh(db_recipe)
-        return db_recipe
+        # Reload the expired row with its author in one SELECT, instead of a
+        # refresh followed by lazy loads of user and rating.
+        return RecipeRepository.get_recipe_by_id_with_authors(db, recipe_id)
+
+    @staticmethod
+    def insert_recipes(db: Session, rows: List[dict]) -> List[int]:
+        """
+        Insert rows in one multi-row INSERT, link their ingredients in one
+        more, and commit; returns the new ids in row order.
+
+        Raises:
+            UserNotFoundError: If a row references a user that does not exist
+        """
+        now = datetime.utcnow()
+        rows = [{**row, "preparation_minutes": parse_minutes(row.get("preparation_time")),
+                 "creation_date": now, "updated_at": now} for row in rows]
+        # Executed as an executemany of one cached statement: SQLAlchemy's
+        # insertmanyvalues (RETURNING dialects) and mysql-connector's
+        # executemany both send it as a single INSERT ... VALUES (...), (...).
+        # sort_by_parameter_order returns the ids in row order; dialects with
+        # no way to guarantee that (SQLite) fall back to one INSERT per row.
+        statement = insert(Recipe.__table__)
+        try:
+            if db.get_bind().dialect.insert_returning:
+                ids = list(db.execute(statement.returning(Recipe.__table__.c.id, sort_by_parameter_order=True),
+                                      rows).scalars())
+            else:
+                # MySQL: LAST_INSERT_ID() is the first row's id, and InnoDB gives
+                # the rows of a simple multi-row insert one block of ids spaced
+                # by auto_increment_increment.
+                step = _auto_increment_step(db)
+                first_id = db.execute(statement, rows).lastrowid
+                ids = list(range(first_id, first_id + step * len(rows), step))
+            RecipeFacetRepository.add_counts(db, Counter((row["dish_type"], row.get("origin")) for row in rows))
+            IngredientRepository.link(db, {recipe_id: parse_ingredients(row["ingredients"])
+                                           for recipe_id, row in zip(ids, rows)})
+        except SQLAlchemyError as e:
+            db.rollback()
+            if isinstance(e, IntegrityError) and is_foreign_key_violation(e):
+                raise UserNotFoundError(rows[0]["user_id"]) from e
+            raise
+        db.commit()
+        return ids
 
     @staticmethod
     def update_recipe(db: Session, recipe_id: int, update_data: dict) -> Optional[Recipe]:
         db_recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
         if db_recipe:
+            old_pair = facet_pair(db_recipe)
             for key, value in update_data.items():
                 if value is not None:
                     setattr(db_recipe, key, value)
+                    if key == "preparation_time":
+                        db_recipe.preparation_minutes = parse_minutes(value)
+            RecipeFacetRepository.apply_delta(db, old_pair, facet_pair(db_recipe))
+            if update_data.get("ingredients") is not None:
+                IngredientRepository.link(db, {recipe_id: parse_ingredients(db_recipe.ingredients)}, replace=True)
             db.commit()
             db.refresh(db_recipe)
         return db_recipe
 
+    @staticmethod
+    def backfill_preparation_minutes(db: Session, batch_size: int = 1000) -> int:
+        """
+        Parse preparation_time into preparation_minutes for rows that lack it,
+        batch_size rows per SELECT, UPDATE and commit. Walks the table by id,
+        so rows whose text cannot be parsed are visited once.
+
+        Returns:
+            Number of rows given a value
+        """
+        statement = update(Recipe.__table__) \
+            .where(Recipe.__table__.c.id == bindparam("row_id")) \
+            .values(preparation_minutes=bindparam("minutes"))
+        filled = 0
+        last_id = 0
+        while True:
+            batch = db.execute(
+                select(Recipe.id, Recipe.preparation_time)
+                .where(Recipe.id > last_id, Recipe.preparation_time.isnot(None),
+                       Recipe.preparation_minutes.is_(None))
+                .order_by(Recipe.id).limit(batch_size)
+            ).all()
+            if not batch:
+                return filled
+            last_id = batch[-1].id
+            values = [{"row_id": row.id, "minutes": parse_minutes(row.preparation_time)} for row in batch]
+            values = [value for value in values if value["minutes"] is not None]
+            if values:
+                db.execute(statement, values)
+                filled += len(values)
+            db.commit()
+
     @staticmethod
     def delete_recipe(db: Session, recipe_id: int) -> bool:
         db_recipe = db.query(Recipe).filter(Recipe.id == recipe_id).first()
         if db_recipe:
+            IngredientRepository.unlink_recipe(db, recipe_id)
+            RecipeFacetRepository.apply_delta(db, facet_pair(db_recipe), None)
             db.delete(db_recipe)
+            TableVersionRepository.bump(db, Recipe.__tablename__)
             db.commit()
             return True
         return False
@@ -67,5 +346,10 @@ class RecipeRepository:
         return db.query(Recipe).join(Recipe.user).filter(Recipe.id == recipe_id).first()
 
     @staticmethod
-    def get_recipes_with_comments_count(db: Session, skip: int = 0, limit: int = 100) -> List[Recipe]:
-        return db.query(Recipe).offset(skip).limit(limit).all()
\ No newline at end of file
+    def get_recipes_with_comments_count(db: Session, skip: int = 0, limit: int = 100) -> List[Tuple[Recipe, int]]:
+        counts = db.query(Comment.recipe_id, func.count(Comment.id).label("comments_count")) \
+            .group_by(Comment.recipe_id).subquery()
+        return db.query(Recipe, func.coalesce(counts.c.comments_count, 0)) \
+            .outerjoin(counts, counts.c.recipe_id == Recipe.id) \
+            .options(joinedload(Recipe.user), joinedload(Recipe.rating)) \
+            .order_by(Recipe.id).offset(skip).limit(limit).all()
\ No newline at end of file
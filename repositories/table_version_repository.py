@@ -0,0 +1,19 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from models.table_version import TableVersion
+from utils.db_upsert import increment_statement
+
+
+class TableVersionRepository:
+
+    @staticmethod
+    def bump(db: Session, table_name: str) -> None:
+        """Count a delete from table_name. Does not commit: run it in the delete's transaction."""
+        statement = increment_statement(db, TableVersion.__table__, ["table_name"], "version")
+        db.execute(statement, {"table_name": table_name, "version": 1})
+
+    @staticmethod
+    def version_of(table_name: str):
+        """Scalar subquery for a table's delete counter: a primary-key lookup, 0 before the first delete"""
+        return select(func.coalesce(func.max(TableVersion.version), 0)) \
+            .where(TableVersion.table_name == table_name).scalar_subquery()
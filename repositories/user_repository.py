@@ -1,15 +1,23 @@
+from datetime import datetime
+from operator import attrgetter
+from sqlalchemy import select
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional
 from models.user import User
-import hashlib
+from utils.keyset import walk_keyset, walk_select
+from utils.passwords import PasswordHasherBusy, password_hasher, dummy_hash
+
+# Columns written by exports, in output order. Never the password hash.
+EXPORT_COLUMNS = (User.id, User.name, User.email, User.registration_date)
 
 
 class UserRepository:
 
     @staticmethod
     def hash_password(password: str) -> str:
-
-        return hashlib.sha256(password.encode()).hexdigest()
+        # Salted scrypt on the bounded hashing pool; raises PasswordHasherBusy when it is full
+        return password_hasher.hash(password)
 
     @staticmethod
     def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
@@ -23,6 +31,36 @@ class UserRepository:
     def get_all_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
         return db.query(User).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_users_by_ids(db: Session, user_ids: List[int]) -> List[User]:
+        if not user_ids:
+            return []
+        return db.query(User).filter(User.id.in_(user_ids)).all()
+
+    @staticmethod
+    def get_users_after(db: Session, after_id: Optional[int], limit: int) -> List[User]:
+        query = db.query(User)
+        if after_id is not None:
+            query = query.filter(User.id > after_id)
+        return query.order_by(User.id).limit(limit).all()
+
+    @staticmethod
+    def stream_users(db: Session, batch_size: int) -> Iterator[User]:
+        """Users in id order, one keyset page per batch_size rows"""
+        return walk_keyset(lambda after_id: UserRepository.get_users_after(db, after_id, batch_size),
+                           batch_size, attrgetter("id"))
+
+    @staticmethod
+    def export_rows(db: Session, batch_size: int, since: Optional[datetime] = None) -> Iterator[Row]:
+        """
+        Plain column tuples for EXPORT_COLUMNS by keyset pages; users have no
+        updated_at, so since filters on registration
+        """
+        query = select(*EXPORT_COLUMNS)
+        if since is not None:
+            query = query.where(User.registration_date >= since)
+        return walk_select(db, query, (User.id,), batch_size)
+
     @staticmethod
     def create_user(db: Session, user_data: dict) -> User:
         hashed_password = UserRepository.hash_password(user_data["password"])
@@ -60,8 +98,18 @@ class UserRepository:
 
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str) -> Optional[User]:
-        hashed_password = UserRepository.hash_password(password)
-        return db.query(User).filter(
-            User.email == email,
-            User.password == hashed_password
-        ).first()
\ No newline at end of file
+        # Salted hashes cannot be compared in SQL: fetch by email, verify here
+        user = UserRepository.get_user_by_email(db, email)
+        matches, needs_rehash = password_hasher.verify(password, user.password if user else dummy_hash())
+        if not user or not matches:
+            return None
+        if needs_rehash:
+            # Legacy SHA-256 or outdated scrypt cost: upgrade while we know the
+            # password. Best effort: when the pool is full the login still
+            # succeeds and a later one upgrades the hash.
+            try:
+                user.password = password_hasher.hash(password)
+            except PasswordHasherBusy:
+                return user
+            db.commit()
+        return user
\ No newline at end of file
@@ -1,9 +1,13 @@
 from .user_schemas import UserCreate, UserUpdate, UserResponse, UserLogin
 from .comment_schemas import CommentCreate, CommentUpdate, CommentResponse, CommentWithUserResponse
-from .recipe_schemas import RecipeCreate, RecipeUpdate, RecipeResponse, RecipeWithUserResponse, RecipeWithCommentsResponse
+from .recipe_schemas import RecipeCreate, RecipeUpdate, RecipeResponse, RecipeWithUserResponse, RecipeWithCommentsResponse, \
+    RecipeSearchResult, RecipeBulkRowResult, RecipeBulkResponse, FacetCount, RecipeFacetsResponse, RecipeIngredientMatch, \
+    RecipePantryMatch
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin",
     "CommentCreate", "CommentUpdate", "CommentResponse", "CommentWithUserResponse",
-    "RecipeCreate", "RecipeUpdate", "RecipeResponse", "RecipeWithUserResponse", "RecipeWithCommentsResponse"
+    "RecipeCreate", "RecipeUpdate", "RecipeResponse", "RecipeWithUserResponse", "RecipeWithCommentsResponse",
+    "RecipeSearchResult", "RecipeBulkRowResult", "RecipeBulkResponse", "FacetCount", "RecipeFacetsResponse",
+    "RecipeIngredientMatch", "RecipePantryMatch"
 ]
\ No newline at end of file
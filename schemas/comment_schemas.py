@@ -19,6 +19,7 @@ class CommentUpdate(BaseModel):
 class CommentResponse(CommentBase):
     id: int
     comment_date: datetime
+    updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
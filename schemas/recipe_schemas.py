@@ -1,6 +1,6 @@
 from pydantic import BaseModel
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict
 
 
 class RecipeBase(BaseModel):
@@ -30,8 +30,13 @@ class RecipeUpdate(BaseModel):
 class RecipeResponse(RecipeBase):
     id: int
     user_id: int
+    preparation_minutes: Optional[int] = None
     creation_date: datetime
+    updated_at: Optional[datetime] = None
     user_name: Optional[str] = None
+    rating_count: int = 0
+    rating_avg: Optional[float] = None
+    rating_histogram: List[int] = [0, 0, 0, 0, 0, 0]
 
     class Config:
         from_attributes = True
@@ -44,4 +49,44 @@ class RecipeWithUserResponse(RecipeResponse):
 
 class RecipeWithCommentsResponse(RecipeResponse):
     comments: List[dict] = []
-    comments_count: int = 0
\ No newline at end of file
+    comments_count: int = 0
+    comments_next_cursor: Optional[str] = None
+
+
+class RecipeBulkRowResult(BaseModel):
+    index: int
+    status: str
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class RecipeBulkResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[RecipeBulkRowResult]
+
+
+class RecipeSearchResult(RecipeResponse):
+    score: float
+    highlights: Dict[str, str] = {}
+
+
+class RecipeIngredientMatch(RecipeResponse):
+    matched_count: int
+    matched_ingredients: List[str] = []
+
+
+class RecipePantryMatch(RecipeIngredientMatch):
+    missing_count: int
+    missing_ingredients: List[str] = []
+
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+
+class RecipeFacetsResponse(BaseModel):
+    total: int
+    dish_type: List[FacetCount] = []
+    origin: List[FacetCount] = []
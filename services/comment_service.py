@@ -1,7 +1,10 @@
+from datetime import datetime
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from models.comment import Comment
-from repositories.comment_repository import CommentRepository
+from repositories.comment_repository import COMMENT_SORTS, CommentRepository
+from utils.multi_get import in_requested_order
+from utils.pagination import split_page
 from schemas.comment_schemas import CommentCreate, CommentUpdate, CommentResponse, CommentWithUserResponse
 
 
@@ -29,6 +32,86 @@ class CommentService:
         comments = CommentRepository.get_all_comments(db, skip, limit)
         return [CommentResponse.from_orm(comment) for comment in comments]
 
+    @staticmethod
+    def get_comments_page(db: Session, after_id: Optional[int], limit: int) -> Tuple[List[CommentResponse], Optional[str]]:
+        comments = CommentRepository.get_comments_after(db, after_id, limit + 1)
+        page, next_cursor = split_page(comments, limit, lambda comment: {"id": comment.id})
+        return [CommentResponse.from_orm(comment) for comment in page], next_cursor
+
+    @staticmethod
+    def get_recipe_comments_page(db: Session, recipe_id: int, sort: str, after: Optional[Dict[str, Any]],
+                                 limit: int) -> Tuple[List[CommentWithUserResponse], Optional[str]]:
+        """
+        One page of a recipe's comments with their authors in the given order.
+
+        Args:
+            sort: One of COMMENT_SORTS
+            after: Decoded cursor of the previous page, or None for the first page
+
+        Raises:
+            ValueError: If the cursor is malformed or was issued for another sort
+        """
+        if sort not in COMMENT_SORTS:
+            raise ValueError(f"sort must be one of: {', '.join(COMMENT_SORTS)}")
+        if after is not None:
+            if after.get("sort") != sort or not isinstance(after.get("id"), int) or "rating" not in after:
+                raise ValueError("Invalid cursor")
+            try:
+                after = {**after, "comment_date": datetime.fromisoformat(after["comment_date"])}
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+        comments = CommentRepository.get_recipe_comments_page(db, recipe_id, sort, after, limit + 1)
+        page, next_cursor = split_page(comments, limit, lambda comment: {
+            "sort": sort, "rating": comment.rating,
+            "comment_date": comment.comment_date.isoformat(), "id": comment.id
+        })
+        return [CommentService._with_user(comment) for comment in page], next_cursor
+
+    @staticmethod
+    def iter_comments(db: Session, batch_size: int) -> Iterator[CommentResponse]:
+        for comment in CommentRepository.stream_comments(db, batch_size):
+            yield CommentResponse.from_orm(comment)
+
+    @staticmethod
+    def get_comments_by_ids(db: Session, comment_ids: List[int]) -> Tuple[List[CommentWithUserResponse], List[int]]:
+        """Comments in the requested order with their authors, plus the ids that do not exist"""
+        comments = CommentRepository.get_comments_by_ids_with_users(db, comment_ids)
+        found, missing = in_requested_order(comment_ids, comments)
+        return [CommentService._with_user(comment) for comment in found], missing
+
+    @staticmethod
+    def _with_user(comment: Comment) -> CommentWithUserResponse:
+        # Built in one step from the row and its joined author
+        return CommentWithUserResponse(
+            id=comment.id,
+            content=comment.content,
+            rating=comment.rating,
+            user_id=comment.user_id,
+            recipe_id=comment.recipe_id,
+            comment_date=comment.comment_date,
+            updated_at=comment.updated_at,
+            user_name=comment.user.name,
+            user_email=comment.user.email
+        )
+
+    @staticmethod
+    def iter_recipe_comments_with_users(db: Session, batch_size: int,
+                                        recipe_id: int) -> Iterator[CommentWithUserResponse]:
+        for comment in CommentRepository.stream_comments(db, batch_size, recipe_id):
+            yield CommentService._with_user(comment)
+
+    @staticmethod
+    def get_comment_version(db: Session, comment_id: int) -> Optional[Tuple]:
+        return CommentRepository.get_version(db, comment_id)
+
+    @staticmethod
+    def get_recipe_comments_version(db: Session, recipe_id: int) -> Tuple:
+        return CommentRepository.get_recipe_comments_version(db, recipe_id)
+
+    @staticmethod
+    def get_comments_version(db: Session) -> Tuple:
+        return CommentRepository.get_collection_version(db)
+
     @staticmethod
     def create_comment(db: Session, comment_data: CommentCreate) -> CommentResponse:
         if comment_data.rating is not None and (comment_data.rating < 0 or comment_data.rating > 5):
@@ -64,11 +147,5 @@ class CommentService:
 
     @staticmethod
     def get_recipe_comments_with_users(db: Session, recipe_id: int) -> List[CommentWithUserResponse]:
-        comments = CommentRepository.get_comments_by_recipe(db, recipe_id)
-        result = []
-        for comment in comments:
-            response_data = CommentResponse.from_orm(comment).model_dump()
-            response_data["user_name"] = comment.user.name
-            response_data["user_email"] = comment.user.email
-            result.append(CommentWithUserResponse(**response_data))
-        return result
\ No newline at end of file
+        comments = CommentRepository.get_comments_by_recipe_with_users(db, recipe_id)
+        return [CommentService._with_user(comment) for comment in comments]
@@ -0,0 +1,30 @@
+from datetime import datetime
+from sqlalchemy.orm import Session
+from typing import Iterator, List, Optional, Sequence
+from repositories import comment_repository, recipe_repository, user_repository
+from repositories.comment_repository import CommentRepository
+from repositories.recipe_repository import RecipeRepository
+from repositories.user_repository import UserRepository
+
+# Exportable tables: the repository query and its output columns
+_EXPORTS = {
+    "recipes": (RecipeRepository.export_rows, recipe_repository.EXPORT_COLUMNS),
+    "comments": (CommentRepository.export_rows, comment_repository.EXPORT_COLUMNS),
+    "users": (UserRepository.export_rows, user_repository.EXPORT_COLUMNS),
+}
+
+EXPORT_ENTITIES = tuple(_EXPORTS)
+
+
+class ExportService:
+
+    @staticmethod
+    def columns(entity: str) -> List[str]:
+        return [column.key for column in _EXPORTS[entity][1]]
+
+    @staticmethod
+    def iter_rows(db: Session, batch_size: int, entity: str,
+                  since: Optional[datetime] = None) -> Iterator[Sequence]:
+        """The entity's rows as column tuples in columns(entity) order, batch_size per fetch"""
+        export_rows = _EXPORTS[entity][0]
+        return iter(export_rows(db, batch_size, since))
@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from repositories.recipe_repository import RecipeRepository
+
+# Recipe columns with facet counts, in response order
+FACETS = ("dish_type", "origin")
+
+# Writes made by other workers only reach this process' values on a
+# rebuild; one is started in the background once they are older than this.
+FACET_VALUES_MAX_AGE_SECONDS = int(os.getenv('FACET_VALUES_MAX_AGE', '300'))
+
+BUILD_BATCH_SIZE = 1000
+
+# Most search hit ids sent in one IN (...) list when counting facets of a
+# search within filters; more hits take more grouped queries.
+FACET_ID_BATCH_SIZE = int(os.getenv('FACET_ID_BATCH_SIZE', '1000'))
+
+FacetValues = Tuple[Optional[str], ...]
+
+
+def facet_values(recipe) -> FacetValues:
+    """A recipe's values for FACETS (anything with those attributes)"""
+    return tuple(getattr(recipe, facet, None) for facet in FACETS)
+
+
+class RecipeFacetValues:
+    """
+    In-memory dish type and origin of every recipe, to count facets over the
+    hits of a full-text search without sending their ids to the database.
+    Like the search index it serves, it is built lazily from the database on
+    first use and then kept current by RecipeService on every create, update
+    and delete. Counts over all recipes come from the recipe_facet_counts
+    table instead (RecipeFacetRepository).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything; the next read rebuilds from the database"""
+        with self._lock:
+            self._values: Dict[int, FacetValues] = {}
+            self._built = False
+            self._built_at = 0.0
+            self._rebuilding = False
+            # Local writes made while a background rebuild is reading the
+            # table, replayed on top of the fresh values when they are swapped in.
+            self._pending: Dict[int, Optional[FacetValues]] = {}
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    # Maintenance -------------------------------------------------------
+
+    def add(self, recipe):
+        """Remember a new recipe's values, or an updated one's current values"""
+        with self._lock:
+            if not self._built:
+                return
+            values = facet_values(recipe)
+            if self._rebuilding:
+                self._pending[recipe.id] = values
+            self._set(recipe.id, values)
+
+    def remove(self, recipe_id: int):
+        with self._lock:
+            if not self._built:
+                return
+            if self._rebuilding:
+                self._pending[recipe_id] = None
+            self._set(recipe_id, None)
+
+    def ensure_built(self, db: Session):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._load(self._read_values(db))
+            return
+        with self._lock:
+            if self._rebuilding or time.monotonic() - self._built_at <= FACET_VALUES_MAX_AGE_SECONDS:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def _rebuild_in_background(self):
+        from database import ReadSessionLocal
+        db = ReadSessionLocal()
+        try:
+            fresh = RecipeFacetValues()
+            fresh._load(self._read_values(db))
+        except Exception:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = {}
+            return
+        finally:
+            db.close()
+        with self._lock:
+            self._values = fresh._values
+            self._built_at = fresh._built_at
+            self._rebuilding = False
+            for recipe_id, values in self._pending.items():
+                self._set(recipe_id, values)
+            self._pending = {}
+
+    @staticmethod
+    def _read_values(db: Session) -> Iterable[Tuple[int, FacetValues]]:
+        return [(row[0], tuple(row[1:])) for row in RecipeRepository.facet_rows(db, BUILD_BATCH_SIZE)]
+
+    def _load(self, rows: Iterable[Tuple[int, FacetValues]]):
+        with self._lock:
+            self._built = True
+            for recipe_id, values in rows:
+                self._set(recipe_id, values)
+            self._built_at = time.monotonic()
+
+    def _set(self, recipe_id: int, values: Optional[FacetValues]):
+        if values is None:
+            self._values.pop(recipe_id, None)
+        else:
+            self._values[recipe_id] = values
+
+    # Reading -----------------------------------------------------------
+
+    def counts(self, recipe_ids: Iterable[int]) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """Number of the given recipes still known, and their count per value of each facet"""
+        total = 0
+        counts = {facet: Counter() for facet in FACETS}
+        with self._lock:
+            for recipe_id in recipe_ids:
+                values = self._values.get(recipe_id)
+                if values is None:
+                    continue
+                total += 1
+                for facet, value in zip(FACETS, values):
+                    if value is not None:
+                        counts[facet][value] += 1
+        return total, {facet: dict(values) for facet, values in counts.items()}
+
+
+recipe_facet_values = RecipeFacetValues()
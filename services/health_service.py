@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from database import engine, read_engine
+from services.search_index import recipe_search_index
+from utils.cache import response_cache
+from utils.pool import pool_status
+
+READY_DB_TIMEOUT_SECONDS = float(os.getenv('READY_DB_TIMEOUT_SECONDS', '1.0'))
+READY_MAX_DB_LATENCY_MS = float(os.getenv('READY_MAX_DB_LATENCY_MS', '500'))
+READY_MAX_POOL_UTILIZATION = float(os.getenv('READY_MAX_POOL_UTILIZATION', '0.9'))
+READY_MAX_POOL_WAITING = int(os.getenv('READY_MAX_POOL_WAITING', '5'))
+READY_MAX_IN_FLIGHT = int(os.getenv('READY_MAX_IN_FLIGHT', '100'))
+
+_started_at = time.monotonic()
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+# One probe at a time: if the database hangs, later readiness checks fail
+# fast instead of piling up threads behind the stuck one.
+_probe_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ready-probe")
+_probe_future = None
+_probe_lock = threading.Lock()
+
+
+def _ping_database() -> float:
+    started = time.perf_counter()
+    with read_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    return (time.perf_counter() - started) * 1000
+
+
+class HealthService:
+
+    @staticmethod
+    def request_started():
+        global _in_flight
+        with _in_flight_lock:
+            _in_flight += 1
+
+    @staticmethod
+    def request_finished():
+        global _in_flight
+        with _in_flight_lock:
+            _in_flight -= 1
+
+    @staticmethod
+    def in_flight() -> int:
+        return _in_flight
+
+    @staticmethod
+    def liveness() -> Dict:
+        """The process is up and serving; deliberately touches nothing external"""
+        return {"status": "OK", "uptime_seconds": round(time.monotonic() - _started_at, 1)}
+
+    @staticmethod
+    def probe_database(timeout: Optional[float] = None) -> Dict:
+        """Run SELECT 1 on the read pool, giving up after timeout seconds (default READY_DB_TIMEOUT_SECONDS)"""
+        global _probe_future
+        if timeout is None:
+            timeout = READY_DB_TIMEOUT_SECONDS
+        with _probe_lock:
+            if _probe_future is not None and not _probe_future.done():
+                return {"ok": False, "error": "previous probe still running"}
+            _probe_future = future = _probe_executor.submit(_ping_database)
+        try:
+            latency_ms = future.result(timeout=timeout)
+        except FutureTimeout:
+            return {"ok": False, "error": f"no answer within {timeout}s"}
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+        return {"ok": True, "latency_ms": round(latency_ms, 3)}
+
+    @staticmethod
+    def pool_saturation() -> Dict[str, Dict]:
+        pools = {}
+        for name, target in (("write", engine), ("read", read_engine)):
+            status = pool_status(target)
+            capacity = status.get("size", 0) + max(status.get("max_overflow", 0), 0)
+            pools[name] = {
+                "checked_out": status.get("checked_out", 0),
+                "capacity": capacity,
+                "utilization": round(status.get("checked_out", 0) / capacity, 3) if capacity else 0.0,
+                "waiting": status.get("waiting", 0),
+                "timeouts": status.get("timeouts", 0),
+            }
+        return pools
+
+    @staticmethod
+    def cache_warmness() -> Dict:
+        cache = response_cache.stats()
+        lookups = cache.get("hits", 0) + cache.get("misses", 0)
+        return {
+            "response_cache": {
+                "backend": cache["backend"],
+                "entries": cache.get("entries"),
+                "hit_ratio": round(cache["hits"] / lookups, 3) if lookups else None,
+            },
+            "search_index": {
+                "built": recipe_search_index.built,
+                "documents": len(recipe_search_index),
+            },
+        }
+
+    @staticmethod
+    def readiness() -> Tuple[bool, Dict]:
+        """
+        Decide whether this worker should receive traffic.
+
+        Load is checked first, so an overloaded worker answers immediately
+        without queueing a database probe behind its own backlog. Cache
+        warmness is reported but never gates readiness.
+
+        Returns:
+            (ready, report) tuple
+        """
+        reasons: List[str] = []
+        in_flight = HealthService.in_flight()
+        pools = HealthService.pool_saturation()
+        report = {"in_flight_requests": in_flight, "pools": pools}
+
+        if in_flight > READY_MAX_IN_FLIGHT:
+            reasons.append(f"{in_flight} requests in flight (max {READY_MAX_IN_FLIGHT})")
+        for name, pool in pools.items():
+            if pool["utilization"] >= READY_MAX_POOL_UTILIZATION:
+                reasons.append(f"{name} pool {pool['utilization']:.0%} checked out")
+            if pool["waiting"] > READY_MAX_POOL_WAITING:
+                reasons.append(f"{pool['waiting']} threads waiting on the {name} pool")
+
+        if not reasons:
+            database = HealthService.probe_database()
+            report["database"] = database
+            if not database["ok"]:
+                reasons.append(f"database probe failed: {database['error']}")
+            elif database["latency_ms"] > READY_MAX_DB_LATENCY_MS:
+                reasons.append(f"database probe took {database['latency_ms']}ms (max {READY_MAX_DB_LATENCY_MS:g}ms)")
+
+        report["cache"] = HealthService.cache_warmness()
+        report["reasons"] = reasons
+        report["status"] = "not ready" if reasons else "ready"
+        return not reasons, report
@@ -0,0 +1,275 @@
+import os
+import sys
+import threading
+import time
+from array import array
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy.orm import Session
+
+from repositories.ingredient_repository import IngredientRepository
+from utils import bitsets
+from utils.ingredients import parse_ingredients
+
+# Writes made by other workers only reach this process' index on a rebuild; a
+# rebuild is started in the background once the index is older than this.
+PANTRY_INDEX_MAX_AGE_SECONDS = int(os.getenv('PANTRY_INDEX_MAX_AGE', '300'))
+
+BUILD_BATCH_SIZE = 5000
+
+# An ingredient's recipes are kept as a bitset over all slots once it is used
+# by at least one slot in this many: a bitset costs one bit per slot, a slot
+# list 32 bits per recipe, so below this the list is the smaller of the two.
+DENSE_RATIO = 32
+
+# Recipes using an ingredient: a bitset over slots, or a list of slots for
+# rare ingredients (turned into a bitset when a query needs it)
+Column = Union[int, array]
+
+
+class PantryIndex:
+    """
+    In-memory ingredient bitsets for "what can I cook" queries.
+
+    Every recipe with ingredients gets a slot, handed out in id order, and
+    every ingredient name a column: the set of slots of the recipes using
+    it. Recipe sizes (their number of distinct ingredients) are kept
+    bit-sliced over the same slots. A query adds the pantry's columns into
+    a bit-sliced count of matched ingredients per recipe; recipes missing m
+    ingredients are then those whose size equals matched + m, found for all
+    recipes at once with a few operations per bit plane.
+
+    The index is built lazily from recipe_ingredients on the first query and
+    then kept current by RecipeService on every create, update and delete.
+    Deleted recipes leave their slot unused until the next rebuild.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything; the next query rebuilds from the database"""
+        with self._lock:
+            self._columns: Dict[str, Column] = {}
+            self._slots: Dict[int, int] = {}
+            self._slot_ids = array('q')
+            self._ingredients_of: Dict[int, Tuple[str, ...]] = {}
+            self._sizes: bitsets.Planes = []
+            self._live = 0
+            self._built = False
+            self._built_at = 0.0
+            self._rebuilding = False
+            # Local writes made while a background rebuild is reading the
+            # table, replayed on top of the fresh index when it is swapped in.
+            self._pending: Dict[int, Optional[Tuple[str, ...]]] = {}
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._ingredients_of)
+
+    # Maintenance -------------------------------------------------------
+
+    def add(self, recipe):
+        """Index or re-index a recipe (anything with id and ingredients)"""
+        with self._lock:
+            if not self._built:
+                return
+            names = self._analyze(getattr(recipe, "ingredients", None))
+            if self._rebuilding:
+                self._pending[recipe.id] = names
+            self._set(recipe.id, names)
+
+    def remove(self, recipe_id: int):
+        with self._lock:
+            if not self._built:
+                return
+            if self._rebuilding:
+                self._pending[recipe_id] = None
+            self._set(recipe_id, None)
+
+    def ensure_built(self, db: Session):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._load(self._read_ingredients(db))
+            return
+        with self._lock:
+            if self._rebuilding or time.monotonic() - self._built_at <= PANTRY_INDEX_MAX_AGE_SECONDS:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def _rebuild_in_background(self):
+        from database import ReadSessionLocal
+        db = ReadSessionLocal()
+        try:
+            fresh = PantryIndex()
+            fresh._load(self._read_ingredients(db))
+        except Exception:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = {}
+            return
+        finally:
+            db.close()
+        with self._lock:
+            self._columns = fresh._columns
+            self._slots = fresh._slots
+            self._slot_ids = fresh._slot_ids
+            self._ingredients_of = fresh._ingredients_of
+            self._sizes = fresh._sizes
+            self._live = fresh._live
+            self._built_at = fresh._built_at
+            self._rebuilding = False
+            for recipe_id, names in self._pending.items():
+                self._set(recipe_id, names)
+            self._pending = {}
+
+    @staticmethod
+    def _read_ingredients(db: Session) -> List[Tuple[int, Tuple[str, ...]]]:
+        rows = IngredientRepository.recipe_ingredient_names(db, BUILD_BATCH_SIZE)
+        return [
+            (recipe_id, tuple(sys.intern(name) for _id, name in group))
+            for recipe_id, group in groupby(rows, key=lambda row: row[0])
+        ]
+
+    @staticmethod
+    def _analyze(text: Optional[str]) -> Tuple[str, ...]:
+        return tuple(sys.intern(name) for name in parse_ingredients(text))
+
+    def _load(self, recipes: Iterable[Tuple[int, Tuple[str, ...]]]):
+        # Collect slot lists for every ingredient first, then turn the common
+        # ones into bitsets in one pass instead of growing ints bit by bit.
+        with self._lock:
+            self._built = True
+            sizes = []
+            for recipe_id, names in recipes:
+                if not names or recipe_id in self._slots:
+                    continue
+                slot = len(self._slot_ids)
+                self._slot_ids.append(recipe_id)
+                self._slots[recipe_id] = slot
+                self._ingredients_of[recipe_id] = names
+                sizes.append(len(names))
+                for name in names:
+                    column = self._columns.get(name)
+                    if column is None:
+                        column = self._columns[name] = array('I')
+                    column.append(slot)
+            slot_count = len(sizes)
+            for name, column in self._columns.items():
+                if len(column) * DENSE_RATIO >= slot_count:
+                    self._columns[name] = bitsets.from_positions(column, slot_count)
+            self._sizes = [
+                bitsets.from_positions((slot for slot, size in enumerate(sizes) if size >> bit & 1), slot_count)
+                for bit in range(max(sizes, default=0).bit_length())
+            ]
+            self._live = (1 << slot_count) - 1
+            self._built_at = time.monotonic()
+
+    def _set(self, recipe_id: int, names: Optional[Tuple[str, ...]]):
+        slot = self._slots.get(recipe_id)
+        if slot is not None:
+            self._unlink(slot, self._ingredients_of.pop(recipe_id))
+        if not names:
+            if slot is not None:
+                del self._slots[recipe_id]
+                self._slot_ids[slot] = 0
+                self._live &= ~(1 << slot)
+                bitsets.set_number(self._sizes, slot, 0)
+            return
+        if slot is None:
+            # New recipes have the highest ids, so appending keeps slots in id order
+            slot = len(self._slot_ids)
+            self._slot_ids.append(recipe_id)
+            self._slots[recipe_id] = slot
+            self._live |= 1 << slot
+        bit = 1 << slot
+        for name in names:
+            column = self._columns.get(name)
+            if column is None:
+                self._columns[name] = array('I', [slot])
+            elif isinstance(column, int):
+                self._columns[name] = column | bit
+            else:
+                column.append(slot)
+                if len(column) * DENSE_RATIO >= len(self._slot_ids):
+                    self._columns[name] = bitsets.from_positions(column, len(self._slot_ids))
+        self._ingredients_of[recipe_id] = names
+        bitsets.set_number(self._sizes, slot, len(names))
+
+    def _unlink(self, slot: int, names: Sequence[str]):
+        for name in names:
+            column = self._columns[name]
+            if isinstance(column, int):
+                column &= ~(1 << slot)
+                if column:
+                    self._columns[name] = column
+                else:
+                    del self._columns[name]
+            else:
+                column.remove(slot)
+                if not column:
+                    del self._columns[name]
+
+    def _bitset(self, name: str) -> int:
+        column = self._columns.get(name, 0)
+        if isinstance(column, int):
+            return column
+        return bitsets.from_positions(column, len(self._slot_ids))
+
+    # Querying ----------------------------------------------------------
+
+    def match(self, pantry: Iterable[str], max_missing: int,
+              limit: int = 20) -> List[Tuple[int, List[str], List[str]]]:
+        """
+        Recipes using at least one pantry ingredient and needing at most
+        max_missing others.
+
+        Args:
+            pantry: Normalized ingredient names
+            max_missing: Most ingredients a recipe may need beyond the pantry
+            limit: Maximum number of results
+
+        Returns:
+            List of (recipe_id, matched names, missing names) tuples, fewest
+            missing first, then most pantry ingredients used, then by id
+        """
+        pantry = set(pantry)
+        with self._lock:
+            matched: bitsets.Planes = []
+            for name in pantry:
+                column = self._bitset(name)
+                if column:
+                    bitsets.add_bitset(matched, column)
+            candidates = bitsets.any_set(matched) & self._live
+            slots: List[int] = []
+            for missing in range(max_missing + 1):
+                if len(slots) >= limit or not candidates:
+                    break
+                needed = bitsets.add_constant(matched, missing, candidates)
+                exact = bitsets.equal(needed, self._sizes, candidates)
+                candidates &= ~exact
+                for _count, group in bitsets.by_value_descending(matched, exact):
+                    for slot in bitsets.positions(group):
+                        slots.append(slot)
+                        if len(slots) >= limit:
+                            break
+                    if len(slots) >= limit:
+                        break
+            result = []
+            for slot in slots:
+                recipe_id = self._slot_ids[slot]
+                names = self._ingredients_of[recipe_id]
+                result.append((recipe_id,
+                               [name for name in names if name in pantry],
+                               [name for name in names if name not in pantry]))
+            return result
+
+
+pantry_index = PantryIndex()
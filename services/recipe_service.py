@@ -1,69 +1,226 @@
+from types import SimpleNamespace
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from models.recipe import Recipe
 from repositories.recipe_repository import RecipeRepository
+from repositories.ingredient_repository import IngredientRepository
+from repositories.recipe_facet_repository import RecipeFacetRepository
+from repositories.comment_repository import CommentRepository
+from services.comment_service import CommentService
+from services.facet_values import FACET_ID_BATCH_SIZE, FACETS, recipe_facet_values
+from services.pantry_index import pantry_index
+from services.search_index import FIELD_WEIGHTS, highlight, recipe_search_index
+from utils.bulk import BULK_CHUNK_SIZE, InvalidRow
+from utils.multi_get import in_requested_order
+from utils.pagination import DEFAULT_PAGE_SIZE, split_page
 from schemas.recipe_schemas import RecipeCreate, RecipeUpdate, RecipeResponse, RecipeWithUserResponse, \
-    RecipeWithCommentsResponse
+    RecipeWithCommentsResponse, RecipeSearchResult, RecipeBulkResponse, RecipeBulkRowResult, FacetCount, \
+    RecipeFacetsResponse, RecipeIngredientMatch, RecipePantryMatch
 
 
 class RecipeService:
 
+    @staticmethod
+    def _to_response(recipe: Recipe) -> RecipeResponse:
+        response = RecipeResponse.from_orm(recipe)
+        if recipe.user:
+            response.user_name = recipe.user.name
+        if recipe.rating:
+            response.rating_count = recipe.rating.rating_count
+            response.rating_avg = recipe.rating.rating_avg
+            response.rating_histogram = recipe.rating.histogram
+        return response
+
     @staticmethod
     def get_recipe_by_id(db: Session, recipe_id: int) -> Optional[RecipeResponse]:
-        recipe = RecipeRepository.get_recipe_by_id(db, recipe_id)
+        recipe = RecipeRepository.get_recipe_by_id_with_authors(db, recipe_id)
         if recipe:
-            response = RecipeResponse.from_orm(recipe)
-            if recipe.user:
-                response.user_name = recipe.user.name
-            return response
+            return RecipeService._to_response(recipe)
         return None
 
     @staticmethod
     def get_recipes_by_user(db: Session, user_id: int) -> List[RecipeResponse]:
-        recipes = RecipeRepository.get_recipes_by_user(db, user_id)
-        result = []
-        for recipe in recipes:
-            response = RecipeResponse.from_orm(recipe)
-            if recipe.user:
-                response.user_name = recipe.user.name
-            result.append(response)
-        return result
+        recipes = RecipeRepository.get_recipes_by_user_with_authors(db, user_id)
+        return [RecipeService._to_response(recipe) for recipe in recipes]
 
     @staticmethod
     def get_recipes_by_dish_type(db: Session, dish_type: str) -> List[RecipeResponse]:
-        recipes = RecipeRepository.get_recipes_by_dish_type(db, dish_type)
-        result = []
-        for recipe in recipes:
-            response = RecipeResponse.from_orm(recipe)
-            if recipe.user:
-                response.user_name = recipe.user.name
-            result.append(response)
-        return result
+        recipes = RecipeRepository.get_recipes_by_dish_type_with_authors(db, dish_type)
+        return [RecipeService._to_response(recipe) for recipe in recipes]
+
+    @staticmethod
+    def search_user_recipes(db: Session, user_id: int, title: str, after: Optional[Dict[str, Any]],
+                            limit: int) -> Tuple[List[RecipeResponse], Optional[str]]:
+        recipes = RecipeRepository.search_user_recipes(db, user_id, title, after, limit + 1)
+        page, next_cursor = split_page(recipes, limit, lambda recipe: {"title": recipe.title, "id": recipe.id})
+        return [RecipeService._to_response(recipe) for recipe in page], next_cursor
 
     @staticmethod
-    def search_recipes(db: Session, title: str) -> List[RecipeResponse]:
-        recipes = RecipeRepository.search_recipes_by_title(db, title)
+    def search_recipes(db: Session, query: str, limit: int = 20) -> List[RecipeSearchResult]:
+        recipe_search_index.ensure_built(db)
+        hits = recipe_search_index.search(query, limit)
+        if not hits:
+            return []
+
+        recipes = RecipeRepository.get_recipes_by_ids_with_authors(db, [recipe_id for recipe_id, _score in hits])
+        recipes_by_id = {recipe.id: recipe for recipe in recipes}
+        terms = recipe_search_index.query_terms(query)
+
         result = []
-        for recipe in recipes:
-            response = RecipeResponse.from_orm(recipe)
-            if recipe.user:
-                response.user_name = recipe.user.name
-            result.append(response)
+        for recipe_id, score in hits:
+            recipe = recipes_by_id.get(recipe_id)
+            if recipe is None:
+                # Deleted by another worker since this worker's last rebuild
+                continue
+            highlights = {}
+            for field in FIELD_WEIGHTS:
+                snippet = highlight(getattr(recipe, field), terms)
+                if snippet:
+                    highlights[field] = snippet
+            response_data = RecipeService._to_response(recipe).model_dump()
+            result.append(RecipeSearchResult(**response_data, score=score, highlights=highlights))
         return result
 
+    @staticmethod
+    def find_by_ingredients(db: Session, names: List[str], match_all: bool,
+                            limit: int = 20) -> List[RecipeIngredientMatch]:
+        """
+        Recipes using every (or any) one of the named ingredients, most
+        matched ingredients first. A fixed four queries: the name lookup, the
+        ranking over the recipe_ingredients indexes, the recipes, and which
+        of the ingredients each one uses.
+        """
+        ingredient_ids = IngredientRepository.get_ids_by_names(db, names)
+        if not ingredient_ids or (match_all and len(ingredient_ids) < len(names)):
+            # An ingredient no recipe uses: nothing can contain all of them
+            return []
+        ids = list(ingredient_ids.values())
+        ranked = IngredientRepository.find_recipe_ids(db, ids, match_all, limit)
+        recipe_ids = [row.recipe_id for row in ranked]
+        recipes, _missing = in_requested_order(
+            recipe_ids, RecipeRepository.get_recipes_by_ids_with_authors(db, recipe_ids))
+        matched = {}
+        for recipe_id, name in IngredientRepository.get_matched_names(db, recipe_ids, ids):
+            matched.setdefault(recipe_id, []).append(name)
+        return [
+            RecipeIngredientMatch(**RecipeService._to_response(recipe).model_dump(),
+                                  matched_count=len(matched.get(recipe.id, [])),
+                                  matched_ingredients=matched.get(recipe.id, []))
+            for recipe in recipes
+        ]
+
+    @staticmethod
+    def find_by_pantry(db: Session, pantry: List[str], max_missing: int,
+                       limit: int = 20) -> List[RecipePantryMatch]:
+        """
+        Recipes that can be cooked from the pantry with at most max_missing
+        more ingredients, fewest missing first. Matching runs on the
+        in-memory pantry index; one query then loads the recipes.
+        """
+        pantry_index.ensure_built(db)
+        hits = pantry_index.match(pantry, max_missing, limit)
+        if not hits:
+            return []
+        recipe_ids = [recipe_id for recipe_id, _matched, _missing in hits]
+        # Recipes deleted by another worker since this worker's last rebuild are dropped
+        recipes, _deleted = in_requested_order(
+            recipe_ids, RecipeRepository.get_recipes_by_ids_with_authors(db, recipe_ids))
+        names = {recipe_id: (matched, missing) for recipe_id, matched, missing in hits}
+        return [
+            RecipePantryMatch(**RecipeService._to_response(recipe).model_dump(),
+                              matched_count=len(names[recipe.id][0]), matched_ingredients=names[recipe.id][0],
+                              missing_count=len(names[recipe.id][1]), missing_ingredients=names[recipe.id][1])
+            for recipe in recipes
+        ]
+
     @staticmethod
     def get_all_recipes(db: Session, skip: int = 0, limit: int = 100) -> List[RecipeResponse]:
-        recipes = RecipeRepository.get_all_recipes(db, skip, limit)
-        result = []
-        for recipe in recipes:
-            response = RecipeResponse.from_orm(recipe)
-            if recipe.user:
-                response.user_name = recipe.user.name
-            result.append(response)
-        return result
+        recipes = RecipeRepository.get_all_recipes_with_authors(db, skip, limit)
+        return [RecipeService._to_response(recipe) for recipe in recipes]
 
     @staticmethod
-    def create_recipe(db: Session, recipe_data: RecipeCreate) -> RecipeResponse:
+    def get_recipes_by_ids(db: Session, recipe_ids: List[int]) -> Tuple[List[RecipeResponse], List[int]]:
+        """Recipes in the requested order with authors and ratings, plus the ids that do not exist"""
+        recipes = RecipeRepository.get_recipes_by_ids_with_authors(db, recipe_ids)
+        found, missing = in_requested_order(recipe_ids, recipes)
+        return [RecipeService._to_response(recipe) for recipe in found], missing
+
+    @staticmethod
+    def get_recipes_page(db: Session, after_id: Optional[int], limit: int) -> Tuple[List[RecipeResponse], Optional[str]]:
+        recipes = RecipeRepository.get_recipes_after(db, after_id, limit + 1)
+        page, next_cursor = split_page(recipes, limit, lambda recipe: {"id": recipe.id})
+        return [RecipeService._to_response(recipe) for recipe in page], next_cursor
+
+    @staticmethod
+    def filter_recipes_page(db: Session, filters: Dict[str, Any], after_id: Optional[int],
+                            limit: int) -> Tuple[List[RecipeResponse], Optional[str]]:
+        recipes = RecipeRepository.filter_recipes_after(db, filters, after_id, limit + 1)
+        page, next_cursor = split_page(recipes, limit, lambda recipe: {"id": recipe.id})
+        return [RecipeService._to_response(recipe) for recipe in page], next_cursor
+
+    @staticmethod
+    def get_facets(db: Session, filters: Dict[str, Any], query: Optional[str] = None) -> RecipeFacetsResponse:
+        """
+        Recipe counts per dish type and origin. Unfiltered counts are read
+        from the recipe_facet_counts table; counts within a search query
+        alone from the in-memory facet values of its hits; and counts within
+        filters from GROUP BY queries over the matching recipes, with a
+        search's hits sent FACET_ID_BATCH_SIZE ids per query.
+        """
+        if not filters and not query:
+            return RecipeService._facets_response(*RecipeService._sum_pairs(RecipeFacetRepository.get_counts(db)))
+        if not filters:
+            recipe_search_index.ensure_built(db)
+            recipe_facet_values.ensure_built(db)
+            hits = recipe_search_index.search(query, len(recipe_search_index))
+            return RecipeService._facets_response(*recipe_facet_values.counts(recipe_id for recipe_id, _score in hits))
+        if not query:
+            rows = RecipeRepository.count_by_dish_type_and_origin(db, filters)
+        else:
+            recipe_search_index.ensure_built(db)
+            recipe_ids = [recipe_id for recipe_id, _score in recipe_search_index.search(query, len(recipe_search_index))]
+            rows = []
+            for start in range(0, len(recipe_ids), FACET_ID_BATCH_SIZE):
+                rows += RecipeRepository.count_by_dish_type_and_origin(
+                    db, filters, recipe_ids[start:start + FACET_ID_BATCH_SIZE])
+        return RecipeService._facets_response(*RecipeService._sum_pairs(rows))
+
+    @staticmethod
+    def _sum_pairs(rows) -> Tuple[int, Dict[str, Dict[str, int]]]:
+        """Per-facet counts from (dish_type, origin, count) rows"""
+        total, counts = 0, {facet: {} for facet in FACETS}
+        for dish_type, origin, count in rows:
+            total += count
+            for facet, value in (("dish_type", dish_type), ("origin", origin)):
+                if value is not None:
+                    counts[facet][value] = counts[facet].get(value, 0) + count
+        return total, counts
+
+    @staticmethod
+    def _facets_response(total: int, counts: Dict[str, Dict[str, int]]) -> RecipeFacetsResponse:
+        return RecipeFacetsResponse(total=total, **{
+            facet: [FacetCount(value=value, count=count)
+                    for value, count in sorted(values.items(), key=lambda item: (-item[1], item[0]))]
+            for facet, values in counts.items()
+        })
+
+    @staticmethod
+    def iter_recipes(db: Session, batch_size: int) -> Iterator[RecipeResponse]:
+        for recipe in RecipeRepository.stream_recipes(db, batch_size):
+            yield RecipeService._to_response(recipe)
+
+    @staticmethod
+    def get_recipe_version(db: Session, recipe_id: int) -> Optional[Tuple]:
+        return RecipeRepository.get_version(db, recipe_id)
+
+    @staticmethod
+    def get_recipes_version(db: Session) -> Tuple:
+        return RecipeRepository.get_collection_version(db)
+
+    @staticmethod
+    def _check_required_text(recipe_data: RecipeCreate):
         if len(recipe_data.title.strip()) == 0:
             raise ValueError("Recipe title cannot be empty")
 
@@ -73,12 +230,71 @@ class RecipeService:
         if len(recipe_data.instructions.strip()) == 0:
             raise ValueError("Instructions cannot be empty")
 
+    @staticmethod
+    def create_recipe(db: Session, recipe_data: RecipeCreate) -> RecipeResponse:
+        RecipeService._check_required_text(recipe_data)
+
         recipe_dict = recipe_data.model_dump()
         db_recipe = RecipeRepository.create_recipe(db, recipe_dict)
-        response = RecipeResponse.from_orm(db_recipe)
-        if db_recipe.user:
-            response.user_name = db_recipe.user.name
-        return response
+        recipe_search_index.add(db_recipe)
+        recipe_facet_values.add(db_recipe)
+        pantry_index.add(db_recipe)
+        return RecipeService._to_response(db_recipe)
+
+    @staticmethod
+    def bulk_create_recipes(db: Session, rows: List[Any], user_id: int) -> RecipeBulkResponse:
+        """
+        Validate rows as RecipeCreate for user_id and insert the valid ones in
+        chunks of BULK_CHUNK_SIZE, one multi-row INSERT and transaction per chunk.
+
+        Invalid rows are reported and skipped. If a chunk's INSERT fails, its
+        rows are retried one by one so only the offending rows are reported.
+
+        Raises:
+            UserNotFoundError: If user_id no longer exists
+        """
+        results: List[Optional[RecipeBulkRowResult]] = [None] * len(rows)
+        valid: List[Tuple[int, dict]] = []
+        for index, row in enumerate(rows):
+            try:
+                if isinstance(row, InvalidRow):
+                    raise row
+                if not isinstance(row, dict):
+                    raise ValueError("Row must be a JSON object")
+                recipe_data = RecipeCreate(**{**row, "user_id": user_id})
+                RecipeService._check_required_text(recipe_data)
+            except ValidationError as e:
+                message = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+                results[index] = RecipeBulkRowResult(index=index, status="error", error=message)
+            except ValueError as e:
+                results[index] = RecipeBulkRowResult(index=index, status="error", error=str(e))
+            else:
+                valid.append((index, recipe_data.model_dump()))
+
+        for start in range(0, len(valid), BULK_CHUNK_SIZE):
+            chunk = valid[start:start + BULK_CHUNK_SIZE]
+            try:
+                ids = RecipeRepository.insert_recipes(db, [recipe_dict for _, recipe_dict in chunk])
+                inserted = list(zip(chunk, ids))
+            except SQLAlchemyError:
+                inserted = []
+                for index, recipe_dict in chunk:
+                    try:
+                        recipe_id, = RecipeRepository.insert_recipes(db, [recipe_dict])
+                    except SQLAlchemyError as e:
+                        results[index] = RecipeBulkRowResult(index=index, status="error",
+                                                             error=str(getattr(e, "orig", e)))
+                    else:
+                        inserted.append(((index, recipe_dict), recipe_id))
+            for (index, recipe_dict), recipe_id in inserted:
+                results[index] = RecipeBulkRowResult(index=index, status="created", id=recipe_id)
+                recipe = SimpleNamespace(id=recipe_id, **recipe_dict)
+                recipe_search_index.add(recipe)
+                recipe_facet_values.add(recipe)
+                pantry_index.add(recipe)
+
+        created = sum(1 for result in results if result.status == "created")
+        return RecipeBulkResponse(created=created, failed=len(results) - created, results=results)
 
     @staticmethod
     def update_recipe(db: Session, recipe_id: int, update_data: RecipeUpdate) -> Optional[RecipeResponse]:
@@ -89,15 +305,20 @@ class RecipeService:
         update_dict = update_data.model_dump(exclude_unset=True)
         updated_recipe = RecipeRepository.update_recipe(db, recipe_id, update_dict)
         if updated_recipe:
-            response = RecipeResponse.from_orm(updated_recipe)
-            if updated_recipe.user:
-                response.user_name = updated_recipe.user.name
-            return response
+            recipe_search_index.add(updated_recipe)
+            recipe_facet_values.add(updated_recipe)
+            pantry_index.add(updated_recipe)
+            return RecipeService._to_response(updated_recipe)
         return None
 
     @staticmethod
     def delete_recipe(db: Session, recipe_id: int) -> bool:
-        return RecipeRepository.delete_recipe(db, recipe_id)
+        deleted = RecipeRepository.delete_recipe(db, recipe_id)
+        if deleted:
+            recipe_search_index.remove(recipe_id)
+            recipe_facet_values.remove(recipe_id)
+            pantry_index.remove(recipe_id)
+        return deleted
 
     @staticmethod
     def get_recipe_with_user_details(db: Session, recipe_id: int) -> Optional[RecipeWithUserResponse]:
@@ -110,33 +331,51 @@ class RecipeService:
         return None
 
     @staticmethod
-    def get_recipe_with_comments(db: Session, recipe_id: int) -> Optional[RecipeWithCommentsResponse]:
-        recipe = RecipeRepository.get_recipe_by_id(db, recipe_id)
-        if recipe:
-            response_data = RecipeResponse.from_orm(recipe).model_dump()
-            response_data["comments_count"] = len(recipe.comments)
-
-            comments_data = []
-            for comment in recipe.comments:
-                comments_data.append({
-                    "id": comment.id,
-                    "content": comment.content,
-                    "rating": comment.rating,
-                    "user_name": comment.user.name
-                })
-            response_data["comments"] = comments_data
-
-            return RecipeWithCommentsResponse(**response_data)
-        return None
+    def get_recipe_with_comments(db: Session, recipe_id: int,
+                                 limit: int = DEFAULT_PAGE_SIZE) -> Optional[RecipeWithCommentsResponse]:
+        """
+        The recipe with its author and rating aggregates, its comment count and
+        the newest page of its comments with author names.
+
+        Three queries however many comments there are: the recipe with joined
+        author and rating, one page of comments with joined authors, and the
+        count. comments_next_cursor continues at GET /recipes/<id>/comments.
+        """
+        recipe = RecipeRepository.get_recipe_by_id_with_authors(db, recipe_id)
+        if recipe is None:
+            return None
+        page, next_cursor = CommentService.get_recipe_comments_page(db, recipe_id, "newest", None, limit)
+
+        response_data = RecipeService._to_response(recipe).model_dump()
+        response_data["comments_count"] = CommentRepository.count_by_recipe_ids(db, [recipe.id])[recipe.id]
+        response_data["comments"] = [{
+            "id": comment.id,
+            "content": comment.content,
+            "rating": comment.rating,
+            "comment_date": comment.comment_date,
+            "user_id": comment.user_id,
+            "user_name": comment.user_name
+        } for comment in page]
+        response_data["comments_next_cursor"] = next_cursor
+        return RecipeWithCommentsResponse(**response_data)
+
+    @staticmethod
+    def get_recipe_full_version(db: Session, recipe_id: int) -> Optional[Tuple]:
+        """Version of the recipe detail view: the recipe's and its comments' versions together"""
+        recipe_version = RecipeRepository.get_version(db, recipe_id)
+        if recipe_version is None:
+            return None
+        return tuple(recipe_version) + tuple(CommentRepository.get_recipe_comments_version(db, recipe_id))
 
     @staticmethod
     def get_user_recipes_with_stats(db: Session, user_id: int) -> List[dict]:
-        recipes = RecipeRepository.get_recipes_by_user(db, user_id)
+        recipes = RecipeRepository.get_recipes_by_user_with_authors(db, user_id)
+        counts = CommentRepository.count_by_recipe_ids(db, [recipe.id for recipe in recipes])
         result = []
 
         for recipe in recipes:
-            recipe_data = RecipeResponse.from_orm(recipe).model_dump()
-            recipe_data["comments_count"] = len(recipe.comments)
+            recipe_data = RecipeService._to_response(recipe).model_dump()
+            recipe_data["comments_count"] = counts[recipe.id]
             result.append(recipe_data)
 
         return result
\ No newline at end of file
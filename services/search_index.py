@@ -0,0 +1,304 @@
+import bisect
+import heapq
+import html
+import math
+import os
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, load_only
+
+from models.recipe import Recipe
+from utils.text_analysis import fold, tokenize, tokenize_with_offsets
+
+# Fields that are indexed, with their BM25F weight. Matches in the title count
+# three times as much as matches in the instructions.
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "origin": 2.0,
+    "ingredients": 1.5,
+    "instructions": 1.0,
+}
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# When the last query word is not a complete term it is treated as a prefix
+# ("choc" finds "chocolate") and expanded to at most this many vocabulary
+# terms, most frequent first.
+MAX_PREFIX_EXPANSIONS = 20
+
+SNIPPET_RADIUS = 60
+
+# Writes made by other workers only reach this process' index on a rebuild; a
+# rebuild is started in the background once the index is older than this.
+INDEX_MAX_AGE_SECONDS = int(os.getenv('SEARCH_INDEX_MAX_AGE', '300'))
+
+BUILD_BATCH_SIZE = 1000
+
+
+class RecipeSearchIndex:
+    """
+    In-memory inverted index over recipe text with BM25F ranking.
+
+    Postings map a stemmed term to {recipe_id: weighted term frequency}. The
+    index is built lazily from the database on the first search and then kept
+    current by RecipeService on every create, update and delete.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        """Drop everything; the next search rebuilds from the database"""
+        with self._lock:
+            self._postings: Dict[str, Dict[int, float]] = {}
+            self._doc_terms: Dict[int, Counter] = {}
+            self._doc_lengths: Dict[int, float] = {}
+            self._total_length = 0.0
+            self._sorted_terms: Optional[List[str]] = None
+            self._built = False
+            self._built_at = 0.0
+            self._rebuilding = False
+            # Local writes made while a background rebuild is reading the
+            # table, replayed on top of the fresh index when it is swapped in.
+            self._pending: Dict[int, Optional[Counter]] = {}
+
+    @property
+    def built(self) -> bool:
+        return self._built
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    # Maintenance -------------------------------------------------------
+
+    def add(self, recipe):
+        """Index or re-index a recipe (anything with the indexed attributes)"""
+        with self._lock:
+            if not self._built:
+                return
+            terms = self._analyze(recipe)
+            if self._rebuilding:
+                self._pending[recipe.id] = terms
+            self._add(recipe.id, terms)
+
+    def remove(self, recipe_id: int):
+        with self._lock:
+            if not self._built:
+                return
+            if self._rebuilding:
+                self._pending[recipe_id] = None
+            self._remove(recipe_id)
+
+    def ensure_built(self, db: Session):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._load(self._read_documents(db))
+            return
+        with self._lock:
+            if self._rebuilding or time.monotonic() - self._built_at <= INDEX_MAX_AGE_SECONDS:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild_in_background, daemon=True).start()
+
+    def _rebuild_in_background(self):
+        from database import ReadSessionLocal
+        db = ReadSessionLocal()
+        try:
+            documents = self._read_documents(db)
+            fresh = RecipeSearchIndex()
+            fresh._load(documents)
+        except Exception:
+            with self._lock:
+                self._rebuilding = False
+                self._pending = {}
+            return
+        finally:
+            db.close()
+        with self._lock:
+            self._postings = fresh._postings
+            self._doc_terms = fresh._doc_terms
+            self._doc_lengths = fresh._doc_lengths
+            self._total_length = fresh._total_length
+            self._sorted_terms = None
+            self._built_at = fresh._built_at
+            self._rebuilding = False
+            for recipe_id, terms in self._pending.items():
+                if terms is None:
+                    self._remove(recipe_id)
+                else:
+                    self._add(recipe_id, terms)
+            self._pending = {}
+
+    @staticmethod
+    def _read_documents(db: Session) -> List[Tuple[int, Counter]]:
+        query = (
+            db.query(Recipe)
+            .options(load_only(Recipe.id, *(getattr(Recipe, field) for field in FIELD_WEIGHTS)))
+            .order_by(Recipe.id)
+            .yield_per(BUILD_BATCH_SIZE)
+        )
+        return [(recipe.id, RecipeSearchIndex._analyze(recipe)) for recipe in query]
+
+    def _load(self, documents: Iterable[Tuple[int, Counter]]):
+        with self._lock:
+            self._built = True
+            for recipe_id, terms in documents:
+                self._add(recipe_id, terms)
+            self._built_at = time.monotonic()
+
+    @staticmethod
+    def _analyze(recipe) -> Counter:
+        terms = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token in tokenize(getattr(recipe, field, None) or ""):
+                terms[token] += weight
+        return terms
+
+    def _add(self, recipe_id: int, terms: Counter):
+        if recipe_id in self._doc_terms:
+            self._remove(recipe_id)
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._sorted_terms = None
+            postings[recipe_id] = frequency
+        length = sum(terms.values())
+        self._doc_terms[recipe_id] = terms
+        self._doc_lengths[recipe_id] = length
+        self._total_length += length
+
+    def _remove(self, recipe_id: int):
+        terms = self._doc_terms.pop(recipe_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(recipe_id, None)
+                if not postings:
+                    del self._postings[term]
+                    self._sorted_terms = None
+        self._total_length -= self._doc_lengths.pop(recipe_id)
+
+    # Querying ----------------------------------------------------------
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[int, float]]:
+        """
+        Rank recipes matching every word of the query.
+
+        Args:
+            query: Free text; the last word also matches as a prefix
+            limit: Maximum number of results
+
+        Returns:
+            List of (recipe_id, score) tuples, best first
+        """
+        with self._lock:
+            groups = self._query_term_groups(query)
+            if not groups or any(not group for group in groups):
+                return []
+            # Merge each group's postings; a group is one query word plus its
+            # prefix expansions, and a document must match every group.
+            merged = [self._merge_postings(group) for group in groups]
+            merged.sort(key=len)
+            candidates = merged[0]
+            others = merged[1:]
+
+            total_docs = len(self._doc_lengths)
+            avg_length = self._total_length / total_docs if total_docs else 1.0
+            idfs = [self._idf(len(postings), total_docs) for postings in merged]
+
+            scored = []
+            for recipe_id, frequency in candidates.items():
+                frequencies = [frequency]
+                for postings in others:
+                    other = postings.get(recipe_id)
+                    if other is None:
+                        break
+                    frequencies.append(other)
+                else:
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_lengths[recipe_id] / avg_length)
+                    score = sum(
+                        idf * tf * (BM25_K1 + 1) / (tf + norm)
+                        for idf, tf in zip(idfs, frequencies)
+                    )
+                    scored.append((score, -recipe_id))
+            best = heapq.nlargest(limit, scored)
+            return [(-negated_id, round(score, 4)) for score, negated_id in best]
+
+    def query_terms(self, query: str) -> List[str]:
+        """All index terms a query matches, used to highlight snippets"""
+        with self._lock:
+            return [term for group in self._query_term_groups(query) for term in group]
+
+    def _query_term_groups(self, query: str) -> List[List[str]]:
+        tokens = list(tokenize_with_offsets(query))
+        if not tokens:
+            return []
+        groups = [[token] if token in self._postings else [] for token, _s, _e in tokens]
+        last_token, start, end = tokens[-1]
+        if end == len(query) and last_token not in self._postings:
+            groups[-1] = self._expand_prefix(last_token, fold(query[start:end]))
+        return groups
+
+    def _expand_prefix(self, stemmed: str, raw: str) -> List[str]:
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self._postings)
+        matches = set()
+        for prefix in {stemmed, raw}:
+            position = bisect.bisect_left(self._sorted_terms, prefix)
+            while position < len(self._sorted_terms) and self._sorted_terms[position].startswith(prefix):
+                matches.add(self._sorted_terms[position])
+                position += 1
+        by_frequency = sorted(matches, key=lambda term: len(self._postings[term]), reverse=True)
+        return by_frequency[:MAX_PREFIX_EXPANSIONS]
+
+    def _merge_postings(self, terms: List[str]) -> Dict[int, float]:
+        if len(terms) == 1:
+            return self._postings[terms[0]]
+        merged: Dict[int, float] = {}
+        for term in terms:
+            for recipe_id, frequency in self._postings[term].items():
+                merged[recipe_id] = merged.get(recipe_id, 0.0) + frequency
+        return merged
+
+    @staticmethod
+    def _idf(document_frequency: int, total_docs: int) -> float:
+        return math.log(1 + (total_docs - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def highlight(text: Optional[str], terms: Iterable[str], radius: int = SNIPPET_RADIUS) -> Optional[str]:
+    """
+    Build an HTML-escaped snippet of text around the first matching term.
+
+    Matches are wrapped in <mark></mark>. Returns None when nothing matches.
+    """
+    if not text:
+        return None
+    wanted = set(terms)
+    spans = [(start, end) for token, start, end in tokenize_with_offsets(text) if token in wanted]
+    if not spans:
+        return None
+    window_start = max(0, spans[0][0] - radius)
+    window_end = min(len(text), spans[0][1] + radius)
+    parts = ["…" if window_start > 0 else ""]
+    cursor = window_start
+    for start, end in spans:
+        if start < cursor or end > window_end:
+            continue
+        parts.append(html.escape(text[cursor:start]))
+        parts.append("<mark>" + html.escape(text[start:end]) + "</mark>")
+        cursor = end
+    parts.append(html.escape(text[cursor:window_end]))
+    parts.append("…" if window_end < len(text) else "")
+    return "".join(parts)
+
+
+recipe_search_index = RecipeSearchIndex()
@@ -1,7 +1,9 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from models.user import User
 from repositories.user_repository import UserRepository
+from utils.multi_get import in_requested_order
+from utils.pagination import split_page
 from schemas.user_schemas import UserCreate, UserUpdate, UserResponse
 
 
@@ -26,6 +28,24 @@ class UserService:
         users = UserRepository.get_all_users(db, skip, limit)
         return [UserResponse.from_orm(user) for user in users]
 
+    @staticmethod
+    def get_users_by_ids(db: Session, user_ids: List[int]) -> Tuple[List[UserResponse], List[int]]:
+        """Users in the requested order, plus the ids that do not exist"""
+        users = UserRepository.get_users_by_ids(db, user_ids)
+        found, missing = in_requested_order(user_ids, users)
+        return [UserResponse.from_orm(user) for user in found], missing
+
+    @staticmethod
+    def get_users_page(db: Session, after_id: Optional[int], limit: int) -> Tuple[List[UserResponse], Optional[str]]:
+        users = UserRepository.get_users_after(db, after_id, limit + 1)
+        page, next_cursor = split_page(users, limit, lambda user: {"id": user.id})
+        return [UserResponse.from_orm(user) for user in page], next_cursor
+
+    @staticmethod
+    def iter_users(db: Session, batch_size: int) -> Iterator[UserResponse]:
+        for user in UserRepository.stream_users(db, batch_size):
+            yield UserResponse.from_orm(user)
+
     @staticmethod
     def create_user(db: Session, user_data: UserCreate) -> UserResponse:
         existing_user = UserRepository.get_user_by_email(db, user_data.email)
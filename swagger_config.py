@@ -119,6 +119,10 @@ All endpoints return consistent error responses:
         {
             "name": "Search",
             "description": "Search functionality"
+        },
+        {
+            "name": "Export",
+            "description": "Streamed bulk exports for analytics and backups"
         }
     ],
     "definitions": {
@@ -227,6 +231,12 @@ All endpoints return consistent error responses:
                     "example": 45,
                     "description": "Time in minutes"
                 },
+                "preparation_minutes": {
+                    "type": "integer",
+                    "nullable": True,
+                    "example": 45,
+                    "description": "preparation_time parsed into minutes (the upper bound of a range); null when it cannot be read"
+                },
                 "servings": {
                     "type": "integer",
                     "nullable": True,
@@ -249,6 +259,11 @@ All endpoints return consistent error responses:
                     "type": "string",
                     "format": "date-time",
                     "example": "2025-10-17T10:30:00"
+                },
+                "updated_at": {
+                    "type": "string",
+                    "format": "date-time",
+                    "example": "2025-10-18T09:12:45.120394"
                 }
             }
         },
@@ -334,6 +349,64 @@ All endpoints return consistent error responses:
                 }
             }
         },
+        "RecipeBulkResult": {
+            "type": "object",
+            "properties": {
+                "created": {
+                    "type": "integer",
+                    "example": 2
+                },
+                "failed": {
+                    "type": "integer",
+                    "example": 1
+                },
+                "results": {
+                    "type": "array",
+                    "description": "One entry per input row, in input order",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "index": {"type": "integer", "example": 2},
+                            "status": {"type": "string", "enum": ["created", "error"], "example": "error"},
+                            "id": {"type": "integer", "nullable": True, "example": None},
+                            "error": {"type": "string", "nullable": True, "example": "title: Field required"}
+                        }
+                    }
+                }
+            }
+        },
+        "RecipeFacets": {
+            "type": "object",
+            "properties": {
+                "total": {
+                    "type": "integer",
+                    "description": "Recipes counted",
+                    "example": 42
+                },
+                "dish_type": {
+                    "type": "array",
+                    "description": "Counts per dish type, largest first",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "value": {"type": "string", "example": "Dessert"},
+                            "count": {"type": "integer", "example": 12}
+                        }
+                    }
+                },
+                "origin": {
+                    "type": "array",
+                    "description": "Counts per origin, largest first; recipes without an origin are not listed",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "value": {"type": "string", "example": "Italian"},
+                            "count": {"type": "integer", "example": 7}
+                        }
+                    }
+                }
+            }
+        },
         "Comment": {
             "type": "object",
             "properties": {
@@ -350,6 +423,11 @@ All endpoints return consistent error responses:
                     "format": "date-time",
                     "example": "2025-10-17T14:30:00"
                 },
+                "updated_at": {
+                    "type": "string",
+                    "format": "date-time",
+                    "example": "2025-10-17T14:30:00"
+                },
                 "user_id": {
                     "type": "integer",
                     "example": 2
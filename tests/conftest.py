@@ -1,9 +1,34 @@
 import sys, os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+# Low scrypt cost in tests: hashes are checked for correctness, not strength
+os.environ.setdefault('PASSWORD_SCRYPT_N', '1024')
+
 import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import app as flask_app
-from database import SessionLocal, Base, engine
+from database import SessionLocal, Base, engine, read_engine
+from services.facet_values import recipe_facet_values
+from services.pantry_index import pantry_index
+from services.search_index import recipe_search_index
+from utils.cache import response_cache
+from utils.jwt_utils import token_cache
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Cached responses must not leak between tests (some patch services per test)"""
+    response_cache.clear()
+    yield
+    response_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
 
 @pytest.fixture
 def client():
@@ -12,6 +37,9 @@ def client():
     # Clear all data before each test
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    recipe_search_index.reset()
+    recipe_facet_values.reset()
+    pantry_index.reset()
 
     with flask_app.test_client() as client:
         yield client
@@ -19,3 +47,24 @@ def client():
     # Clean up after test
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting the SQL statements sent to the database inside the block"""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        for target in (engine, read_engine):
+            event.listen(target, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            for target in (engine, read_engine):
+                event.remove(target, "before_cursor_execute", before_cursor_execute)
+
+    return counter
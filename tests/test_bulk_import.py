@@ -0,0 +1,147 @@
+import json
+
+from sqlalchemy.sql.compiler import InsertmanyvaluesSentinelOpts
+
+from database import engine
+from services import recipe_service
+from utils import bulk
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def recipe_row(i):
+    return {"title": f"Stew {i}", "dish_type": "Main", "ingredients": "beans, onion",
+            "instructions": "Simmer", "servings": 2}
+
+
+def test_bulk_json_array_creates_all_rows(client):
+    token = create_user_and_get_token(client)
+    headers = {'Authorization': f'Bearer {token}'}
+    rows = [recipe_row(i) for i in range(5)]
+
+    response = client.post('/recipes/bulk', data=json.dumps(rows), content_type='application/json', headers=headers)
+
+    assert response.status_code == 201
+    data = json.loads(response.data)
+    assert data["created"] == 5 and data["failed"] == 0
+    assert [result["index"] for result in data["results"]] == list(range(5))
+    for row, result in zip(rows, data["results"]):
+        recipe = json.loads(client.get(f'/recipes/{result["id"]}').data)
+        assert recipe["title"] == row["title"]
+        assert recipe["user_name"] == "testuser"
+    assert len(json.loads(client.get('/recipes').data)) == 5
+
+
+def test_bulk_ndjson_reports_per_row_errors(client):
+    token = create_user_and_get_token(client)
+    lines = [
+        json.dumps(recipe_row(0)),
+        "{not json",
+        "",
+        json.dumps({"title": "No ingredients", "dish_type": "Main", "instructions": "x"}),
+        json.dumps({**recipe_row(1), "title": "   "}),
+        json.dumps(recipe_row(2)),
+    ]
+
+    response = client.post('/recipes/bulk', data="\n".join(lines), content_type='application/x-ndjson',
+                           headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 207
+    data = json.loads(response.data)
+    assert data["created"] == 2 and data["failed"] == 3
+    statuses = [(result["index"], result["status"]) for result in data["results"]]
+    assert statuses == [(0, "created"), (1, "error"), (2, "error"), (3, "error"), (4, "created")]
+    assert "not valid JSON" in data["results"][1]["error"]
+    assert "ingredients" in data["results"][2]["error"]
+    assert data["results"][3]["error"] == "Recipe title cannot be empty"
+
+
+def test_bulk_rows_are_owned_by_the_caller(client):
+    token = create_user_and_get_token(client)
+    response = client.post('/recipes/bulk', data=json.dumps([{**recipe_row(0), "user_id": 999}]),
+                           content_type='application/json', headers={'Authorization': f'Bearer {token}'})
+
+    recipe_id = json.loads(response.data)["results"][0]["id"]
+    assert json.loads(client.get(f'/recipes/{recipe_id}').data)["user_name"] == "testuser"
+
+
+def test_bulk_inserts_one_statement_per_chunk(client, count_queries, monkeypatch):
+    monkeypatch.setattr(recipe_service, "BULK_CHUNK_SIZE", 4)
+    token = create_user_and_get_token(client)
+
+    with count_queries() as statements:
+        response = client.post('/recipes/bulk', data=json.dumps([recipe_row(i) for i in range(10)]),
+                               content_type='application/json', headers={'Authorization': f'Bearer {token}'})
+
+    results = json.loads(response.data)["results"]
+    assert [result["status"] for result in results] == ["created"] * 10
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT INTO RECIPES ")]
+    # RETURNING ids in row order needs a sentinel; where the dialect has none
+    # (SQLite) SQLAlchemy inserts row by row, otherwise one INSERT per chunk.
+    ordered_batches = engine.dialect.insertmanyvalues_implicit_sentinel != InsertmanyvaluesSentinelOpts.NOT_SUPPORTED
+    assert len(inserts) == (3 if ordered_batches or not engine.dialect.insert_returning else 10)
+    for result in results:
+        recipe = client.get(f'/recipes/{result["id"]}').json
+        assert recipe["title"] == f"Stew {result['index']}"
+
+
+def test_bulk_rejects_bad_bodies(client, monkeypatch):
+    token = create_user_and_get_token(client)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    response = client.post('/recipes/bulk', data=json.dumps(recipe_row(0)), content_type='application/json',
+                           headers=headers)
+    assert response.status_code == 400
+
+    monkeypatch.setattr(bulk, "BULK_MAX_ROWS", 2)
+    response = client.post('/recipes/bulk', data=json.dumps([recipe_row(i) for i in range(3)]),
+                           content_type='application/json', headers=headers)
+    assert response.status_code == 400
+    assert "At most 2 rows" in json.loads(response.data)["error"]
+
+
+def test_bulk_requires_authentication(client):
+    response = client.post('/recipes/bulk', data=json.dumps([recipe_row(0)]), content_type='application/json')
+    assert response.status_code == 401
+
+
+def test_bulk_import_is_searchable(client):
+    token = create_user_and_get_token(client)
+    client.get('/recipes/search?q=anything')  # build the index before the import
+    client.post('/recipes/bulk', data=json.dumps([{**recipe_row(0), "title": "Saffron risotto"}]),
+               content_type='application/json', headers={'Authorization': f'Bearer {token}'})
+
+    results = json.loads(client.get('/recipes/search?q=saffron').data)
+    assert [recipe["title"] for recipe in results] == ["Saffron risotto"]
+
+
+def test_failed_chunk_is_retried_row_by_row(client, monkeypatch):
+    from sqlalchemy.exc import DataError
+    from repositories.recipe_repository import RecipeRepository
+
+    real_insert = RecipeRepository.insert_recipes
+
+    def insert_rejecting_long_titles(db, rows):
+        if any(row["title"] == "x" * 300 for row in rows):
+            raise DataError("INSERT", {}, Exception("Data too long for column 'title'"))
+        return real_insert(db, rows)
+
+    monkeypatch.setattr(RecipeRepository, "insert_recipes", staticmethod(insert_rejecting_long_titles))
+    token = create_user_and_get_token(client)
+    rows = [recipe_row(0), {**recipe_row(1), "title": "x" * 300}, recipe_row(2)]
+
+    response = client.post('/recipes/bulk', data=json.dumps(rows), content_type='application/json',
+                           headers={'Authorization': f'Bearer {token}'})
+
+    data = json.loads(response.data)
+    assert response.status_code == 207
+    assert [result["status"] for result in data["results"]] == ["created", "error", "created"]
+    assert "Data too long" in data["results"][1]["error"]
+    assert len(json.loads(client.get('/recipes').data)) == 2
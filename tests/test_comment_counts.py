@@ -0,0 +1,65 @@
+import json
+
+from database import SessionLocal
+from repositories.comment_repository import CommentRepository
+from repositories.recipe_repository import RecipeRepository
+from services.recipe_service import RecipeService
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    data = json.loads(login_response.data)
+    return data['token'], data['user_id']
+
+
+def create_recipe_with_comments(client, headers, title, comments):
+    recipe = json.loads(client.post('/recipes',
+                                    data=json.dumps({"title": title, "dish_type": "Main",
+                                                     "ingredients": "ing", "instructions": "inst"}),
+                                    content_type='application/json', headers=headers).data)
+    for i in range(comments):
+        client.post('/comments', data=json.dumps({"content": f"c{i}", "recipe_id": recipe['id']}),
+                    content_type='application/json', headers=headers)
+    return recipe
+
+
+def test_count_by_recipe_ids(client):
+    token, _user_id = create_user_and_get_token(client)
+    headers = {'Authorization': f'Bearer {token}'}
+    busy = create_recipe_with_comments(client, headers, "Busy", 3)
+    quiet = create_recipe_with_comments(client, headers, "Quiet", 0)
+
+    db = SessionLocal()
+    try:
+        counts = CommentRepository.count_by_recipe_ids(db, [busy['id'], quiet['id']])
+        assert counts == {busy['id']: 3, quiet['id']: 0}
+        assert CommentRepository.count_by_recipe_ids(db, []) == {}
+
+        rows = RecipeRepository.get_recipes_with_comments_count(db)
+        assert [(recipe.title, count) for recipe, count in rows] == [("Busy", 3), ("Quiet", 0)]
+    finally:
+        db.close()
+
+
+def test_user_recipe_stats_count_in_constant_queries(client, count_queries):
+    token, user_id = create_user_and_get_token(client)
+    headers = {'Authorization': f'Bearer {token}'}
+    for i in range(4):
+        create_recipe_with_comments(client, headers, f"Recipe {i}", i)
+
+    db = SessionLocal()
+    try:
+        with count_queries() as statements:
+            stats = RecipeService.get_user_recipes_with_stats(db, user_id)
+        with_comments = RecipeService.get_recipe_with_comments(db, stats[-1]['id'])
+    finally:
+        db.close()
+
+    assert [recipe['comments_count'] for recipe in stats] == [0, 1, 2, 3]
+    assert len(statements) == 2
+    assert not any("FROM comments" in s and "count" not in s.lower() for s in statements)
+    assert with_comments.comments_count == 3
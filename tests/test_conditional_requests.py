@@ -0,0 +1,138 @@
+import json
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe(client, headers, title="Stew"):
+    response = client.post('/recipes',
+                           data=json.dumps({"title": title, "dish_type": "Main",
+                                            "ingredients": "beef", "instructions": "simmer"}),
+                           content_type='application/json', headers=headers)
+    return json.loads(response.data)
+
+
+def test_recipe_etag_and_not_modified(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+    url = f"/recipes/{recipe['id']}"
+
+    response = client.get(url)
+    etag = response.headers['ETag']
+    assert response.status_code == 200
+    assert response.headers['Last-Modified']
+    assert json.loads(response.data)['updated_at'] is not None
+
+    not_modified = client.get(url, headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.data == b''
+    assert not_modified.headers['ETag'] == etag
+
+    client.put(url, data=json.dumps({"title": "Beef Stew"}), content_type='application/json', headers=headers)
+    changed = client.get(url, headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert json.loads(changed.data)['title'] == 'Beef Stew'
+
+
+def test_recipe_etag_changes_with_rating(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+    url = f"/recipes/{recipe['id']}"
+    etag = client.get(url).headers['ETag']
+
+    client.post('/comments', data=json.dumps({"content": "Great", "recipe_id": recipe['id'], "rating": 5}),
+                content_type='application/json', headers=headers)
+
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_if_modified_since(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+    url = f"/recipes/{recipe['id']}"
+    last_modified = client.get(url).headers['Last-Modified']
+
+    assert client.get(url, headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get(url, headers={'If-Modified-Since': 'Thu, 01 Jan 2015 00:00:00 GMT'}).status_code == 200
+
+
+def test_collection_etag_changes_on_create_and_delete(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    first = create_recipe(client, headers, "Soup")
+    create_recipe(client, headers, "Salad")
+
+    etag = client.get('/recipes').headers['ETag']
+    assert client.get('/recipes', headers={'If-None-Match': etag}).status_code == 304
+    # Each representation (page, filter) has its own validator
+    assert client.get('/recipes?limit=1').headers['ETag'] != etag
+
+    client.delete(f"/recipes/{first['id']}", headers=headers)
+    response = client.get('/recipes', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(json.loads(response.data)) == 1
+
+
+def test_collection_probe_does_not_scan(client, count_queries):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+    comment = json.loads(client.post('/comments', data=json.dumps({"content": "Nice", "recipe_id": recipe['id']}),
+                                     content_type='application/json', headers=headers).data)
+    client.post('/comments', data=json.dumps({"content": "Newer", "recipe_id": recipe['id']}),
+                content_type='application/json', headers=headers)
+    recipes_etag = client.get('/recipes').headers['ETag']
+    comments_etag = client.get('/comments').headers['ETag']
+
+    with count_queries() as statements:
+        assert client.get('/recipes', headers={'If-None-Match': recipes_etag}).status_code == 304
+        assert client.get('/comments', headers={'If-None-Match': comments_etag}).status_code == 304
+    assert len(statements) == 2
+    assert not any("count(" in statement.lower() or "join" in statement.lower() for statement in statements)
+
+    # Deleting a comment that is not the newest row is caught by the delete counter
+    client.delete(f"/comments/{comment['id']}", headers=headers)
+    assert client.get('/comments', headers={'If-None-Match': comments_etag}).status_code == 200
+
+
+def test_recipe_comments_etag(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+    url = f"/recipes/{recipe['id']}/comments"
+    etag = client.get(url).headers['ETag']
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+
+    comment = json.loads(client.post('/comments',
+                                     data=json.dumps({"content": "Nice", "recipe_id": recipe['id']}),
+                                     content_type='application/json', headers=headers).data)
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+
+    comment_etag = client.get(f"/comments/{comment['id']}").headers['ETag']
+    client.put(f"/comments/{comment['id']}", data=json.dumps({"content": "Very nice"}),
+               content_type='application/json', headers=headers)
+    assert client.get(url, headers={'If-None-Match': etag}).status_code == 200
+    assert client.get(f"/comments/{comment['id']}", headers={'If-None-Match': comment_etag}).status_code == 200
+
+
+def test_not_modified_is_decided_by_the_probe_alone(client, count_queries):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+    url = f"/recipes/{recipe['id']}"
+    etag = client.get(url).headers['ETag']
+
+    with count_queries() as statements:
+        assert client.get(url, headers={'If-None-Match': etag}).status_code == 304
+    assert len(statements) == 1
+
+
+def test_missing_recipe_has_no_etag(client):
+    response = client.get('/recipes/999')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from database import engine, read_engine
+from utils.db_session import db_timings
+
+
+@pytest.fixture(autouse=True)
+def clear_db_timings():
+    db_timings.clear()
+    yield
+    db_timings.clear()
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def test_read_request_uses_one_autocommit_connection(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    client.post('/recipes', data=json.dumps({"title": "Stew", "dish_type": "Main",
+                                             "ingredients": "beef", "instructions": "simmer"}),
+                content_type='application/json', headers=headers)
+    db_timings.clear()
+
+    # Version probe, cache lookup and the listing itself share the session
+    assert client.get('/recipes').status_code == 200
+
+    stats = db_timings.snapshot()['get_recipes']
+    assert stats['checkout_wait']['count'] == 1
+    assert stats['hold']['count'] == 1
+    assert read_engine.pool.checkedout() == 0
+
+
+def test_write_request_uses_transactional_session(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    db_timings.clear()
+
+    response = client.post('/recipes', data=json.dumps({"title": "Stew", "dish_type": "Main",
+                                                        "ingredients": "beef", "instructions": "simmer"}),
+                           content_type='application/json', headers=headers)
+
+    assert response.status_code == 201
+    assert db_timings.snapshot()['create_recipe']['hold']['count'] >= 1
+    assert engine.pool.checkedout() == 0
+
+
+def test_routes_without_database_access_check_out_nothing(client):
+    assert client.get('/').status_code == 200
+    assert 'home' not in db_timings.snapshot()
+
+
+def test_streamed_response_holds_session_until_sent(client):
+    create_user_and_get_token(client)
+    db_timings.clear()
+
+    response = client.get('/users?stream=ndjson')
+    assert 'hold' not in db_timings.snapshot()['get_users']
+    assert len(response.get_data(as_text=True).splitlines()) == 1
+    response.close()
+    # The test client keeps the last request context alive until the next request
+    client.get('/')
+
+    assert db_timings.snapshot()['get_users']['hold']['count'] == 1
+    assert read_engine.pool.checkedout() == 0
+
+
+def test_db_metrics_endpoint(client):
+    client.get('/users')
+
+    data = json.loads(client.get('/metrics/db').data)
+
+    assert set(data['get_users']) == {'checkout_wait', 'hold'}
+    assert data['get_users']['hold']['count'] == 1
+    assert 'histogram' in data['get_users']['hold']
@@ -0,0 +1,168 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+from database import SessionLocal
+from models.recipe import Recipe
+from utils import export
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def setup_data(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    rows = [{"title": f"Pie {i}", "dish_type": "Dessert", "ingredients": "apples, flour",
+             "instructions": "Bake, then \"rest\"", "servings": i} for i in range(3)]
+    ids = [result["id"] for result in client.post('/recipes/bulk', data=json.dumps(rows),
+                                                   content_type='application/json', headers=headers).json["results"]]
+    client.post('/comments', data=json.dumps({"content": "Great", "rating": 5, "recipe_id": ids[0]}),
+                content_type='application/json', headers=headers)
+    return headers, ids
+
+
+def test_export_recipes_ndjson(client):
+    headers, ids = setup_data(client)
+
+    response = client.get('/export/recipes', headers=headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/x-ndjson'
+    assert 'filename="recipes.ndjson"' in response.headers['Content-Disposition']
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["id"] for row in rows] == ids
+    assert rows[1]["title"] == "Pie 1" and rows[1]["servings"] == 1
+    datetime.fromisoformat(rows[0]["updated_at"])
+
+
+def test_export_comments_csv(client):
+    headers, ids = setup_data(client)
+
+    response = client.get('/export/comments?format=csv', headers=headers)
+
+    assert response.mimetype == 'text/csv'
+    rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+    assert len(rows) == 1
+    assert rows[0]["recipe_id"] == str(ids[0]) and rows[0]["content"] == "Great"
+
+
+def test_export_csv_quotes_text_and_emits_header_when_empty(client):
+    headers, _ = setup_data(client)
+    text = client.get('/export/recipes?format=csv', headers=headers).get_data(as_text=True)
+    assert list(csv.reader(io.StringIO(text)))[1][4] == 'Bake, then "rest"'
+
+    future = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    text = client.get(f'/export/recipes?format=csv&since={future}', headers=headers).get_data(as_text=True)
+    assert text.splitlines() == ["id,title,dish_type,ingredients,instructions,preparation_time,origin,servings,"
+                                 "user_id,creation_date,updated_at"]
+
+
+def test_users_are_exported_by_the_cli_only(client, tmp_path):
+    from export_data import export_table
+    headers, _ = setup_data(client)
+    assert client.get('/export/users', headers=headers).status_code == 404
+
+    path = tmp_path / "users.ndjson"
+    export_table("users", output=str(path))
+
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert rows == [{"id": rows[0]["id"], "name": "testuser", "email": "test@example.com",
+                     "registration_date": rows[0]["registration_date"]}]
+
+
+def test_export_gzip(client):
+    headers, ids = setup_data(client)
+
+    response = client.get('/export/recipes?gzip=1', headers=headers)
+
+    assert response.mimetype == 'application/gzip'
+    assert 'filename="recipes.ndjson.gz"' in response.headers['Content-Disposition']
+    lines = gzip.decompress(response.data).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == ids
+
+
+def test_export_since_returns_only_newer_rows(client):
+    headers, ids = setup_data(client)
+    db = SessionLocal()
+    try:
+        db.query(Recipe).filter(Recipe.id != ids[2]).update({Recipe.updated_at: datetime(2020, 1, 1)})
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.get('/export/recipes?since=2024-01-01T00:00:00Z', headers=headers)
+
+    assert [json.loads(line)["id"] for line in response.get_data(as_text=True).splitlines()] == [ids[2]]
+
+
+def test_next_since_header_picks_up_later_writes(client):
+    headers, ids = setup_data(client)
+    next_since = client.get('/export/recipes', headers=headers).headers['X-Export-Next-Since']
+    started_at = datetime.fromisoformat(next_since) + timedelta(seconds=export.EXPORT_OVERLAP_SECONDS)
+    assert started_at <= datetime.utcnow()
+
+    client.post('/recipes', data=json.dumps({"title": "Later", "dish_type": "Main", "ingredients": "x",
+                                              "instructions": "y"}),
+                content_type='application/json', headers=headers)
+    # Stamped before the export started but committed after it had read past it
+    db = SessionLocal()
+    try:
+        db.query(Recipe).filter(Recipe.id == ids[0]).update({Recipe.updated_at: started_at - timedelta(seconds=1)})
+        db.query(Recipe).filter(Recipe.id != ids[0]).update({Recipe.updated_at: datetime(2020, 1, 1)})
+        db.query(Recipe).filter(Recipe.title == "Later").update({Recipe.updated_at: datetime.utcnow()})
+        db.commit()
+    finally:
+        db.close()
+    response = client.get(f'/export/recipes?since={next_since}', headers=headers)
+
+    assert [json.loads(line)["title"] for line in response.get_data(as_text=True).splitlines()] == ["Pie 0", "Later"]
+
+
+def test_export_reads_keyset_pages(client, count_queries, monkeypatch):
+    monkeypatch.setattr(export, "STREAM_BATCH_SIZE", 2)
+    headers, ids = setup_data(client)
+    more = [{"title": f"Tart {i}", "dish_type": "Dessert", "ingredients": "x", "instructions": "y"} for i in range(2)]
+    ids += [result["id"] for result in client.post('/recipes/bulk', data=json.dumps(more),
+                                                    content_type='application/json', headers=headers).json["results"]]
+    db = SessionLocal()
+    try:
+        # Ties on updated_at are broken by id across page boundaries
+        db.query(Recipe).update({Recipe.updated_at: datetime(2024, 6, 1)})
+        db.commit()
+    finally:
+        db.close()
+
+    for query in ('', '?since=2024-01-01'):
+        with count_queries() as statements:
+            response = client.get(f'/export/recipes{query}', headers=headers)
+            lines = response.get_data(as_text=True).splitlines()
+
+        assert [json.loads(line)["id"] for line in lines] == ids
+        assert len([statement for statement in statements if "LIMIT" in statement]) == 3
+
+
+def test_export_rejects_bad_parameters(client):
+    headers, _ = setup_data(client)
+    assert client.get('/export/recipes?format=xml', headers=headers).status_code == 400
+    assert client.get('/export/recipes?since=yesterday', headers=headers).status_code == 400
+    assert client.get('/export/ratings', headers=headers).status_code == 404
+    assert client.get('/export/recipes').status_code == 401
+
+
+def test_export_cli_writes_file(client, tmp_path):
+    from export_data import export_table
+    setup_data(client)
+
+    path = tmp_path / "recipes.csv.gz"
+    export_table("recipes", fmt="csv", compress=True, output=str(path))
+
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(path.read_bytes()).decode())))
+    assert [row["title"] for row in rows] == ["Pie 0", "Pie 1", "Pie 2"]
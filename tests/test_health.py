@@ -0,0 +1,82 @@
+import threading
+import time
+
+from services import health_service
+from services.health_service import HealthService
+
+
+def test_liveness_does_not_touch_the_database(client, count_queries):
+    with count_queries() as statements:
+        response = client.get('/health')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'OK'
+    assert statements == []
+
+
+def test_ready_reports_probe_pools_and_cache(client):
+    response = client.get('/ready')
+
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['status'] == 'ready'
+    assert data['database']['ok'] is True
+    assert data['database']['latency_ms'] >= 0
+    assert set(data['pools']) == {'write', 'read'}
+    assert data['in_flight_requests'] >= 1
+    assert data['cache']['search_index']['built'] is False
+
+
+def test_not_ready_when_database_probe_fails(client, monkeypatch):
+    def broken():
+        raise RuntimeError("Can't connect to MySQL server")
+    monkeypatch.setattr(health_service, "_ping_database", broken)
+
+    response = client.get('/ready')
+
+    assert response.status_code == 503
+    assert "database probe failed" in response.get_json()['reasons'][0]
+
+
+def test_probe_is_bounded_in_time(client, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(health_service, "_ping_database", lambda: release.wait(5) and 0.0)
+    monkeypatch.setattr(health_service, "READY_DB_TIMEOUT_SECONDS", 0.05)
+    try:
+        started = time.monotonic()
+        first = client.get('/ready')
+        elapsed = time.monotonic() - started
+        # The hung probe is still running: the next check fails without queueing another
+        second = client.get('/ready')
+    finally:
+        release.set()
+
+    assert first.status_code == 503
+    assert "no answer within 0.05s" in first.get_json()['reasons'][0]
+    assert elapsed < 0.5
+    assert "still running" in second.get_json()['reasons'][0]
+
+
+def test_overloaded_worker_fails_fast_without_probing(client, monkeypatch):
+    probes = []
+    monkeypatch.setattr(health_service, "_ping_database", lambda: probes.append(1) or 0.0)
+    monkeypatch.setattr(health_service, "READY_MAX_IN_FLIGHT", 0)
+
+    response = client.get('/ready')
+
+    assert response.status_code == 503
+    assert "requests in flight" in response.get_json()['reasons'][0]
+    assert probes == []
+
+
+def test_slow_database_is_not_ready(client, monkeypatch):
+    monkeypatch.setattr(health_service, "_ping_database", lambda: 900.0)
+
+    response = client.get('/ready')
+
+    assert response.status_code == 503
+    assert "took 900.0ms" in response.get_json()['reasons'][0]
+
+
+def test_in_flight_counter_returns_to_zero(client):
+    client.get('/users')
+    assert HealthService.in_flight() == 0
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from database import SessionLocal
+from models.ingredient import Ingredient, RecipeIngredient
+from repositories.ingredient_repository import IngredientRepository
+from utils.ingredients import parse_ingredients
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe(client, headers, title, ingredients):
+    recipe = {"title": title, "dish_type": "Main", "ingredients": ingredients, "instructions": "Cook"}
+    return client.post('/recipes', data=json.dumps(recipe), content_type='application/json', headers=headers).json["id"]
+
+
+def titles(response):
+    return [recipe["title"] for recipe in response.json]
+
+
+def setup_recipes(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipe(client, headers, "Hummus", "1 can (15 oz) chickpeas, drained\n2 tbsp tahini\n1 clove garlic\nSalt")
+    create_recipe(client, headers, "Chana masala", "2 cups chickpeas\n3 ripe tomatoes, diced\n1 onion\n2 cloves garlic")
+    create_recipe(client, headers, "Salad", "tomatoes, cucumber, red onion, olive oil")
+    return headers
+
+
+@pytest.mark.parametrize("text, names", [
+    ("apples, flour", ["apple", "flour"]),
+    ("2 1/4 cups all-purpose flour\n1 cup butter, softened\n2 large eggs", ["all-purpose flour", "butter", "egg"]),
+    ("Salt and pepper to taste\nFresh basil leaves", ["salt", "pepper", "basil leaf"]),
+    ("28 oz can crushed tomatoes\n1/2 cup chopped walnuts (optional)", ["tomato", "walnut"]),
+    ("3 ripe bananas, mashed\n2 cups berries\n1 Crème Fraîche", ["banana", "berry", "creme fraiche"]),
+    ("a pinch of salt\nsalt\n2-3 cloves garlic", ["salt", "garlic"]),
+    ("", []),
+])
+def test_parse_ingredients(text, names):
+    assert parse_ingredients(text) == names
+
+
+def test_match_all_and_any_ranked_by_overlap(client):
+    setup_recipes(client)
+
+    both = client.get('/recipes/by-ingredients?ingredients=Chickpeas,garlic')
+    anything = client.get('/recipes/by-ingredients?ingredients=chickpea,tomato,red onion&match=any')
+
+    assert both.status_code == 200
+    # Same overlap: the recipe with fewer other ingredients first
+    assert titles(both) == ["Hummus", "Chana masala"]
+    assert both.json[0]["matched_ingredients"] == ["chickpea", "garlic"]
+    assert titles(anything) == ["Chana masala", "Salad", "Hummus"]
+    assert [recipe["matched_count"] for recipe in anything.json] == [2, 2, 1]
+
+
+def test_unknown_ingredient(client):
+    setup_recipes(client)
+
+    assert client.get('/recipes/by-ingredients?ingredients=chickpeas,saffron').json == []
+    assert titles(client.get('/recipes/by-ingredients?ingredients=chickpeas,saffron&match=any')) == \
+        ["Hummus", "Chana masala"]
+
+
+def test_index_follows_updates_deletes_and_bulk_imports(client):
+    headers = setup_recipes(client)
+    salad_id = client.get('/recipes/by-ingredients?ingredients=cucumber').json[0]["id"]
+
+    client.put(f'/recipes/{salad_id}', data=json.dumps({"ingredients": "cucumber\nfeta cheese"}),
+               content_type='application/json', headers=headers)
+    client.post('/recipes/bulk', data=json.dumps([
+        {"title": "Falafel", "dish_type": "Main", "ingredients": "chickpeas, parsley, garlic", "instructions": "Fry"},
+    ]), content_type='application/json', headers=headers)
+
+    assert titles(client.get('/recipes/by-ingredients?ingredients=feta cheese')) == ["Salad"]
+    assert titles(client.get('/recipes/by-ingredients?ingredients=tomato')) == ["Chana masala"]
+    assert titles(client.get('/recipes/by-ingredients?ingredients=parsley,chickpeas')) == ["Falafel"]
+
+    client.delete(f'/recipes/{salad_id}', headers=headers)
+
+    assert client.get('/recipes/by-ingredients?ingredients=cucumber').json == []
+
+
+def test_backfill_rebuilds_links(client):
+    setup_recipes(client)
+    db = SessionLocal()
+    try:
+        expected = sorted(db.query(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id).all())
+        db.query(RecipeIngredient).delete()
+        db.commit()
+
+        assert IngredientRepository.backfill(db, batch_size=2) == 3
+
+        assert sorted(db.query(RecipeIngredient.recipe_id, RecipeIngredient.ingredient_id).all()) == expected
+        assert db.query(Ingredient).filter(Ingredient.name == "chickpea").count() == 1
+    finally:
+        db.close()
+
+
+def test_search_uses_ingredient_index(client, count_queries):
+    setup_recipes(client)
+
+    with count_queries() as statements:
+        client.get('/recipes/by-ingredients?ingredients=chickpeas,garlic,tomato&match=any')
+
+    assert len(statements) == 4
+    assert not any("LIKE" in statement.upper() for statement in statements)
+
+
+@pytest.mark.parametrize("query", ["", "ingredients=", "ingredients=2 cups", "ingredients=salt&match=most",
+                                   "ingredients=" + ",".join(f"herb{chr(97 + i)}" for i in range(21))])
+def test_bad_queries_are_rejected(client, query):
+    assert client.get(f'/recipes/by-ingredients?{query}').status_code == 400
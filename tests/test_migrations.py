@@ -0,0 +1,166 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.dialects import mysql
+
+from migrations import MIGRATIONS, MigrationRunner
+from migrations.runner import Migration
+from migrations.steps import AddColumn, AddIndex, ChangeColumnType
+from models.comment import Comment
+from models.recipe import Recipe
+
+# The schema as it was before updated_at, recipe_ratings and the lookup indexes
+OLD_SCHEMA = [
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, name VARCHAR(100) NOT NULL, email VARCHAR(100) NOT NULL, "
+    "password VARCHAR(255) NOT NULL, registration_date DATETIME)",
+    "CREATE TABLE recipes (id INTEGER PRIMARY KEY, title VARCHAR(200) NOT NULL, dish_type VARCHAR(50) NOT NULL, "
+    "ingredients TEXT NOT NULL, instructions TEXT NOT NULL, preparation_time VARCHAR(50), origin VARCHAR(100), "
+    "servings INTEGER, creation_date DATETIME, user_id INTEGER NOT NULL REFERENCES users(id))",
+    "CREATE TABLE comments (id INTEGER PRIMARY KEY, content TEXT NOT NULL, rating FLOAT, comment_date DATETIME, "
+    "recipe_id INTEGER NOT NULL REFERENCES recipes(id), user_id INTEGER NOT NULL REFERENCES users(id))",
+    "INSERT INTO users VALUES (1, 'ann', 'ann@example.com', 'x', '2024-01-01 00:00:00')",
+    "INSERT INTO recipes VALUES (1, 'Pie', 'Dessert', 'apples', 'bake', NULL, NULL, 4, '2024-02-01 00:00:00', 1)",
+    "INSERT INTO recipes VALUES (2, 'Stew', 'Main', 'beef', 'simmer', '1 1/2 hours', NULL, 4, '2024-02-02 00:00:00', 1)",
+    "INSERT INTO comments VALUES (1, 'Great', 5, '2024-03-01 00:00:00', 1, 1)",
+    "INSERT INTO comments VALUES (2, 'Fine', 3, '2024-03-02 00:00:00', 1, 1)",
+]
+
+
+@pytest.fixture
+def old_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        for statement in OLD_SCHEMA:
+            connection.execute(text(statement))
+    yield engine
+    engine.dispose()
+
+
+def index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table)}
+
+
+def test_upgrade_brings_old_schema_up_to_date(old_engine):
+    runner = MigrationRunner(old_engine, MIGRATIONS)
+
+    reports = runner.upgrade()
+
+    assert {report["status"] for report in reports} == {"applied"}
+    assert all(report["ms"] >= 0 for report in reports)
+    assert set(runner.applied()) == {migration.revision for migration in MIGRATIONS}
+    assert {"ix_recipes_dish_type_preparation_minutes", "ix_recipes_creation_date", "ix_recipes_user_id_title",
+            "ix_recipes_updated_at"} <= index_names(old_engine, "recipes")
+    assert "ix_recipes_dish_type" not in index_names(old_engine, "recipes")
+    assert {"ix_comments_user_id", "ix_comments_recipe_id_comment_date_id",
+            "ix_comments_updated_at"} <= index_names(old_engine, "comments")
+    with old_engine.connect() as connection:
+        assert connection.execute(text("SELECT updated_at FROM recipes WHERE id = 1")).scalar() == "2024-02-01 00:00:00"
+        assert connection.execute(text("SELECT preparation_minutes FROM recipes ORDER BY id")).scalars().all() == \
+            [None, 90]
+        assert connection.execute(text(
+            "SELECT rating_count, rating_sum FROM recipe_ratings WHERE recipe_id = 1")).one() == (2, 8)
+    assert runner.pending() == [] and runner.upgrade() == []
+
+
+def test_widened_ratings_lose_their_single_precision_error(old_engine):
+    with old_engine.begin() as connection:
+        connection.execute(text("UPDATE comments SET rating = 4.300000190734863 WHERE id = 2"))
+
+    MigrationRunner(old_engine, MIGRATIONS).upgrade()
+
+    with old_engine.connect() as connection:
+        assert connection.execute(text("SELECT rating FROM comments ORDER BY id")).scalars().all() == [5, 4.3]
+
+
+def test_steps_already_present_are_skipped(client):
+    from database import engine
+    runner = MigrationRunner(engine, MIGRATIONS)
+    indexes = {table: index_names(engine, table) for table in ("recipes", "comments")}
+
+    reports = runner.upgrade()
+
+    # create_all built the latest schema: no column or table is added, and an
+    # index an older revision adds is dropped again by the one superseding it
+    applied = [report["step"] for report in reports if report["status"] == "applied"]
+    assert not [step for step in applied if step.startswith(("column", "table"))]
+    assert {table: index_names(engine, table) for table in indexes} == indexes
+
+
+def test_dry_run_leaves_the_database_untouched(old_engine):
+    runner = MigrationRunner(old_engine, MIGRATIONS)
+
+    reports = runner.dry_run(sample_rows=10)
+
+    assert len(reports) == sum(len(migration.steps) for migration in MIGRATIONS)
+    assert {report["status"] for report in reports} == {"applied"}
+    assert "ix_recipes_dish_type" not in index_names(old_engine, "recipes")
+    assert "updated_at" not in {column["name"] for column in inspect(old_engine).get_columns("recipes")}
+    assert runner.applied() == {}
+
+
+def test_failed_migration_is_not_recorded_and_resumes(old_engine):
+    broken = Migration("0001_broken", "index on a missing column", [
+        AddIndex("recipes", "ix_recipes_dish_type", ["dish_type"]),
+        AddIndex("recipes", "ix_recipes_nope", ["nope"]),
+    ])
+    runner = MigrationRunner(old_engine, [broken])
+    with pytest.raises(Exception):
+        runner.upgrade()
+    assert runner.applied() == {}
+
+    broken.steps[1] = AddIndex("recipes", "ix_recipes_origin", ["origin"])
+    reports = runner.upgrade()
+
+    assert [report["status"] for report in reports] == ["skipped", "applied"]
+    assert list(runner.applied()) == ["0001_broken"]
+
+
+def test_stamp_records_without_running(old_engine):
+    runner = MigrationRunner(old_engine, MIGRATIONS)
+
+    assert runner.stamp() == [migration.revision for migration in MIGRATIONS]
+
+    assert all(isinstance(applied_at, datetime) for applied_at in runner.applied().values())
+    assert "ix_recipes_dish_type" not in index_names(old_engine, "recipes")
+
+
+def test_create_tables_migrates_an_existing_schema(old_engine):
+    from create_tables import create_tables
+
+    create_tables(old_engine)
+
+    runner = MigrationRunner(old_engine, MIGRATIONS)
+    assert runner.pending() == []
+    with old_engine.connect() as connection:
+        assert connection.execute(text("SELECT preparation_minutes FROM recipes ORDER BY id")).scalars().all() == \
+            [None, 90]
+        assert connection.execute(text("SELECT updated_at FROM recipes WHERE id = 1")).scalar() == "2024-02-01 00:00:00"
+
+
+def test_create_tables_stamps_an_empty_database(tmp_path):
+    from create_tables import create_tables
+    engine = create_engine(f"sqlite:///{tmp_path / 'new.db'}")
+    try:
+        create_tables(engine)
+
+        runner = MigrationRunner(engine, MIGRATIONS)
+        assert set(runner.applied()) == {migration.revision for migration in MIGRATIONS}
+        assert "preparation_minutes" in {column["name"] for column in inspect(engine).get_columns("recipes")}
+    finally:
+        engine.dispose()
+
+
+def test_mysql_statements_use_online_ddl():
+    class FakeConnection:
+        dialect = mysql.dialect()
+
+    connection = FakeConnection()
+
+    assert AddIndex("recipes", "ix_recipes_dish_type", ["dish_type"]).statements(connection) == [
+        "ALTER TABLE recipes ADD INDEX ix_recipes_dish_type (dish_type), ALGORITHM=INPLACE, LOCK=NONE"]
+    assert AddColumn(Recipe.__table__.c.updated_at).statements(connection) == [
+        "ALTER TABLE recipes ADD COLUMN updated_at DATETIME(6) NULL, ALGORITHM=INPLACE, LOCK=NONE"]
+    # A type change cannot be made in place; the copy is asked for, not stumbled into
+    assert ChangeColumnType(Comment.__table__.c.rating).statements(connection) == [
+        "ALTER TABLE comments MODIFY COLUMN rating DOUBLE NULL, ALGORITHM=COPY, LOCK=SHARED"]
@@ -0,0 +1,89 @@
+import json
+
+from utils import multi_get
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipes(client, headers, count):
+    rows = [{"title": f"Curry {i}", "dish_type": "Main", "ingredients": "rice", "instructions": "cook"}
+            for i in range(count)]
+    response = client.post('/recipes/bulk', data=json.dumps(rows), content_type='application/json', headers=headers)
+    return [result["id"] for result in response.json["results"]]
+
+
+def test_recipes_by_ids_keep_requested_order_and_report_missing(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    ids = create_recipes(client, headers, 4)
+    requested = [ids[2], 999, ids[0], ids[2], ids[3]]
+
+    response = client.get('/recipes?ids=' + ",".join(map(str, requested)))
+
+    assert response.status_code == 200
+    data = response.json
+    assert [recipe["id"] for recipe in data["items"]] == [ids[2], ids[0], ids[3]]
+    assert data["items"][0]["user_name"] == "testuser"
+    assert data["missing"] == [999]
+
+
+def test_recipes_by_ids_is_one_query(client, count_queries):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    ids = create_recipes(client, headers, 5)
+
+    with count_queries() as statements:
+        response = client.get('/recipes?ids=' + ",".join(map(str, ids)))
+
+    assert len(response.json["items"]) == 5
+    selects = [s for s in statements if "FROM recipes" in s and " IN (" in s]
+    assert len(selects) == 1
+    # The version probe for the ETag, plus the multi-get itself
+    assert len(statements) == 2
+
+
+def test_comments_by_ids_include_authors(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe_id = create_recipes(client, headers, 1)[0]
+    comment_ids = []
+    for text in ("first", "second"):
+        response = client.post('/comments', data=json.dumps({"content": text, "recipe_id": recipe_id}),
+                               content_type='application/json', headers=headers)
+        comment_ids.append(response.json["id"])
+
+    response = client.get(f'/comments?ids={comment_ids[1]}&ids={comment_ids[0]},12345')
+
+    data = response.json
+    assert [comment["content"] for comment in data["items"]] == ["second", "first"]
+    assert data["items"][0]["user_name"] == "testuser"
+    assert data["missing"] == [12345]
+
+
+def test_users_by_ids(client):
+    create_user_and_get_token(client, email="a@example.com", name="alice")
+    create_user_and_get_token(client, email="b@example.com", name="bob")
+    users = client.get('/users').json
+    by_name = {user["name"]: user["id"] for user in users}
+
+    data = client.get(f'/users?ids={by_name["bob"]},{by_name["alice"]}').json
+
+    assert [user["name"] for user in data["items"]] == ["bob", "alice"]
+    assert data["missing"] == []
+    assert "password" not in data["items"][0]
+
+
+def test_ids_validation(client, monkeypatch):
+    monkeypatch.setattr(multi_get, "MULTI_GET_MAX_IDS", 3)
+    assert client.get('/recipes?ids=1,x').status_code == 400
+    assert client.get('/recipes?ids=').status_code == 400
+    assert client.get('/recipes?ids=0').status_code == 400
+    response = client.get('/comments?ids=1,2,3,4')
+    assert response.status_code == 400
+    assert "At most 3 ids" in response.json["error"]
+    # Duplicates count once towards the cap
+    assert client.get('/users?ids=1,1,2,2,3').status_code == 200
@@ -0,0 +1,97 @@
+import json
+
+from utils.pagination import decode_cursor, encode_cursor
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe(client, token, title):
+    response = client.post('/recipes',
+                           data=json.dumps({
+                               "title": title,
+                               "dish_type": "Main",
+                               "ingredients": "ing",
+                               "instructions": "inst"
+                           }),
+                           content_type='application/json',
+                           headers={'Authorization': f'Bearer {token}'})
+    return json.loads(response.data)
+
+
+def walk_pages(client, url, limit):
+    """Follow next_cursor until the last page and return every item seen"""
+    items = []
+    response = client.get(f'{url}?limit={limit}')
+    while True:
+        assert response.status_code == 200
+        data = json.loads(response.data)
+        assert len(data['items']) <= limit
+        items.extend(data['items'])
+        if data['next_cursor'] is None:
+            return items
+        response = client.get(f"{url}?limit={limit}&cursor={data['next_cursor']}")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({"id": 42})
+    assert decode_cursor(cursor, 'id') == {"id": 42}
+
+
+def test_recipes_pages_cover_every_row_once(client):
+    token = create_user_and_get_token(client)
+    created = [create_recipe(client, token, f"Recipe {i}")['id'] for i in range(7)]
+
+    items = walk_pages(client, '/recipes', 3)
+
+    assert [item['id'] for item in items] == created
+    assert all(item['user_name'] == 'testuser' for item in items)
+
+
+def test_users_and_comments_pages(client):
+    token = create_user_and_get_token(client)
+    for i in range(4):
+        create_user_and_get_token(client, email=f"user{i}@example.com", name=f"user{i}")
+    recipe = create_recipe(client, token, "Commented")
+    for i in range(5):
+        client.post('/comments',
+                    data=json.dumps({"content": f"comment {i}", "recipe_id": recipe['id']}),
+                    content_type='application/json',
+                    headers={'Authorization': f'Bearer {token}'})
+
+    users = walk_pages(client, '/users', 2)
+    comments = walk_pages(client, '/comments', 2)
+
+    assert len(users) == 5
+    assert [c['content'] for c in comments] == [f"comment {i}" for i in range(5)]
+
+
+def test_limit_is_capped(client, monkeypatch):
+    from utils import pagination
+    monkeypatch.setattr(pagination, "MAX_PAGE_SIZE", 2)
+    token = create_user_and_get_token(client)
+    for i in range(3):
+        create_recipe(client, token, f"Recipe {i}")
+
+    response = client.get('/recipes?limit=50')
+
+    data = json.loads(response.data)
+    assert len(data['items']) == 2
+    assert data['next_cursor'] is not None
+
+
+def test_invalid_cursor_and_limit_are_rejected(client):
+    assert client.get('/recipes?cursor=not-a-cursor').status_code == 400
+    assert client.get('/users?limit=abc').status_code == 400
+    assert client.get('/comments?limit=0').status_code == 400
+
+
+def test_plain_listing_still_returns_a_list(client):
+    response = client.get('/recipes')
+    assert json.loads(response.data) == []
@@ -0,0 +1,175 @@
+import json
+import random
+
+from database import SessionLocal
+from services.pantry_index import PantryIndex, pantry_index
+from utils import bitsets
+from utils.ingredients import PANTRY_MAX_MISSING
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe(client, headers, title, ingredients):
+    recipe = {"title": title, "dish_type": "Main", "ingredients": ingredients, "instructions": "Cook"}
+    return client.post('/recipes', data=json.dumps(recipe), content_type='application/json', headers=headers).json["id"]
+
+
+def titles(response):
+    return [recipe["title"] for recipe in response.json]
+
+
+def setup_recipes(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipe(client, headers, "Pancakes", "2 cups flour\n2 eggs\n1 cup milk\n1 tbsp sugar")
+    create_recipe(client, headers, "Omelette", "3 eggs, beaten\nSalt")
+    create_recipe(client, headers, "Scrambled eggs", "eggs, butter, milk")
+    create_recipe(client, headers, "Bread", "flour, water, yeast, salt")
+    return headers
+
+
+def test_pantry_ranks_by_missing_then_matched(client):
+    setup_recipes(client)
+
+    response = client.get('/recipes/pantry?ingredients=eggs,milk,butter,salt&max_missing=2')
+
+    assert response.status_code == 200
+    assert titles(response) == ["Scrambled eggs", "Omelette", "Pancakes"]
+    assert response.json[0]["missing_count"] == 0
+    pancakes = response.json[2]
+    assert pancakes["matched_ingredients"] == ["egg", "milk"] and pancakes["matched_count"] == 2
+    assert pancakes["missing_ingredients"] == ["flour", "sugar"] and pancakes["missing_count"] == 2
+
+
+def test_pantry_max_missing_and_limit(client):
+    setup_recipes(client)
+
+    assert titles(client.get('/recipes/pantry?ingredients=egg,milk,butter,salt&max_missing=0')) == \
+        ["Scrambled eggs", "Omelette"]
+    assert titles(client.get('/recipes/pantry?ingredients=egg,milk,butter,salt&limit=1')) == ["Scrambled eggs"]
+    # Recipes sharing nothing with the pantry are never suggested, however small
+    assert client.get('/recipes/pantry?ingredients=chocolate&max_missing=5').json == []
+
+
+def test_pantry_follows_creates_updates_and_deletes(client):
+    headers = setup_recipes(client)
+    assert titles(client.get('/recipes/pantry?ingredients=flour,water,yeast&max_missing=0')) == []
+    assert pantry_index.built
+
+    flatbread_id = create_recipe(client, headers, "Flatbread", "flour, water")
+    bread_id = client.get('/recipes/pantry?ingredients=flour,water,yeast,salt&max_missing=0').json[0]["id"]
+    client.put(f'/recipes/{flatbread_id}', data=json.dumps({"ingredients": "flour, water, yeast"}),
+               content_type='application/json', headers=headers)
+    client.delete(f'/recipes/{bread_id}', headers=headers)
+
+    response = client.get('/recipes/pantry?ingredients=flour,water,yeast&max_missing=0')
+    assert titles(response) == ["Flatbread"]
+    assert response.json[0]["matched_count"] == 3
+
+
+def test_pantry_includes_bulk_imports(client):
+    headers = setup_recipes(client)
+    client.get('/recipes/pantry?ingredients=egg')
+
+    rows = [{"title": "Boiled egg", "dish_type": "Main", "ingredients": "eggs, water", "instructions": "Boil"}]
+    client.post('/recipes/bulk', data=json.dumps(rows), content_type='application/json', headers=headers)
+
+    assert "Boiled egg" in titles(client.get('/recipes/pantry?ingredients=egg,water&max_missing=0'))
+
+
+def test_incremental_index_matches_rebuild(client):
+    headers = setup_recipes(client)
+    client.get('/recipes/pantry?ingredients=egg')
+    extra = create_recipe(client, headers, "Crepes", "flour, eggs, milk, butter")
+    client.delete(f'/recipes/{extra - 1}', headers=headers)
+
+    db = SessionLocal()
+    try:
+        fresh = PantryIndex()
+        fresh.ensure_built(db)
+    finally:
+        db.close()
+    pantry = ["egg", "milk", "flour", "butter", "salt", "water"]
+    assert pantry_index.match(pantry, 3, 20) == fresh.match(pantry, 3, 20)
+
+
+def test_one_ingredient_pantry_finds_recipes_missing_many():
+    index = PantryIndex()
+    index._load([(1, ("chickpea", "cumin", "garlic", "lemon", "tahini")), (2, ("chickpea", "salt"))])
+
+    assert [recipe_id for recipe_id, _matched, _missing in index.match({"chickpea"}, 4)] == [2, 1]
+    assert [recipe_id for recipe_id, _matched, _missing in index.match({"chickpea"}, 3)] == [2]
+
+
+def test_pantry_rejects_bad_parameters(client):
+    assert client.get('/recipes/pantry').status_code == 400
+    assert client.get('/recipes/pantry?ingredients=2 cups').status_code == 400
+    assert client.get('/recipes/pantry?ingredients=egg&max_missing=-1').status_code == 400
+    assert client.get('/recipes/pantry?ingredients=egg&max_missing=99').status_code == 400
+    assert client.get('/recipes/pantry?ingredients=egg&max_missing=two').status_code == 400
+    assert client.get('/recipes/pantry?ingredients=egg&limit=0').status_code == 400
+
+
+def test_index_agrees_with_brute_force():
+    rng = random.Random(7)
+    vocabulary = [f"ingredient{chr(97 + i // 26)}{chr(97 + i % 26)}" for i in range(300)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def draw():
+        return tuple(dict.fromkeys(rng.choices(vocabulary, weights, k=rng.randint(1, 8))))
+
+    recipes = {recipe_id: draw() for recipe_id in range(1, 1500)}
+    index = PantryIndex()
+    index._load(sorted(recipes.items()))
+    for _ in range(1000):
+        recipe_id = rng.choice(list(recipes))
+        action = rng.random()
+        if action < 0.3:
+            del recipes[recipe_id]
+            index._set(recipe_id, None)
+        else:
+            if action > 0.6:
+                recipe_id = max(recipes) + 1
+            recipes[recipe_id] = draw()
+            index._set(recipe_id, recipes[recipe_id])
+
+    for _ in range(40):
+        pantry = set(rng.sample(vocabulary[:100], rng.randint(1, 30)))
+        max_missing = rng.randint(0, PANTRY_MAX_MISSING)
+        expected = sorted(
+            (len(names) - len(pantry & set(names)), -len(pantry & set(names)), recipe_id,
+             [name for name in names if name in pantry], [name for name in names if name not in pantry])
+            for recipe_id, names in recipes.items()
+            if pantry & set(names) and len(set(names) - pantry) <= max_missing
+        )
+        assert index.match(pantry, max_missing, 50) == [row[2:] for row in expected[:50]]
+
+
+def test_bit_sliced_counts():
+    rng = random.Random(3)
+    size = 300
+    numbers = [rng.randint(0, 12) for _ in range(size)]
+    planes = []
+    for slot, number in enumerate(numbers):
+        bitsets.set_number(planes, slot, number)
+    everything = bitsets.from_positions(range(size), size)
+
+    plus_two = bitsets.add_constant(planes, 2, everything)
+    counted = []
+    for _ in range(3):
+        bitsets.add_bitset(counted, everything)
+    counted_numbers = bitsets.add_constant(counted, 11, everything)
+
+    assert set(bitsets.positions(bitsets.equal(plus_two, counted_numbers, everything))) == \
+        {slot for slot, number in enumerate(numbers) if number == 12}
+    # The constant may reach planes the numbers never used
+    assert bitsets.add_constant([1], 4, 1) == [1, 0, 1]
+    groups = list(bitsets.by_value_descending(planes, everything))
+    assert [value for value, _group in groups] == sorted(set(numbers), reverse=True)
+    assert all(numbers[slot] == value for value, group in groups for slot in bitsets.positions(group))
@@ -0,0 +1,116 @@
+import hashlib
+import json
+
+import pytest
+
+from database import SessionLocal
+from models.user import User
+from repositories import user_repository
+from utils import passwords
+from utils.passwords import PasswordHasher, PasswordHasherBusy, password_hasher
+
+
+def register(client, email="test@example.com", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": "testuser", "email": email, "password": password}),
+                content_type='application/json')
+
+
+def login(client, email="test@example.com", password="testpassword123"):
+    return client.post('/users/login', data=json.dumps({"email": email, "password": password}),
+                       content_type='application/json')
+
+
+def stored_hash(email="test@example.com"):
+    db = SessionLocal()
+    try:
+        return db.query(User).filter(User.email == email).first().password
+    finally:
+        db.close()
+
+
+def set_stored_hash(value, email="test@example.com"):
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == email).update({User.password: value})
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_hashes_are_salted_scrypt():
+    first = password_hasher.hash("secret")
+    second = password_hasher.hash("secret")
+
+    assert first.startswith(f"scrypt${passwords.PASSWORD_SCRYPT_N}$")
+    assert first != second
+    assert password_hasher.verify("secret", first) == (True, False)
+    assert password_hasher.verify("wrong", first) == (False, False)
+
+
+def test_legacy_sha256_hash_is_upgraded_on_login(client):
+    register(client)
+    set_stored_hash(hashlib.sha256(b"testpassword123").hexdigest())
+
+    assert login(client).status_code == 200
+    assert stored_hash().startswith("scrypt$")
+    assert login(client).status_code == 200
+    assert login(client, password="wrong").status_code == 401
+
+
+def test_changed_cost_rehashes_on_login(client, monkeypatch):
+    register(client)
+    old_hash = stored_hash()
+    monkeypatch.setattr(passwords, "PASSWORD_SCRYPT_N", passwords.PASSWORD_SCRYPT_N * 2)
+
+    assert login(client).status_code == 200
+
+    new_hash = stored_hash()
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"scrypt${passwords.PASSWORD_SCRYPT_N}$")
+
+
+def test_rehash_is_skipped_when_pool_is_full(client, monkeypatch):
+    register(client)
+    old_hash = stored_hash()
+    monkeypatch.setattr(passwords, "PASSWORD_SCRYPT_N", passwords.PASSWORD_SCRYPT_N * 2)
+
+    def busy(password):
+        raise PasswordHasherBusy("full")
+    monkeypatch.setattr(password_hasher, "hash", busy)
+
+    assert login(client).status_code == 200
+    assert stored_hash() == old_hash
+
+
+def test_unknown_email_still_pays_for_a_verify(client):
+    before = password_hasher.stats()['kdf']['count']
+    assert login(client, email="nobody@example.com").status_code == 401
+    assert password_hasher.stats()['kdf']['count'] == before + 1
+
+
+def test_full_pool_rejects_instead_of_queueing():
+    hasher = PasswordHasher(workers=1, queue_limit=0)
+    hasher._slots.acquire()
+
+    with pytest.raises(PasswordHasherBusy):
+        hasher.hash("secret")
+    assert hasher.stats()['rejected'] == 1
+
+
+def test_login_returns_503_when_hashing_pool_is_full(client, monkeypatch):
+    register(client)
+    saturated = PasswordHasher(workers=1, queue_limit=0)
+    saturated._slots.acquire()
+    monkeypatch.setattr(user_repository, "password_hasher", saturated)
+
+    response = login(client)
+
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_password_metrics_endpoint(client):
+    register(client)
+    data = json.loads(client.get('/metrics/passwords').data)
+    assert data['kdf']['count'] >= 1
+    assert data['cost']['n'] == passwords.PASSWORD_SCRYPT_N
@@ -0,0 +1,101 @@
+import json
+import time
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+
+from utils.pool import InstrumentedQueuePool, install_idle_ping, pool_status
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=0, pool_timeout=0.05)
+    yield engine
+    engine.dispose()
+
+
+def count_pings(engine):
+    pings = []
+    original = engine.dialect.do_ping
+
+    def do_ping(dbapi_connection):
+        pings.append(dbapi_connection)
+        return original(dbapi_connection)
+
+    engine.dialect.do_ping = do_ping
+    return pings
+
+
+def test_checkout_is_timed_and_counted(sqlite_engine):
+    with sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        status = pool_status(sqlite_engine)
+        assert status["checked_out"] == 1
+        assert status["size"] == 1
+
+    status = pool_status(sqlite_engine)
+    assert status["checked_out"] == 0
+    assert status["waiting"] == 0
+    assert status["checkout"]["count"] == 1
+
+
+def test_pool_timeout_is_counted(sqlite_engine):
+    with sqlite_engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            sqlite_engine.connect()
+
+    assert pool_status(sqlite_engine)["timeouts"] == 1
+
+
+def test_recently_used_connections_are_not_pinged(sqlite_engine):
+    install_idle_ping(sqlite_engine, idle_seconds=60)
+    pings = count_pings(sqlite_engine)
+
+    for _ in range(3):
+        with sqlite_engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    assert pings == []
+
+
+def test_idle_connections_are_pinged(sqlite_engine):
+    install_idle_ping(sqlite_engine, idle_seconds=0.01)
+    pings = count_pings(sqlite_engine)
+
+    with sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+    time.sleep(0.02)
+    with sqlite_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    assert len(pings) == 1
+    assert pool_status(sqlite_engine)["pings"] == 1
+
+
+def test_failed_ping_replaces_the_connection(sqlite_engine):
+    install_idle_ping(sqlite_engine, idle_seconds=0.01)
+    with sqlite_engine.connect() as connection:
+        first = connection.connection.dbapi_connection
+    time.sleep(0.02)
+
+    def dead(dbapi_connection):
+        sqlite_engine.dialect.do_ping = lambda conn: True
+        raise sqlite_engine.dialect.loaded_dbapi.OperationalError("server has gone away")
+
+    sqlite_engine.dialect.do_ping = dead
+    with sqlite_engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+        assert connection.connection.dbapi_connection is not first
+
+    assert pool_status(sqlite_engine)["ping_failures"] == 1
+
+
+def test_pool_metrics_endpoint(client):
+    client.get('/users')
+
+    data = json.loads(client.get('/metrics/pool').data)
+
+    assert set(data) == {"write", "read"}
+    assert data["read"]["checkout"]["count"] >= 1
+    assert {"size", "checked_out", "overflow", "waiting"} <= set(data["read"])
@@ -0,0 +1,61 @@
+import json
+
+from utils.cache import response_cache
+
+
+def create_user_and_get_token(client, email, name, password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    data = json.loads(login_response.data)
+    return data['token'], data['user_id']
+
+
+def create_recipes(client, token, count, title="Soup"):
+    for i in range(count):
+        client.post('/recipes',
+                    data=json.dumps({
+                        "title": f"{title} {i}",
+                        "dish_type": "Main",
+                        "ingredients": "ing",
+                        "instructions": "inst"
+                    }),
+                    content_type='application/json',
+                    headers={'Authorization': f'Bearer {token}'})
+
+
+def queries_for(client, count_queries, url, headers=None):
+    # Measure the database path, not a response-cache hit
+    response_cache.clear()
+    with count_queries() as statements:
+        response = client.get(url, headers=headers or {})
+    assert response.status_code == 200
+    return len(statements), json.loads(response.data)
+
+
+def test_list_endpoints_query_count_does_not_grow_with_rows(client, count_queries):
+    """Every recipe list endpoint loads recipes and authors in a constant number of queries"""
+    token_a, user_a = create_user_and_get_token(client, "a@example.com", "alice")
+    token_b, _ = create_user_and_get_token(client, "b@example.com", "bob")
+    auth = {'Authorization': f'Bearer {token_a}'}
+
+    urls = ['/recipes', '/recipes/search?q=Soup', '/users/recipes',
+            '/users/recipes/search?q=Soup', f'/users/{user_a}/recipes']
+
+    create_recipes(client, token_a, 1)
+    create_recipes(client, token_b, 1)
+    for url in urls:
+        # Warm-up: the first search builds the in-memory index
+        queries_for(client, count_queries, url, auth)
+    baseline = {url: queries_for(client, count_queries, url, auth)[0] for url in urls}
+
+    create_recipes(client, token_a, 10)
+    create_recipes(client, token_b, 10)
+    for url in urls:
+        count, data = queries_for(client, count_queries, url, auth)
+        assert count == baseline[url], url
+        assert count <= 2, url
+        assert len(data) > 1
+        assert all(recipe['user_name'] in ("alice", "bob") for recipe in data)
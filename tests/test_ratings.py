@@ -0,0 +1,115 @@
+import json
+
+from database import SessionLocal
+from models.recipe_rating import RecipeRating, rating_bucket
+from repositories.recipe_rating_repository import RecipeRatingRepository
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe(client, headers, title="Rated Recipe"):
+    response = client.post('/recipes',
+                           data=json.dumps({"title": title, "dish_type": "Main",
+                                            "ingredients": "ing", "instructions": "inst"}),
+                           content_type='application/json', headers=headers)
+    return json.loads(response.data)
+
+
+def comment(client, headers, recipe_id, rating):
+    response = client.post('/comments',
+                           data=json.dumps({"content": "Nice", "recipe_id": recipe_id, "rating": rating}),
+                           content_type='application/json', headers=headers)
+    return json.loads(response.data)
+
+
+def aggregates(recipe_id):
+    db = SessionLocal()
+    try:
+        row = RecipeRatingRepository.get_by_recipe_id(db, recipe_id)
+        if row is None:
+            return 0, 0.0, [0] * 6
+        return row.rating_count, round(row.rating_sum, 6), row.histogram
+    finally:
+        db.close()
+
+
+def test_rating_bucket_rounds_halves_up():
+    assert [rating_bucket(r) for r in (0, 0.4, 0.5, 2.49, 2.5, 4.6, 5)] == [0, 0, 1, 2, 3, 5, 5]
+
+
+def test_aggregates_follow_comment_writes(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+
+    first = comment(client, headers, recipe['id'], 4)
+    comment(client, headers, recipe['id'], 5)
+    comment(client, headers, recipe['id'], None)
+    assert aggregates(recipe['id']) == (2, 9.0, [0, 0, 0, 0, 1, 1])
+
+    client.put(f"/comments/{first['id']}", data=json.dumps({"rating": 2.5}),
+               content_type='application/json', headers=headers)
+    assert aggregates(recipe['id']) == (2, 7.5, [0, 0, 0, 1, 0, 1])
+
+    client.delete(f"/comments/{first['id']}", headers=headers)
+    assert aggregates(recipe['id']) == (1, 5.0, [0, 0, 0, 0, 0, 1])
+
+
+def test_aggregates_are_exposed_on_recipe_responses(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    rated = create_recipe(client, headers, "Rated")
+    create_recipe(client, headers, "Unrated")
+    comment(client, headers, rated['id'], 3)
+    comment(client, headers, rated['id'], 4)
+
+    detail = json.loads(client.get(f"/recipes/{rated['id']}").data)
+    assert detail['rating_count'] == 2
+    assert detail['rating_avg'] == 3.5
+    assert detail['rating_histogram'] == [0, 0, 0, 1, 1, 0]
+
+    listing = {r['title']: r for r in json.loads(client.get('/recipes').data)}
+    assert listing['Rated']['rating_avg'] == 3.5
+    assert listing['Unrated']['rating_count'] == 0
+    assert listing['Unrated']['rating_avg'] is None
+
+
+def test_rebuild_matches_incremental_and_repairs_drift(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    first = create_recipe(client, headers, "First")
+    second = create_recipe(client, headers, "Second")
+    for rating in (1, 2, 5):
+        comment(client, headers, first['id'], rating)
+    comment(client, headers, second['id'], 0.2)
+    expected = {first['id']: aggregates(first['id']), second['id']: aggregates(second['id'])}
+
+    db = SessionLocal()
+    try:
+        db.query(RecipeRating).update({RecipeRating.rating_count: 99}, synchronize_session=False)
+        db.commit()
+        assert RecipeRatingRepository.rebuild_all(db) == 2
+    finally:
+        db.close()
+
+    assert {recipe_id: aggregates(recipe_id) for recipe_id in expected} == expected
+
+
+def test_missing_aggregate_row_is_recomputed_on_next_write(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = create_recipe(client, headers)
+    comment(client, headers, recipe['id'], 4)
+
+    db = SessionLocal()
+    try:
+        db.query(RecipeRating).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    comment(client, headers, recipe['id'], 2)
+    assert aggregates(recipe['id']) == (2, 6.0, [0, 0, 1, 0, 1, 0])
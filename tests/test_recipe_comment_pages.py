@@ -0,0 +1,111 @@
+import json
+from datetime import datetime
+
+from database import SessionLocal
+from models.comment import Comment
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe_with_comments(client, ratings, dates):
+    """One comment per rating; comment_date forced to the given dates so ties are exercised"""
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe_id = client.post('/recipes', data=json.dumps({"title": "Tacos", "dish_type": "Main",
+                                                         "ingredients": "tortillas", "instructions": "fill"}),
+                            content_type='application/json', headers=headers).json["id"]
+    ids = []
+    for i, rating in enumerate(ratings):
+        body = {"content": f"c{i}", "recipe_id": recipe_id}
+        if rating is not None:
+            body["rating"] = rating
+        ids.append(client.post('/comments', data=json.dumps(body), content_type='application/json',
+                               headers=headers).json["id"])
+    db = SessionLocal()
+    try:
+        for comment_id, date in zip(ids, dates):
+            db.query(Comment).filter(Comment.id == comment_id).update({Comment.comment_date: date})
+        db.commit()
+    finally:
+        db.close()
+    return recipe_id
+
+
+def walk(client, recipe_id, sort, limit):
+    """Follow next_cursor to the end, returning the comment contents in page order"""
+    contents, cursor = [], None
+    while True:
+        url = f'/recipes/{recipe_id}/comments?sort={sort}&limit={limit}'
+        if cursor:
+            url += f'&cursor={cursor}'
+        page = client.get(url).json
+        contents += [comment["content"] for comment in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return contents
+
+
+DAY1, DAY2, DAY3 = datetime(2025, 1, 1, 12), datetime(2025, 1, 2, 12), datetime(2025, 1, 3, 12)
+
+
+def test_newest_and_oldest_break_date_ties_by_id(client):
+    recipe_id = create_recipe_with_comments(client, [None] * 5, [DAY2, DAY1, DAY2, DAY3, DAY2])
+
+    assert walk(client, recipe_id, "newest", 2) == ["c3", "c4", "c2", "c0", "c1"]
+    assert walk(client, recipe_id, "oldest", 2) == ["c1", "c0", "c2", "c4", "c3"]
+
+
+def test_top_rated_puts_unrated_last(client):
+    recipe_id = create_recipe_with_comments(client, [5, None, 3, 5, None, 1],
+                                            [DAY1, DAY2, DAY2, DAY2, DAY1, DAY3])
+
+    assert walk(client, recipe_id, "top", 2) == ["c3", "c0", "c2", "c5", "c1", "c4"]
+    assert walk(client, recipe_id, "top", 4) == ["c3", "c0", "c2", "c5", "c1", "c4"]
+
+
+def test_top_rated_keeps_fractional_ties_across_pages(client):
+    recipe_id = create_recipe_with_comments(client, [4.3, 4.3, 4.3, 4.7, 4.3], [DAY1, DAY2, DAY3, DAY1, DAY2])
+
+    assert walk(client, recipe_id, "top", 2) == ["c3", "c2", "c4", "c1", "c0"]
+
+
+def test_page_includes_author_in_the_same_query(client, count_queries):
+    recipe_id = create_recipe_with_comments(client, [4, 2, 5], [DAY1, DAY2, DAY3])
+
+    with count_queries() as statements:
+        page = client.get(f'/recipes/{recipe_id}/comments?limit=10').json
+
+    assert [comment["user_name"] for comment in page["items"]] == ["testuser"] * 3
+    comment_queries = [s for s in statements if "FROM comments" in s and "count(" not in s.lower()]
+    assert len(comment_queries) == 1 and "JOIN users" in comment_queries[0]
+
+
+def test_cursor_is_bound_to_its_sort(client):
+    recipe_id = create_recipe_with_comments(client, [1, 2, 3], [DAY1, DAY2, DAY3])
+    cursor = client.get(f'/recipes/{recipe_id}/comments?sort=newest&limit=1').json["next_cursor"]
+
+    assert client.get(f'/recipes/{recipe_id}/comments?sort=top&cursor={cursor}').status_code == 400
+    assert client.get(f'/recipes/{recipe_id}/comments?sort=loudest').status_code == 400
+    assert client.get(f'/recipes/{recipe_id}/comments?cursor=garbage').status_code == 400
+
+
+def test_unpaginated_listing_still_returns_every_comment(client, count_queries):
+    recipe_id = create_recipe_with_comments(client, [1, 2, 3], [DAY1, DAY2, DAY3])
+
+    with count_queries() as statements:
+        comments = client.get(f'/recipes/{recipe_id}/comments').json
+
+    assert [comment["content"] for comment in comments] == ["c0", "c1", "c2"]
+    assert not any(s.lstrip().startswith("SELECT users") for s in statements)
+
+
+def test_composite_indexes_are_declared():
+    indexes = {index.name: [column.name for column in index.columns] for index in Comment.__table__.indexes}
+    assert indexes["ix_comments_recipe_id_comment_date_id"] == ["recipe_id", "comment_date", "id"]
+    assert indexes["ix_comments_recipe_id_rating_comment_date_id"] == ["recipe_id", "rating", "comment_date", "id"]
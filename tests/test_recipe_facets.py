@@ -0,0 +1,169 @@
+import json
+
+from database import SessionLocal
+from repositories.recipe_facet_repository import RecipeFacetRepository
+from repositories.recipe_repository import RecipeRepository
+from services import recipe_service
+from utils.cache import response_cache
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe(client, headers, **fields):
+    recipe = {"title": "Dish", "ingredients": "x", "instructions": "y", **fields}
+    return client.post('/recipes', data=json.dumps(recipe), content_type='application/json', headers=headers).json["id"]
+
+
+def counts(response, facet):
+    return {item["value"]: item["count"] for item in response.json[facet]}
+
+
+def setup_recipes(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipe(client, headers, title="Carbonara", dish_type="Main", origin="Italian", preparation_time="20 min")
+    create_recipe(client, headers, title="Lasagne", dish_type="Main", origin="Italian", preparation_time="2 hours")
+    create_recipe(client, headers, title="Tiramisu", dish_type="Dessert", origin="Italian")
+    create_recipe(client, headers, title="Brownies", dish_type="Dessert")
+    return headers
+
+
+def test_global_facets_from_counter_table(client):
+    setup_recipes(client)
+
+    response = client.get('/recipes/facets')
+
+    assert response.status_code == 200
+    assert response.json["total"] == 4
+    assert response.json["dish_type"] == [{"value": "Dessert", "count": 2}, {"value": "Main", "count": 2}]
+    # Recipes without an origin are counted in total but under no origin
+    assert response.json["origin"] == [{"value": "Italian", "count": 3}]
+
+
+def test_counters_follow_updates_deletes_and_bulk_imports(client):
+    headers = setup_recipes(client)
+    recipe_id = create_recipe(client, headers, dish_type="Soup", origin="French")
+    client.get('/recipes/facets')
+
+    client.put(f'/recipes/{recipe_id}', data=json.dumps({"dish_type": "Main"}),
+               content_type='application/json', headers=headers)
+    client.post('/recipes/bulk', data=json.dumps([
+        {"title": "Crepes", "dish_type": "Dessert", "origin": "French", "ingredients": "x", "instructions": "y"},
+        {"title": "Bad", "dish_type": "Dessert", "origin": "French", "ingredients": " ", "instructions": "y"},
+    ]), content_type='application/json', headers=headers)
+    response = client.get('/recipes/facets')
+
+    assert counts(response, "dish_type") == {"Main": 3, "Dessert": 3}
+    assert counts(response, "origin") == {"Italian": 3, "French": 2}
+
+    client.delete(f'/recipes/{recipe_id}', headers=headers)
+    response = client.get('/recipes/facets')
+
+    assert counts(response, "dish_type") == {"Main": 2, "Dessert": 3}
+    assert counts(response, "origin") == {"Italian": 3, "French": 1}
+    assert response.json["total"] == 5
+
+
+def test_counters_match_a_rebuild(client):
+    headers = setup_recipes(client)
+    client.get('/recipes/facets')
+    recipe_id = create_recipe(client, headers, dish_type="Soup", origin="Thai")
+    client.put(f'/recipes/{recipe_id}', data=json.dumps({"origin": "Vietnamese"}),
+               content_type='application/json', headers=headers)
+    client.delete(f'/recipes/{create_recipe(client, headers, dish_type="Soup")}', headers=headers)
+    maintained = client.get('/recipes/facets').json
+
+    db = SessionLocal()
+    try:
+        RecipeFacetRepository.rebuild_all(db)
+    finally:
+        db.close()
+    response_cache.clear()
+
+    assert client.get('/recipes/facets').json == maintained
+    assert counts(client.get('/recipes/facets?dish_type=Soup'), "origin") == {"Vietnamese": 1}
+
+
+def test_facets_within_filters_and_search(client):
+    setup_recipes(client)
+
+    filtered = client.get('/recipes/facets?origin=Italian&max_minutes=60')
+    searched = client.get('/recipes/facets?q=tiramisu')
+    both = client.get('/recipes/facets?q=lasagne&dish_type=Dessert')
+
+    assert filtered.json["total"] == 1
+    assert counts(filtered, "dish_type") == {"Main": 1} and counts(filtered, "origin") == {"Italian": 1}
+    assert counts(searched, "dish_type") == {"Dessert": 1}
+    assert both.json == {"total": 0, "dish_type": [], "origin": []}
+
+
+def test_writes_from_other_workers_are_counted_at_once(client):
+    setup_recipes(client)
+    client.get('/recipes/facets')
+
+    # Straight through the repository: this process' in-memory state never hears of it
+    db = SessionLocal()
+    try:
+        user_id = RecipeRepository.get_recipe_by_id(db, 1).user_id
+        RecipeRepository.create_recipe(db, {"title": "Pho", "dish_type": "Soup", "origin": "Vietnamese",
+                                            "ingredients": "x", "instructions": "y", "user_id": user_id})
+    finally:
+        db.close()
+    response_cache.clear()
+
+    assert counts(client.get('/recipes/facets'), "origin") == {"Italian": 3, "Vietnamese": 1}
+
+
+def test_search_facets_do_not_send_hit_ids(client, count_queries):
+    setup_recipes(client)
+    client.get('/recipes/facets?q=italian')
+
+    with count_queries() as statements:
+        response = client.get('/recipes/facets?q=tiramisu%20lasagne')
+
+    assert response.status_code == 200
+    assert not any(" IN " in statement.upper() for statement in statements)
+
+
+def test_search_within_filters_batches_hit_ids(client, count_queries, monkeypatch):
+    setup_recipes(client)
+    monkeypatch.setattr(recipe_service, "FACET_ID_BATCH_SIZE", 1)
+
+    with count_queries() as statements:
+        response = client.get('/recipes/facets?q=italian&dish_type=Main')
+
+    assert response.json["total"] == 2 and counts(response, "origin") == {"Italian": 2}
+    assert len([statement for statement in statements if "GROUP BY" in statement]) == 3
+
+
+def test_filtered_facets_are_one_grouped_query(client, count_queries):
+    setup_recipes(client)
+    client.get('/recipes/facets?dish_type=Main')
+
+    with count_queries() as statements:
+        client.get('/recipes/facets?dish_type=Dessert')
+
+    grouped = [statement for statement in statements if "GROUP BY" in statement]
+    assert len(grouped) == 1 and "recipes.dish_type, recipes.origin" in grouped[0]
+
+
+def test_facets_cache_is_invalidated_by_writes(client):
+    headers = setup_recipes(client)
+    first = client.get('/recipes/facets')
+
+    assert client.get('/recipes/facets', headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+    create_recipe(client, headers, dish_type="Main", origin="Italian")
+    response = client.get('/recipes/facets', headers={'If-None-Match': first.headers['ETag']})
+
+    assert response.status_code == 200
+    assert counts(response, "dish_type")["Main"] == 3
+
+
+def test_facets_reject_bad_filters(client):
+    assert client.get('/recipes/facets?max_minutes=soon').status_code == 400
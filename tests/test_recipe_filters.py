@@ -0,0 +1,124 @@
+import json
+
+import pytest
+
+from database import SessionLocal
+from models.recipe import Recipe
+from repositories.recipe_repository import RecipeRepository
+from utils.prep_time import parse_minutes
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipes(client, headers, recipes):
+    rows = [{"ingredients": "x", "instructions": "y", **recipe} for recipe in recipes]
+    response = client.post('/recipes/bulk', data=json.dumps(rows), content_type='application/json', headers=headers)
+    return [result["id"] for result in response.json["results"]]
+
+
+def titles(response):
+    return [recipe["title"] for recipe in response.json["items"]]
+
+
+@pytest.mark.parametrize("text, minutes", [
+    ("30 minutes", 30), ("1 hour 30 min", 90), ("1h30", 90), ("1.5 hours", 90), ("45", 45), ("1:30", 90),
+    ("20-30 minutes", 30), ("1 to 2 hours", 120), ("1 1/2 hours", 90), ("½ hour", 30), ("half an hour", 30),
+    ("about 25 mins", 25), ("15 min prep + 10 min cook", 25), ("2 days", 2880),
+    ("overnight", None), ("", None), (None, None),
+    # A quantity never starts in the middle of a number
+    ("PT45M", None), ("2x30min", None), ("3/0 hours", None),
+    ("10 days", 14400), ("11 days", None), ("99999999999999999999 minutes", None), ("20-99999999999 min", None),
+])
+def test_parse_minutes(text, minutes):
+    assert parse_minutes(text) == minutes
+
+
+def test_filters_combine(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipes(client, headers, [
+        {"title": "Quick curry", "dish_type": "Main", "preparation_time": "25 minutes", "servings": 4, "origin": "Indian"},
+        {"title": "Slow stew", "dish_type": "Main", "preparation_time": "2 hours", "servings": 6},
+        {"title": "Small omelette", "dish_type": "Main", "preparation_time": "10 min", "servings": 1},
+        {"title": "Fast cake", "dish_type": "Dessert", "preparation_time": "20 minutes", "servings": 8},
+        {"title": "Mystery main", "dish_type": "Main", "preparation_time": "a while", "servings": 4},
+    ])
+
+    response = client.get('/recipes?dish_type=Main&max_minutes=30&min_servings=4')
+
+    assert response.status_code == 200
+    assert titles(response) == ["Quick curry"]
+    assert response.json["items"][0]["preparation_minutes"] == 25
+    assert titles(client.get('/recipes?origin=Indian')) == ["Quick curry"]
+    assert titles(client.get('/recipes?min_servings=2&max_servings=6')) == ["Quick curry", "Slow stew", "Mystery main"]
+    assert titles(client.get('/recipes?dish_type=Main')) == ["Quick curry", "Slow stew", "Small omelette",
+                                                            "Mystery main"]
+
+
+def test_unreadable_or_huge_times_are_stored_without_minutes(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = {"title": "Forever", "dish_type": "Main", "ingredients": "x", "instructions": "y",
+              "preparation_time": "99999999999999999999 minutes"}
+    created = client.post('/recipes', data=json.dumps(recipe), content_type='application/json', headers=headers)
+    bulk_ids = create_recipes(client, headers, [
+        {"title": "Iso", "dish_type": "Main", "preparation_time": "PT45M"},
+        {"title": "Bulk forever", "dish_type": "Main", "preparation_time": "99999999999999999999 minutes"},
+    ])
+
+    assert created.status_code == 201 and created.json["preparation_minutes"] is None
+    assert all(bulk_ids)
+    assert titles(client.get('/recipes?dish_type=Main')) == ["Forever", "Iso", "Bulk forever"]
+    assert titles(client.get('/recipes?max_minutes=5')) == []
+
+
+def test_filter_by_author_and_paging(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    other = {'Authorization': f'Bearer {create_user_and_get_token(client, "b@example.com", "bob")}'}
+    create_recipes(client, headers, [{"title": f"Mine {i}", "dish_type": "Main"} for i in range(3)])
+    create_recipes(client, other, [{"title": "Theirs", "dish_type": "Main"}])
+    author_id = client.get('/recipes?dish_type=Main').json["items"][0]["user_id"]
+
+    first = client.get(f'/recipes?author={author_id}&limit=2')
+    second = client.get(f'/recipes?author={author_id}&limit=2&cursor={first.json["next_cursor"]}')
+
+    assert titles(first) == ["Mine 0", "Mine 1"]
+    assert titles(second) == ["Mine 2"] and second.json["next_cursor"] is None
+
+
+def test_update_reparses_preparation_time(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe_id = create_recipes(client, headers, [{"title": "Soup", "dish_type": "Main", "preparation_time": "1 hour"}])[0]
+
+    response = client.put(f'/recipes/{recipe_id}', data=json.dumps({"preparation_time": "15 minutes"}),
+                          content_type='application/json', headers=headers)
+
+    assert response.json["preparation_minutes"] == 15
+    assert titles(client.get('/recipes?max_minutes=20')) == ["Soup"]
+
+
+def test_backfill_fills_missing_minutes_in_batches(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipes(client, headers, [{"title": f"R{i}", "dish_type": "Main", "preparation_time": text}
+                                     for i, text in enumerate(["10 min", "overnight", "1h", "5 minutes"])])
+    db = SessionLocal()
+    try:
+        db.query(Recipe).update({Recipe.preparation_minutes: None})
+        db.commit()
+
+        assert RecipeRepository.backfill_preparation_minutes(db, batch_size=3) == 3
+        assert [minutes for (minutes,) in db.query(Recipe.preparation_minutes).order_by(Recipe.id)] == \
+            [10, None, 60, 5]
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("query", ["max_minutes=soon", "min_servings=-1", "dish_type=",
+                                   "min_servings=5&max_servings=2", "dish_type=Main&cursor=bogus"])
+def test_bad_filters_are_rejected(client, query):
+    assert client.get(f'/recipes?{query}').status_code == 400
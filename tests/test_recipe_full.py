@@ -0,0 +1,75 @@
+import json
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe_with_comments(client, comment_count):
+    owner = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe_id = client.post('/recipes', data=json.dumps({"title": "Ramen", "dish_type": "Main",
+                                                         "ingredients": "noodles", "instructions": "boil"}),
+                            content_type='application/json', headers=owner).json["id"]
+    for i in range(comment_count):
+        commenter = {'Authorization': 'Bearer ' + create_user_and_get_token(
+            client, email=f"c{i}@example.com", name=f"commenter{i}")}
+        client.post('/comments', data=json.dumps({"content": f"comment {i}", "rating": i % 5 + 1,
+                                                  "recipe_id": recipe_id}),
+                    content_type='application/json', headers=commenter)
+    return recipe_id
+
+
+def test_full_view_has_recipe_ratings_and_first_comment_page(client):
+    recipe_id = create_recipe_with_comments(client, 3)
+
+    response = client.get(f'/recipes/{recipe_id}/full?limit=2')
+
+    assert response.status_code == 200
+    data = response.json
+    assert data["title"] == "Ramen" and data["user_name"] == "testuser"
+    assert data["rating_count"] == 3 and data["rating_avg"] == 2.0
+    assert data["comments_count"] == 3
+    assert [(c["content"], c["user_name"]) for c in data["comments"]] == [
+        ("comment 2", "commenter2"), ("comment 1", "commenter1")]
+
+    rest = client.get(f'/recipes/{recipe_id}/comments?cursor={data["comments_next_cursor"]}&limit=2').json
+    assert [c["content"] for c in rest["items"]] == ["comment 0"]
+    assert rest["next_cursor"] is None
+
+
+def test_full_view_query_count_does_not_grow_with_comments(client, count_queries):
+    small = create_recipe_with_comments(client, 1)
+    large = create_recipe_with_comments(client, 8)
+
+    counts = []
+    for recipe_id in (small, large):
+        with count_queries() as statements:
+            assert client.get(f'/recipes/{recipe_id}/full').status_code == 200
+        counts.append(len(statements))
+
+    assert counts[0] == counts[1]
+    assert not any("FROM users" in s and "JOIN" not in s for s in statements)
+
+
+def test_full_view_not_found(client):
+    assert client.get('/recipes/999/full').status_code == 404
+
+
+def test_full_view_revalidates_after_new_comment(client):
+    recipe_id = create_recipe_with_comments(client, 1)
+    first = client.get(f'/recipes/{recipe_id}/full')
+    etag = first.headers['ETag']
+    assert client.get(f'/recipes/{recipe_id}/full', headers={'If-None-Match': etag}).status_code == 304
+
+    headers = {'Authorization': 'Bearer ' + create_user_and_get_token(client, email="late@example.com", name="late")}
+    client.post('/comments', data=json.dumps({"content": "late comment", "recipe_id": recipe_id}),
+                content_type='application/json', headers=headers)
+
+    response = client.get(f'/recipes/{recipe_id}/full', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.json["comments_count"] == 2
@@ -279,3 +279,78 @@ def test_search_recipes_multiple_results(client):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert len(data) == 2
+
+
+@pytest.fixture
+def enforce_foreign_keys():
+    """MySQL always enforces foreign keys; SQLite only when asked, per connection"""
+    from sqlalchemy import event
+    from database import engine
+
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        if engine.dialect.name == "sqlite":
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA foreign_keys=ON")
+            cursor.close()
+
+    event.listen(engine, "checkout", on_checkout)
+    yield
+    event.remove(engine, "checkout", on_checkout)
+
+
+def test_create_recipe_for_deleted_user_returns_404(client, enforce_foreign_keys):
+    """The INSERT's foreign key rejects a token whose user no longer exists"""
+    from database import SessionLocal
+    from models.user import User
+
+    token = create_user_and_get_token(client)
+    db = SessionLocal()
+    try:
+        db.query(User).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    response = client.post('/recipes',
+                           data=json.dumps({"title": "Orphan", "dish_type": "Main",
+                                            "ingredients": "ing", "instructions": "inst"}),
+                           content_type='application/json',
+                           headers={'Authorization': f'Bearer {token}'})
+
+    assert response.status_code == 404
+    assert "User not found" in json.loads(response.data)['error']
+    assert json.loads(client.get('/recipes').data) == []
+
+
+def test_create_recipe_statement_sequence(client, count_queries):
+    """
+    The budget RecipeRepository.create_recipe documents: no user-existence
+    SELECT before the INSERT, one upsert counting the recipe in its facet
+    pair, one SELECT of the ingredient ids plus an INSERT and a SELECT only
+    when some names are new, the link INSERT, and one read-back for the
+    response. Known names are never re-inserted, so they use up no
+    auto-increment values.
+    """
+    token = create_user_and_get_token(client)
+
+    expected = {
+        "ing": ["INSERT", "INSERT", "SELECT", "INSERT", "SELECT", "INSERT", "SELECT"],
+        "2 cups flour\n1 egg\nsalt\n3 carrots, diced\n1 cup milk":
+            ["INSERT", "INSERT", "SELECT", "INSERT", "SELECT", "INSERT", "SELECT"],
+        "salt, egg": ["INSERT", "INSERT", "SELECT", "INSERT", "SELECT"],
+    }
+    for ingredients, verbs_expected in expected.items():
+        with count_queries() as statements:
+            response = client.post('/recipes',
+                                   data=json.dumps({"title": "Soup", "dish_type": "Main",
+                                                    "ingredients": ingredients, "instructions": "inst"}),
+                                   content_type='application/json',
+                                   headers={'Authorization': f'Bearer {token}'})
+
+        assert response.status_code == 201
+        assert json.loads(response.data)['user_name'] == "testuser"
+        verbs = [statement.split()[0].upper() for statement in statements]
+        assert verbs == verbs_expected
+        assert "INTO recipes" in statements[0]
+        assert "INTO recipe_facet_counts" in statements[1]
+        assert any("INTO ingredients" in statement for statement in statements) == (ingredients != "salt, egg")
@@ -0,0 +1,137 @@
+import json
+
+import pytest
+
+from utils.cache import MemoryCache, RedisCache, ResponseCache, response_cache
+
+
+class FakeRedis:
+    """Local stand-in implementing the slice of the Redis API the cache uses"""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1).encode()
+        return int(self.data[key])
+
+    def scan_iter(self, match):
+        prefix = match.rstrip('*')
+        return [key for key in list(self.data) if key.startswith(prefix)]
+
+    def info(self, section):
+        return {"evicted_keys": 0}
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def test_memory_cache_evicts_least_recently_used():
+    cache = MemoryCache(max_entries=2, max_bytes=1000)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_memory_cache_is_bounded_by_bytes_and_ttl(monkeypatch):
+    cache = MemoryCache(max_entries=10, max_bytes=10)
+    cache.set("a", b"123456")
+    cache.set("b", b"123456")
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 6
+
+    from utils import cache as cache_module
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache.set("c", b"1", ttl=5)
+    now[0] += 6
+    assert cache.get("c") is None
+    assert cache.stats()["expirations"] == 1
+
+
+@pytest.mark.parametrize("backend", [MemoryCache(), RedisCache(client=FakeRedis())])
+def test_invalidating_a_scope_hides_all_its_variants(backend):
+    from flask import Response
+    cache = ResponseCache(backend, ttl=60)
+    first_page = cache.key("recipes", "limit=2")
+    cache.set(first_page, Response("[1]", mimetype="application/json"))
+    assert cache.get(cache.key("recipes", "limit=2")).get_data() == b"[1]"
+
+    cache.invalidate("recipes")
+
+    assert cache.get(cache.key("recipes", "limit=2")) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_recipe_detail_is_cached_and_invalidated_by_writes(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = json.loads(client.post('/recipes',
+                                    data=json.dumps({"title": "Stew", "dish_type": "Main",
+                                                     "ingredients": "beef", "instructions": "simmer"}),
+                                    content_type='application/json', headers=headers).data)
+    url = f"/recipes/{recipe['id']}"
+
+    assert client.get(url).headers['X-Cache'] == 'MISS'
+    assert client.get(url).headers['X-Cache'] == 'HIT'
+
+    client.put(url, data=json.dumps({"title": "Beef Stew"}), content_type='application/json', headers=headers)
+    response = client.get(url)
+    assert response.headers['X-Cache'] == 'MISS'
+    assert json.loads(response.data)['title'] == 'Beef Stew'
+
+    # A rated comment changes the aggregates shown on the recipe and list
+    client.get('/recipes')
+    client.get(f"{url}/comments")
+    client.post('/comments', data=json.dumps({"content": "Great", "recipe_id": recipe['id'], "rating": 5}),
+                content_type='application/json', headers=headers)
+    assert json.loads(client.get(url).data)['rating_count'] == 1
+    assert json.loads(client.get('/recipes').data)[0]['rating_count'] == 1
+    assert len(json.loads(client.get(f"{url}/comments").data)) == 1
+
+
+def test_unrated_comment_keeps_recipe_cache(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe = json.loads(client.post('/recipes',
+                                    data=json.dumps({"title": "Stew", "dish_type": "Main",
+                                                     "ingredients": "beef", "instructions": "simmer"}),
+                                    content_type='application/json', headers=headers).data)
+    url = f"/recipes/{recipe['id']}"
+    client.get(url)
+    client.get(f"{url}/comments")
+
+    client.post('/comments', data=json.dumps({"content": "Hmm", "recipe_id": recipe['id']}),
+                content_type='application/json', headers=headers)
+
+    assert client.get(url).headers['X-Cache'] == 'HIT'
+    assert client.get(f"{url}/comments").headers['X-Cache'] == 'MISS'
+
+
+def test_cache_metrics_endpoint(client):
+    client.get('/recipes')
+    client.get('/recipes')
+
+    stats = json.loads(client.get('/metrics/cache').data)
+    assert stats['backend'] == response_cache.stats()['backend']
+    assert stats['hits'] >= 1
+    assert stats['misses'] >= 1
+    assert 'evictions' in stats
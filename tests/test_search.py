@@ -0,0 +1,129 @@
+import json
+from types import SimpleNamespace
+
+from services.search_index import RecipeSearchIndex, highlight
+from utils.text_analysis import tokenize
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipe(client, token, **fields):
+    recipe = {"dish_type": "Main", "ingredients": "ing", "instructions": "inst"}
+    recipe.update(fields)
+    response = client.post('/recipes', data=json.dumps(recipe), content_type='application/json',
+                           headers={'Authorization': f'Bearer {token}'})
+    return json.loads(response.data)
+
+
+def search(client, query):
+    response = client.get(f'/recipes/search?q={query}')
+    assert response.status_code == 200
+    return json.loads(response.data)
+
+
+def built_index(*recipes):
+    index = RecipeSearchIndex()
+    index._load((recipe.id, RecipeSearchIndex._analyze(recipe)) for recipe in recipes)
+    return index
+
+
+def doc(recipe_id, title, ingredients="", instructions="", origin=None):
+    return SimpleNamespace(id=recipe_id, title=title, ingredients=ingredients,
+                           instructions=instructions, origin=origin)
+
+
+def test_tokenize_folds_accents_and_stems():
+    assert tokenize("Crème Brûlée with Tomatoes") == tokenize("creme brulee tomato")
+    assert tokenize("baked") == tokenize("baking")
+
+
+def test_title_matches_rank_above_instruction_matches():
+    index = built_index(
+        doc(1, "Weeknight stew", instructions="Serve with garlic bread"),
+        doc(2, "Garlic bread", instructions="Toast the bread"),
+    )
+
+    assert [recipe_id for recipe_id, _score in index.search("garlic")] == [2, 1]
+
+
+def test_every_query_word_must_match():
+    index = built_index(doc(1, "Thai curry"), doc(2, "Thai soup"), doc(3, "Tomato soup"))
+
+    assert [recipe_id for recipe_id, _ in index.search("thai soup")] == [2]
+
+
+def test_last_word_matches_as_prefix():
+    index = built_index(doc(1, "Chocolate cake"), doc(2, "Vanilla cake"))
+
+    assert [recipe_id for recipe_id, _ in index.search("choc")] == [1]
+    assert index.search("choc ") == []
+
+
+def test_remove_and_reindex():
+    recipe = doc(1, "Lentil soup")
+    index = built_index(recipe)
+
+    recipe.title = "Bean soup"
+    index.add(recipe)
+    assert index.search("lentil") == []
+    assert index.search("bean")
+
+    index.remove(1)
+    assert index.search("soup") == []
+    assert len(index) == 0
+
+
+def test_highlight_marks_matches_and_escapes_html():
+    snippet = highlight("Fold <b>whipped</b> cream into the chocolate", tokenize("chocolate"))
+
+    assert "<mark>chocolate</mark>" in snippet
+    assert "&lt;b&gt;" in snippet
+
+
+def test_search_covers_ingredients_and_origin(client):
+    token = create_user_and_get_token(client)
+    create_recipe(client, token, title="Hummus", ingredients="chickpeas, tahini, lemon", origin="Lebanon")
+    create_recipe(client, token, title="Crème Brûlée", ingredients="cream, sugar", origin="France")
+
+    chickpea = search(client, "chickpea")
+    assert [r['title'] for r in chickpea] == ["Hummus"]
+    assert "<mark>chickpeas</mark>" in chickpea[0]['highlights']['ingredients']
+    assert chickpea[0]['score'] > 0
+
+    assert [r['title'] for r in search(client, "creme brulee")] == ["Crème Brûlée"]
+    assert [r['title'] for r in search(client, "france")] == ["Crème Brûlée"]
+
+
+def test_index_follows_updates_and_deletes(client):
+    token = create_user_and_get_token(client)
+    headers = {'Authorization': f'Bearer {token}'}
+    recipe = create_recipe(client, token, title="Lentil Soup")
+    assert len(search(client, "lentil")) == 1
+
+    client.put(f"/recipes/{recipe['id']}", data=json.dumps({"title": "Bean Soup"}),
+               content_type='application/json', headers=headers)
+    assert search(client, "lentil") == []
+    assert len(search(client, "bean")) == 1
+
+    create_recipe(client, token, title="Bean Salad")
+    assert len(search(client, "bean")) == 2
+
+    client.delete(f"/recipes/{recipe['id']}", headers=headers)
+    assert [r['title'] for r in search(client, "bean")] == ["Bean Salad"]
+
+
+def test_search_limit(client):
+    token = create_user_and_get_token(client)
+    for i in range(5):
+        create_recipe(client, token, title=f"Soup {i}")
+
+    response = client.get('/recipes/search?q=soup&limit=2')
+    assert len(json.loads(response.data)) == 2
+    assert client.get('/recipes/search?q=soup&limit=x').status_code == 400
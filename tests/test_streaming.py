@@ -0,0 +1,105 @@
+import json
+
+from utils import streaming
+
+
+def create_user_and_get_token(client, email="test@example.com", name="testuser", password="testpassword123"):
+    client.post('/users', data=json.dumps({"name": name, "email": email, "password": password}),
+                content_type='application/json')
+    login_response = client.post('/users/login',
+                                 data=json.dumps({"email": email, "password": password}),
+                                 content_type='application/json')
+    return json.loads(login_response.data)['token']
+
+
+def create_recipes(client, headers, count):
+    ids = []
+    for i in range(count):
+        response = client.post('/recipes',
+                               data=json.dumps({"title": f"Soup {i}", "dish_type": "Main",
+                                                "ingredients": "ing", "instructions": "inst"}),
+                               content_type='application/json', headers=headers)
+        ids.append(json.loads(response.data)['id'])
+    return ids
+
+
+def test_stream_json_array_matches_regular_listing(client, monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_BATCH_SIZE", 2)
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipes(client, headers, 5)
+
+    response = client.get('/recipes?stream=json')
+
+    assert response.is_streamed
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.data) == json.loads(client.get('/recipes').data)
+
+
+def test_stream_ndjson_one_document_per_line(client, monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_BATCH_SIZE", 2)
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    ids = create_recipes(client, headers, 5)
+
+    response = client.get('/recipes', headers={'Accept': 'application/x-ndjson'})
+
+    assert response.mimetype == 'application/x-ndjson'
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == ids
+    assert all(json.loads(line)['user_name'] == 'testuser' for line in lines)
+
+
+def test_stream_is_flushed_in_chunks(client, monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_CHUNK_BYTES", 1)
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipes(client, headers, 3)
+
+    response = client.get('/recipes?stream=ndjson')
+    chunks = [chunk for chunk in response.response if chunk]
+
+    assert len(chunks) == 3
+
+
+def test_stream_reads_one_keyset_page_per_query(client, count_queries, monkeypatch):
+    monkeypatch.setattr(streaming, "STREAM_BATCH_SIZE", 2)
+    monkeypatch.setattr(streaming, "STREAM_CHUNK_BYTES", 1)
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    create_recipes(client, headers, 5)
+
+    with count_queries() as statements:
+        response = client.get('/recipes?stream=ndjson')
+        chunks = iter(response.response)
+        first = next(chunks)
+        # The first rows go out after one page, before the rest is queried
+        assert len([statement for statement in statements if "LIMIT" in statement]) == 1 and b"Soup 0" in first
+        rest = b"".join(chunks)
+
+    # Pages of 2, 2 and 1 rows; the short last page ends the walk
+    pages = [statement for statement in statements if "LIMIT" in statement]
+    assert len(pages) == 3
+    assert "recipes.id > " not in pages[0] and all("recipes.id > " in page for page in pages[1:])
+    assert [json.loads(line)["title"] for line in (first + rest).decode().splitlines()] == \
+        [f"Soup {i}" for i in range(5)]
+
+
+def test_stream_empty_collection(client):
+    assert json.loads(client.get('/comments?stream').data) == []
+    assert client.get('/comments?stream=ndjson').data == b''
+
+
+def test_stream_other_collections(client):
+    headers = {'Authorization': f'Bearer {create_user_and_get_token(client)}'}
+    recipe_id = create_recipes(client, headers, 1)[0]
+    for content in ("First", "Second"):
+        client.post('/comments', data=json.dumps({"content": content, "recipe_id": recipe_id}),
+                    content_type='application/json', headers=headers)
+
+    comments = json.loads(client.get(f'/recipes/{recipe_id}/comments?stream=json').data)
+    assert [comment['content'] for comment in comments] == ["First", "Second"]
+    assert comments[0]['user_name'] == 'testuser'
+    assert len(json.loads(client.get('/comments?stream=json').data)) == 2
+    assert json.loads(client.get('/users?stream=json').data)[0]['name'] == 'testuser'
+
+
+def test_stream_rejects_unknown_format(client):
+    response = client.get('/recipes?stream=xml')
+    assert response.status_code == 400
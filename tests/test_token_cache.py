@@ -0,0 +1,100 @@
+import json
+from datetime import datetime, timedelta
+
+import jwt
+
+from utils import jwt_utils
+from utils.jwt_utils import VerifiedTokenCache, decode_token, generate_token, token_cache
+
+
+def make_token(user_id=1, expires_in=timedelta(hours=1)):
+    payload = {'user_id': user_id, 'username': 'u', 'email': 'u@example.com',
+               'exp': datetime.utcnow() + expires_in, 'iat': datetime.utcnow()}
+    return jwt.encode(payload, jwt_utils.JWT_SECRET_KEY, algorithm=jwt_utils.JWT_ALGORITHM)
+
+
+def test_repeat_decodes_skip_verification(monkeypatch):
+    token = generate_token(1, "alice", "alice@example.com")
+    calls = []
+    original = jwt.decode
+    monkeypatch.setattr(jwt_utils.jwt, "decode", lambda *a, **kw: calls.append(1) or original(*a, **kw))
+
+    first = decode_token(token)
+    second = decode_token(token)
+
+    assert first == second
+    assert first['user_id'] == 1
+    assert len(calls) == 1
+    stats = token_cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['decode']['count'] == 1
+
+
+def test_cached_payload_is_copied():
+    token = generate_token(1, "alice", "alice@example.com")
+    decode_token(token)['user_id'] = 99
+    assert decode_token(token)['user_id'] == 1
+
+
+def test_entries_expire_at_token_exp(monkeypatch):
+    token = make_token(expires_in=timedelta(seconds=30))
+    assert decode_token(token) is not None
+
+    later = jwt_utils.time.time() + 60
+    monkeypatch.setattr(jwt_utils.time, "time", lambda: later)
+    # Past exp the cache misses, and jwt.decode rejects the token itself
+    monkeypatch.setattr(jwt_utils.jwt, "decode", lambda *a, **kw: (_ for _ in ()).throw(jwt.ExpiredSignatureError()))
+
+    assert decode_token(token) is None
+    assert token_cache.stats()['expirations'] == 1
+
+
+def test_cache_is_bounded_lru():
+    cache = VerifiedTokenCache(max_entries=2)
+    exp = jwt_utils.time.time() + 3600
+    cache.put("a", {'exp': exp})
+    cache.put("b", {'exp': exp})
+    cache.get("a")
+    cache.put("c", {'exp': exp})
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_invalid_tokens_are_not_cached():
+    assert decode_token("not-a-token") is None
+    assert decode_token(make_token(expires_in=timedelta(seconds=-10))) is None
+    assert token_cache.stats()['entries'] == 0
+
+
+def test_revoked_token_is_rejected():
+    token = make_token()
+    assert decode_token(token) is not None
+
+    token_cache.revoke(token)
+
+    assert decode_token(token) is None
+    assert token_cache.stats()['entries'] == 0
+
+
+def test_evict_user_forces_reverification():
+    token = make_token(user_id=7)
+    decode_token(token)
+    token_cache.evict_user(7)
+    assert token_cache.stats()['entries'] == 0
+    assert decode_token(token)['user_id'] == 7
+
+
+def test_auth_metrics_endpoint(client):
+    client.post('/users', data=json.dumps({"name": "a", "email": "a@example.com", "password": "testpassword123"}),
+                content_type='application/json')
+    login = client.post('/users/login', data=json.dumps({"email": "a@example.com", "password": "testpassword123"}),
+                        content_type='application/json')
+    headers = {'Authorization': f"Bearer {json.loads(login.data)['token']}"}
+    client.get('/users/recipes', headers=headers)
+    client.get('/users/recipes', headers=headers)
+
+    stats = json.loads(client.get('/metrics/auth').data)
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
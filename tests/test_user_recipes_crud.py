@@ -68,21 +68,13 @@ class TestUserRecipesCRUD:
         data = json.loads(response.data)
         assert "error" in data
     
-    def test_search_current_user_recipes_success(self, client, auth_headers, monkeypatch):
+    def test_search_current_user_recipes_success(self, client, auth_headers):
         """Test searching within user's recipes"""
-        from services import recipe_service
-        
-        class DummyRecipe:
-            title = "Chocolate Cake"
-            user_id = 1
-            def model_dump(self):
-                return {"id": 1, "title": self.title, "user_id": 1}
-        
-        monkeypatch.setattr(
-            recipe_service.RecipeService,
-            "get_recipes_by_user",
-            lambda db, user_id: [DummyRecipe()]
-        )
+        for title in ("Chocolate Cake", "Vanilla Cake"):
+            client.post('/recipes',
+                        data=json.dumps({"title": title, "dish_type": "Dessert",
+                                         "ingredients": "flour", "instructions": "bake"}),
+                        headers={**auth_headers, 'Content-Type': 'application/json'})
         
         response = client.get('/users/recipes/search?q=chocolate', headers=auth_headers)
         assert response.status_code == 200
@@ -90,26 +82,43 @@ class TestUserRecipesCRUD:
         assert len(data) == 1
         assert data[0]['title'] == "Chocolate Cake"
     
-    def test_search_current_user_recipes_no_match(self, client, auth_headers, monkeypatch):
+    def test_search_current_user_recipes_no_match(self, client, auth_headers):
         """Test searching with no matching results"""
-        from services import recipe_service
-        
-        class DummyRecipe:
-            title = "Chocolate Cake"
-            def model_dump(self):
-                return {"id": 1, "title": self.title}
-        
-        monkeypatch.setattr(
-            recipe_service.RecipeService,
-            "get_recipes_by_user",
-            lambda db, user_id: [DummyRecipe()]
-        )
+        client.post('/recipes',
+                    data=json.dumps({"title": "Chocolate Cake", "dish_type": "Dessert",
+                                     "ingredients": "flour", "instructions": "bake"}),
+                    headers={**auth_headers, 'Content-Type': 'application/json'})
         
         response = client.get('/users/recipes/search?q=pizza', headers=auth_headers)
         assert response.status_code == 200
         data = json.loads(response.data)
         assert len(data) == 0
     
+    def test_search_current_user_recipes_only_own_and_paginated(self, client, auth_headers):
+        """Test search is scoped to the caller and pages in title order"""
+        other = json.loads(client.post('/users', data=json.dumps({
+            "name": "other", "email": "other@example.com", "password": "password123"
+        }), content_type='application/json').data)
+        other_token = generate_token(user_id=other['id'], username="other", email="other@example.com")
+        for title in ("Soup C", "Soup A", "Soup B", "50% Soup"):
+            client.post('/recipes',
+                        data=json.dumps({"title": title, "dish_type": "Soup",
+                                         "ingredients": "water", "instructions": "boil"}),
+                        headers={**auth_headers, 'Content-Type': 'application/json'})
+        client.post('/recipes',
+                    data=json.dumps({"title": "Soup Z", "dish_type": "Soup",
+                                     "ingredients": "water", "instructions": "boil"}),
+                    headers={'Authorization': f'Bearer {other_token}', 'Content-Type': 'application/json'})
+        
+        first = json.loads(client.get('/users/recipes/search?q=soup&limit=2', headers=auth_headers).data)
+        second = json.loads(client.get(f"/users/recipes/search?q=soup&limit=2&cursor={first['next_cursor']}",
+                                       headers=auth_headers).data)
+        
+        assert [r['title'] for r in first['items'] + second['items']] == ["50% Soup", "Soup A", "Soup B", "Soup C"]
+        assert second['next_cursor'] is None
+        percent = json.loads(client.get('/users/recipes/search?q=%25', headers=auth_headers).data)
+        assert [r['title'] for r in percent] == ["50% Soup"]
+    
     def test_search_current_user_recipes_empty_query(self, client, auth_headers):
         """Test search with empty query returns empty array"""
         response = client.get('/users/recipes/search?q=', headers=auth_headers)
@@ -0,0 +1,115 @@
+import re
+from typing import Iterable, Iterator, List, Tuple
+
+# Python ints used as bitsets hold one bit per slot. A bit-sliced number
+# holds one small unsigned number per slot as a list of planes: plane i is
+# the bitset of slots whose number has bit i set. Adding or comparing the
+# numbers of every slot then costs a few whole-int operations per plane,
+# each running in C over the packed bits, instead of a loop over slots.
+Planes = List[int]
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def from_positions(positions: Iterable[int], size: int) -> int:
+    """Bitset with the given bit positions set, for positions below size"""
+    packed = bytearray((size + 7) // 8)
+    for position in positions:
+        packed[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(packed, "little")
+
+
+def positions(bitset: int) -> Iterator[int]:
+    """Set bit positions in ascending order, skipping zero bytes in C"""
+    if not bitset:
+        return
+    packed = bitset.to_bytes((bitset.bit_length() + 7) // 8, "little")
+    for match in _NONZERO_BYTE.finditer(packed):
+        byte_index = match.start()
+        byte = packed[byte_index]
+        base = byte_index * 8
+        while byte:
+            low = byte & -byte
+            yield base + low.bit_length() - 1
+            byte ^= low
+
+
+def add_bitset(planes: Planes, bitset: int) -> None:
+    """Add 1 to the number of every slot in bitset, in place (ripple carry)"""
+    carry = bitset
+    for i in range(len(planes)):
+        if not carry:
+            return
+        planes[i], carry = planes[i] ^ carry, planes[i] & carry
+    if carry:
+        planes.append(carry)
+
+
+def add_constant(planes: Planes, value: int, mask: int) -> Planes:
+    """A copy of planes with value added to the number of every slot in mask"""
+    result = list(planes)
+    # Planes the constant reaches past the top must exist before slicing,
+    # or the mask would be added into a tail that starts too low
+    result.extend([0] * (value.bit_length() - len(result)))
+    for i in range(value.bit_length()):
+        if (value >> i) & 1:
+            # Adding 2**i is adding the bitset to the planes from i upwards
+            tail = result[i:]
+            add_bitset(tail, mask)
+            result[i:] = tail
+    return result
+
+
+def equal(a: Planes, b: Planes, mask: int) -> int:
+    """Slots in mask whose numbers in a and b are equal"""
+    for i in range(max(len(a), len(b))):
+        plane_a = a[i] if i < len(a) else 0
+        plane_b = b[i] if i < len(b) else 0
+        mask &= ~(plane_a ^ plane_b)
+        if not mask:
+            break
+    return mask
+
+
+def set_number(planes: Planes, slot: int, value: int) -> None:
+    """Set one slot's number, in place"""
+    bit = 1 << slot
+    while len(planes) < value.bit_length():
+        planes.append(0)
+    for i in range(len(planes)):
+        if (value >> i) & 1:
+            planes[i] |= bit
+        elif planes[i] & bit:
+            planes[i] ^= bit
+
+
+def any_set(planes: Planes) -> int:
+    """Slots whose number is not zero"""
+    result = 0
+    for plane in planes:
+        result |= plane
+    return result
+
+
+def by_value_descending(planes: Planes, mask: int) -> Iterator[Tuple[int, int]]:
+    """
+    Split the slots in mask by their number, largest number first.
+
+    Yields:
+        (number, bitset of the slots in mask with that number); numbers no
+        slot in mask has are skipped without being visited
+    """
+    def split(level: int, value: int, subset: int):
+        if level < 0:
+            yield value, subset
+            return
+        plane = planes[level]
+        ones = subset & plane
+        if ones:
+            yield from split(level - 1, value | (1 << level), ones)
+        zeros = subset & ~plane
+        if zeros:
+            yield from split(level - 1, value, zeros)
+
+    if mask:
+        yield from split(len(planes) - 1, 0, mask)
@@ -0,0 +1,46 @@
+import json
+import os
+from typing import Any, List
+
+from utils.streaming import NDJSON_MIMETYPE
+
+# Rows accepted by one bulk request, and rows written per multi-row INSERT.
+# Each chunk is its own transaction; at the default chunk size a statement
+# stays far below MySQL's default max_allowed_packet (64 MiB) even for long
+# instructions.
+BULK_MAX_ROWS = int(os.getenv('BULK_MAX_ROWS', '10000'))
+BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', '1000'))
+
+
+class InvalidRow(ValueError):
+    """An NDJSON line that is not valid JSON; reported in that row's result"""
+
+
+def parse_bulk_body(req) -> List[Any]:
+    """
+    Decode a bulk request body into its rows.
+
+    application/x-ndjson bodies hold one JSON document per line (blank lines
+    are skipped); a line that does not decode becomes an InvalidRow so the
+    rest of the batch still goes through. Anything else must be a JSON array.
+
+    Raises:
+        ValueError: If the body is not an array, or holds more than BULK_MAX_ROWS rows
+    """
+    if req.mimetype == NDJSON_MIMETYPE:
+        rows = []
+        for number, line in enumerate(req.get_data(as_text=True).splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                rows.append(json.loads(line))
+            except ValueError as e:
+                rows.append(InvalidRow(f"Line {number} is not valid JSON: {e}"))
+    else:
+        rows = req.get_json(silent=True)
+        if not isinstance(rows, list):
+            raise ValueError("Body must be a JSON array of recipes, or NDJSON with Content-Type: "
+                             f"{NDJSON_MIMETYPE}")
+    if len(rows) > BULK_MAX_ROWS:
+        raise ValueError(f"At most {BULK_MAX_ROWS} rows per request, got {len(rows)}")
+    return rows
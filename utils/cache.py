@@ -0,0 +1,278 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from flask import Response, g, make_response, request
+
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')  # memory | redis | none
+CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', '60'))
+CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+
+
+class MemoryCache:
+    """
+    In-process LRU cache with per-entry TTL, bounded by entry count and bytes.
+
+    Generation counters live apart from the LRU: they are tiny, and evicting
+    one would resurrect entries that were already invalidated.
+    """
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._discard(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        if len(value) > self.max_bytes:
+            return
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (value, expires_at)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._discard(key)
+
+    def generation(self, scope: str) -> int:
+        return self._generations.get(scope, 0)
+
+    def bump_generation(self, scope: str) -> int:
+        with self._lock:
+            self._generations[scope] = self._generations.get(scope, 0) + 1
+            return self._generations[scope]
+
+    def _discard(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[0])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.name,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class RedisCache:
+    """
+    Cache backend for anything speaking the Redis protocol (Redis, Valkey,
+    KeyDB, or a local stand-in). Expiry and eviction are left to the server;
+    set maxmemory-policy to allkeys-lru to get the same LRU behaviour as
+    MemoryCache.
+
+    Args:
+        client: A redis-py compatible client; built from CACHE_REDIS_URL when omitted
+        prefix: Namespace for every key this app writes
+    """
+
+    name = "redis"
+
+    def __init__(self, client=None, prefix: str = "recipebook:"):
+        if client is None:
+            import redis  # optional dependency, only needed for this backend
+            client = redis.Redis.from_url(CACHE_REDIS_URL)
+        self.client = client
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.client.get(self.prefix + key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None):
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def delete(self, key: str):
+        self.client.delete(self.prefix + key)
+
+    def generation(self, scope: str) -> int:
+        value = self.client.get(self.prefix + "gen:" + scope)
+        return int(value) if value is not None else 0
+
+    def bump_generation(self, scope: str) -> int:
+        return int(self.client.incr(self.prefix + "gen:" + scope))
+
+    def clear(self):
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+        with self._lock:
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict:
+        evictions = None
+        try:
+            evictions = self.client.info("stats").get("evicted_keys")
+        except Exception:
+            pass
+        with self._lock:
+            return {"backend": self.name, "hits": self.hits, "misses": self.misses, "evictions": evictions}
+
+
+class ResponseCache:
+    """
+    Caches serialized GET responses under invalidation scopes.
+
+    Every cached key embeds the current generation of its scope (for example
+    "recipe:7" or "recipes"). Invalidating a scope bumps its generation, so
+    all of its variants (query strings, pages) stop matching at once; the
+    stale entries age out through TTL and LRU eviction. The generation is read
+    before the response is built, so an invalidation that lands mid-build
+    leaves the new entry unreachable instead of serving stale data.
+    """
+
+    def __init__(self, backend=None, ttl: int = CACHE_TTL_SECONDS):
+        self.backend = backend
+        self.ttl = ttl
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def key(self, scope: str, variant: str = "") -> str:
+        return f"resp:{scope}:{self.backend.generation(scope)}:{variant}"
+
+    def get(self, key: str) -> Optional[Response]:
+        raw = self.backend.get(key)
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return Response(entry["body"], status=entry["status"], headers=entry["headers"])
+
+    def set(self, key: str, response: Response):
+        entry = {
+            "status": response.status_code,
+            "headers": [[name, value] for name, value in response.headers.items()
+                        if name not in ("Content-Length", "X-Cache")],
+            "body": response.get_data(as_text=True),
+        }
+        self.backend.set(key, json.dumps(entry).encode(), self.ttl)
+
+    def invalidate(self, *scopes: str):
+        if not self.enabled:
+            return
+        for scope in scopes:
+            self.backend.bump_generation(scope)
+
+    def clear(self):
+        if self.enabled:
+            self.backend.clear()
+
+    def stats(self) -> Dict:
+        if not self.enabled:
+            return {"backend": "none"}
+        return self.backend.stats()
+
+
+def _build_backend():
+    if CACHE_BACKEND == 'memory':
+        return MemoryCache()
+    if CACHE_BACKEND == 'redis':
+        return RedisCache()
+    return None
+
+
+response_cache = ResponseCache(_build_backend())
+
+
+# Invalidation scopes shared by the cached read routes and the write routes
+def recipe_scope(recipe_id: int) -> str:
+    return f"recipe:{recipe_id}"
+
+
+def recipe_comments_scope(recipe_id: int) -> str:
+    return f"recipe:{recipe_id}:comments"
+
+
+RECIPES_SCOPE = "recipes"
+
+
+def cached_response(scope: Callable[..., str]):
+    """
+    Decorator serving a GET route from response_cache.
+
+    Only 200 responses that are not streamed are stored. The query string is
+    part of the key, so each page or filter combination is cached separately.
+    Under conditional_response the key also carries the probed ETag, so a body
+    is never served with a validator newer than itself.
+
+    Args:
+        scope: Called with the route's keyword arguments, returns the invalidation scope
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not response_cache.enabled or request.method != 'GET':
+                return f(*args, **kwargs)
+            variant = request.query_string.decode()
+            if 'resource_etag' in g:
+                variant += "|" + g.resource_etag
+            key = response_cache.key(scope(**kwargs), variant)
+            cached = response_cache.get(key)
+            if cached is not None:
+                cached.headers['X-Cache'] = 'HIT'
+                return cached
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                response_cache.set(key, response)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return decorated
+    return decorator
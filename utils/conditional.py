@@ -0,0 +1,76 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Optional
+
+from flask import g, make_response, request
+from sqlalchemy.exc import SQLAlchemyError
+
+from utils.db_session import get_db
+
+
+def make_etag(version, variant: str = "") -> str:
+    """Strong ETag for a version probe result and a representation variant (the query string)"""
+    return hashlib.sha1(f"{tuple(version)!r}|{variant}".encode()).hexdigest()[:32]
+
+
+def last_modified_of(version) -> Optional[datetime]:
+    """Newest timestamp in a version probe result, as an aware UTC datetime"""
+    stamps = [value for value in version if isinstance(value, datetime)]
+    if not stamps:
+        return None
+    return max(stamps).replace(tzinfo=timezone.utc)
+
+
+def conditional_response(probe: Callable, use_last_modified: bool = True):
+    """
+    Decorator adding ETag / Last-Modified to a GET route and answering
+    conditional requests with 304 Not Modified.
+
+    The probe runs a cheap query (a few indexed timestamps; for collections
+    max(id), max(updated_at) and a delete counter) before the route body, so an unchanged
+    resource costs one small SELECT instead of building the full response.
+    The resulting ETag is also exposed as g.resource_etag, which
+    cached_response folds into its key so a cached body always matches the
+    ETag it is served with.
+
+    Args:
+        probe: Called as probe(db, **route_kwargs); returns a tuple of values that
+            change on every write, or None when the resource does not exist
+        use_last_modified: Honour If-Modified-Since. Collections pass False: a
+            delete removes rows without moving max(updated_at) forward, so only
+            the ETag (which includes the delete counter) is a reliable validator.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            db = get_db()
+            try:
+                version = probe(db, **kwargs)
+            except SQLAlchemyError:
+                db.rollback()
+                version = None
+            if version is None:
+                # Unknown resource or failed probe: let the route answer as usual
+                return f(*args, **kwargs)
+
+            etag = make_etag(version, request.query_string.decode())
+            last_modified = last_modified_of(version)
+            g.resource_etag = etag
+
+            # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (use_last_modified and last_modified is not None
+                                and request.if_modified_since is not None
+                                and last_modified.replace(microsecond=0) <= request.if_modified_since)
+
+            response = make_response(('', 304)) if not_modified else make_response(f(*args, **kwargs))
+            if response.status_code in (200, 304):
+                response.set_etag(etag)
+                if last_modified is not None:
+                    response.last_modified = last_modified
+            return response
+        return decorated
+    return decorator
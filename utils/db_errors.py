@@ -0,0 +1,19 @@
+from sqlalchemy.exc import IntegrityError
+
+# MySQL ER_NO_REFERENCED_ROW / ER_NO_REFERENCED_ROW_2: the referenced parent row does not exist
+_MYSQL_MISSING_PARENT_ERRNOS = (1216, 1452)
+
+
+class UserNotFoundError(LookupError):
+    """A write referenced a user id that no longer exists"""
+
+    def __init__(self, user_id: int):
+        super().__init__(f"User {user_id} not found")
+        self.user_id = user_id
+
+
+def is_foreign_key_violation(error: IntegrityError) -> bool:
+    """True when an IntegrityError was raised because a referenced row is missing"""
+    if getattr(error.orig, "errno", None) in _MYSQL_MISSING_PARENT_ERRNOS:
+        return True
+    return "foreign key constraint" in str(error.orig).lower()
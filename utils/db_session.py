@@ -0,0 +1,73 @@
+import time
+
+from flask import g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from database import SessionLocal, ReadSessionLocal
+from utils.metrics import TimingRegistry
+
+READ_ONLY_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+# Per-route connection usage: "checkout_wait" is the time from the first
+# database use to a pooled connection being handed over, "hold" the time the
+# connection stayed checked out. Served by GET /metrics/db.
+db_timings = TimingRegistry()
+
+
+def get_db() -> Session:
+    """
+    Session of the current request, created on first call and closed in teardown.
+
+    GET/HEAD requests get a session on the AUTOCOMMIT read pool, everything
+    else a regular transactional session. Either way no connection is
+    checked out until the first query or flush, and every service call in
+    the request shares it.
+    """
+    session = g.get('db')
+    if session is None:
+        factory = ReadSessionLocal if request.method in READ_ONLY_METHODS else SessionLocal
+        session = factory(info={"route": request.endpoint or request.path})
+        g.db = session
+    return session
+
+
+def close_db(exception=None):
+    session = g.pop('db', None)
+    if session is not None:
+        session.close()
+
+
+def init_app(app):
+    # Application-context teardown also runs after a streamed body has been
+    # fully sent, so streaming routes can keep using the request session.
+    app.teardown_appcontext(close_db)
+
+
+def _on_transaction_create(session, transaction):
+    if transaction.parent is None and "route" in session.info:
+        session.info["checkout_started"] = time.perf_counter()
+
+
+def _on_begin(session, transaction, connection):
+    started = session.info.pop("checkout_started", None)
+    if started is None:
+        return
+    now = time.perf_counter()
+    db_timings.observe(session.info["route"], "checkout_wait", (now - started) * 1000)
+    session.info["held_since"] = now
+
+
+def _on_transaction_end(session, transaction):
+    if transaction.parent is not None:
+        return
+    session.info.pop("checkout_started", None)
+    held_since = session.info.pop("held_since", None)
+    if held_since is not None:
+        db_timings.observe(session.info["route"], "hold", (time.perf_counter() - held_since) * 1000)
+
+
+for _factory in (SessionLocal, ReadSessionLocal):
+    event.listen(_factory, "after_transaction_create", _on_transaction_create)
+    event.listen(_factory, "after_begin", _on_begin)
+    event.listen(_factory, "after_transaction_end", _on_transaction_end)
@@ -0,0 +1,20 @@
+from typing import Sequence
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+
+def increment_statement(db: Session, table: Table, key_columns: Sequence[str], counter: str):
+    """
+    INSERT that creates a counter row, or adds the inserted value to the
+    existing row's counter when the key is taken, in one atomic statement.
+    Execute it with parameter dicts holding the key columns and the delta.
+    """
+    if db.get_bind().dialect.name == "mysql":
+        statement = mysql.insert(table)
+        return statement.on_duplicate_key_update({counter: table.c[counter] + statement.inserted[counter]})
+    # SQLite and PostgreSQL share the ON CONFLICT form
+    statement = sqlite.insert(table)
+    return statement.on_conflict_do_update(index_elements=[table.c[column] for column in key_columns],
+                                           set_={counter: table.c[counter] + statement.excluded[counter]})
@@ -0,0 +1,176 @@
+import os
+import re
+from typing import List, Optional, Tuple
+
+from utils.text_analysis import fold
+
+# Longest name stored in the ingredients table
+MAX_INGREDIENT_LENGTH = 100
+
+# Most ingredients one "recipes containing" query may name
+INGREDIENT_QUERY_MAX = int(os.getenv('INGREDIENT_QUERY_MAX', '20'))
+
+MATCH_MODES = ("all", "any")
+
+# Most ingredients one pantry may list, and most missing ingredients a
+# "what can I cook" query may allow (and allows by default)
+PANTRY_MAX_INGREDIENTS = int(os.getenv('PANTRY_MAX_INGREDIENTS', '100'))
+PANTRY_MAX_MISSING = int(os.getenv('PANTRY_MAX_MISSING', '5'))
+PANTRY_DEFAULT_MISSING = 2
+
+# Measures and containers: a quantity's unit, never part of the name
+_UNITS = frozenset("""
+cup cups c tablespoon tablespoons tbsp tbs tbl teaspoon teaspoons tsp t
+ounce ounces oz pound pounds lb lbs gram grams g kilogram kilograms kg
+milliliter milliliters ml liter liters litre litres l pint pints quart quarts gallon gallons
+clove cloves can cans jar jars package packages pkg packet packets bag bags box boxes
+bunch bunches handful handfuls pinch pinches dash dashes sprig sprigs stick sticks
+slice slices piece pieces head heads stalk stalks
+""".split())
+
+# Size, freshness and preparation words that describe an ingredient without
+# changing what it is ("2 large ripe tomatoes, diced" is tomato)
+_DESCRIPTORS = frozenset("""
+large small medium big extra jumbo fresh freshly ripe raw frozen whole organic
+chopped diced minced sliced grated shredded crushed mashed melted softened beaten cubed
+peeled seeded pitted halved quartered trimmed rinsed drained toasted roasted cooked
+finely roughly coarsely thinly thickly lightly packed heaping level granulated
+dried ground boneless skinless virgin optional about approximately
+""".split())
+
+# Phrases that say how much or what for, not what
+_TRAILING = re.compile(r"\b(?:to taste|for (?:garnish|serving|decoration|frying|greasing)|as needed|if desired)\b")
+
+_PARENTHETICAL = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_QUANTITY = re.compile(r"^(?:\d+(?:[.,/]\d+)?|[½¼¾⅓⅔⅛]|\d+[½¼¾⅓⅔⅛])(?:-\d+(?:[.,/]\d+)?)?$")
+_CONJUNCTION = re.compile(r"\s+(?:and|&|or|y|o)\s+|\s*\+\s*")
+_WORD = re.compile(r"[a-z][a-z'-]*|\d+(?:[.,/-]\d+)*|[½¼¾⅓⅔⅛]")
+
+_IRREGULAR_PLURALS = {"leaves": "leaf", "loaves": "loaf", "halves": "half", "knives": "knife"}
+# Words that end like plurals but are not
+_INVARIANT = frozenset("molasses hummus couscous asparagus swiss grits citrus octopus".split())
+
+
+def singularize(word: str) -> str:
+    """English plural to singular for ingredient nouns ("tomatoes" -> "tomato", "berries" -> "berry")"""
+    if word in _IRREGULAR_PLURALS:
+        return _IRREGULAR_PLURALS[word]
+    if len(word) <= 3 or word in _INVARIANT:
+        return word
+    if word.endswith("ies"):
+        return word[:-3] + "y"
+    if word.endswith(("oes", "shes", "ches", "xes", "zes", "sses")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def normalize_ingredient(text: str) -> Optional[str]:
+    """
+    Reduce one ingredient mention to its dictionary name: folded to ASCII
+    lowercase, quantities, units and descriptors dropped, last word made
+    singular. "2 cups Crushed Tomatoes" and "tomato" both give "tomato";
+    "brown sugar" stays "brown sugar".
+
+    Returns:
+        The name, or None if nothing is left (e.g. "2 cups")
+    """
+    text = _TRAILING.sub(" ", _PARENTHETICAL.sub(" ", fold(text)))
+    words = [word.strip("'-") for word in _WORD.findall(text)]
+    words = [word for word in words
+             if word and not _QUANTITY.match(word) and word not in _UNITS and word not in _DESCRIPTORS]
+    # "of" after a unit ("a pinch of salt"), articles
+    while words and words[0] in ("of", "a", "an", "the", "de"):
+        words.pop(0)
+    if not words:
+        return None
+    words[-1] = singularize(words[-1])
+    name = " ".join(words)[:MAX_INGREDIENT_LENGTH].strip()
+    return name if len(name) > 1 else None
+
+
+def parse_ingredients(text: Optional[str]) -> List[str]:
+    """
+    Extract ingredient names from a recipe's ingredients text, in order and
+    without duplicates.
+
+    One ingredient per line; a single-line list is split on commas. Anything
+    after the first comma of a line ("1 onion, diced") is preparation, and
+    "salt and pepper to taste" names two ingredients.
+    """
+    if not text:
+        return []
+    lines = [line for line in re.split(r"[\r\n;]+", text) if line.strip()]
+    if len(lines) == 1:
+        items = lines[0].split(",")
+    else:
+        items = [line.split(",")[0] for line in lines]
+    names = {}
+    for item in items:
+        # Bullets and list numbering ("- ", "* ", "1) ")
+        item = re.sub(r"^\s*(?:[-*•]+|\d+[.)])\s+", "", item)
+        for part in _CONJUNCTION.split(item):
+            name = normalize_ingredient(part)
+            if name:
+                names[name] = None
+    return list(names)
+
+
+def _query_names(args) -> List[str]:
+    names = {}
+    for value in args.getlist('ingredients'):
+        for part in value.split(','):
+            name = normalize_ingredient(part)
+            if name:
+                names[name] = None
+    if not names:
+        raise ValueError("ingredients must name at least one ingredient")
+    return list(names)
+
+
+def parse_ingredient_query(args) -> Tuple[List[str], bool]:
+    """
+    Read ?ingredients=chickpeas,tomato (or repeated ?ingredients=) and
+    ?match=all|any. Names are normalized like recipe ingredients, so
+    "Chickpeas" finds recipes listing "1 can chickpeas, drained".
+
+    Returns:
+        Tuple of (distinct names, True to require every one)
+
+    Raises:
+        ValueError: If no ingredient is named, too many are, or match is
+            not "all" or "any"
+    """
+    match = args.get('match', 'all')
+    if match not in MATCH_MODES:
+        raise ValueError("match must be 'all' or 'any'")
+    names = _query_names(args)
+    if len(names) > INGREDIENT_QUERY_MAX:
+        raise ValueError(f"At most {INGREDIENT_QUERY_MAX} ingredients per query, got {len(names)}")
+    return names, match == "all"
+
+
+def parse_pantry_query(args) -> Tuple[List[str], int]:
+    """
+    Read a pantry from ?ingredients= (as for parse_ingredient_query) and
+    ?max_missing=, the most ingredients a recipe may need beyond it.
+
+    Returns:
+        Tuple of (distinct names, max_missing)
+
+    Raises:
+        ValueError: If no ingredient is named, too many are, or max_missing
+            is not an integer from 0 to PANTRY_MAX_MISSING
+    """
+    names = _query_names(args)
+    if len(names) > PANTRY_MAX_INGREDIENTS:
+        raise ValueError(f"At most {PANTRY_MAX_INGREDIENTS} pantry ingredients, got {len(names)}")
+    raw = args.get('max_missing')
+    try:
+        max_missing = PANTRY_DEFAULT_MISSING if raw is None else int(raw)
+    except ValueError:
+        raise ValueError("max_missing must be an integer")
+    if not 0 <= max_missing <= PANTRY_MAX_MISSING:
+        raise ValueError(f"max_missing must be between 0 and {PANTRY_MAX_MISSING}")
+    return names, max_missing
@@ -1,14 +1,120 @@
 import jwt
 import os
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional, Dict
 from functools import wraps
 from flask import request, jsonify
+from utils.metrics import TimingStats
 
 # Get secret key from environment variable, with a fallback for development
 JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-secret-key-change-in-production')
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = 24
+TOKEN_CACHE_MAX_ENTRIES = int(os.getenv('TOKEN_CACHE_MAX_ENTRIES', '4096'))
+
+
+def _digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of already verified token payloads, keyed by a SHA-256 digest
+    of the token so raw tokens are never kept in memory.
+
+    Every entry expires at its token's own exp claim, so a cached payload is
+    never served after jwt.decode would have rejected the token. Revoked
+    tokens are evicted and remembered until they expire.
+    """
+
+    def __init__(self, max_entries: int = TOKEN_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.decode_time = TimingStats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, digest: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                self.misses += 1
+                return None
+            payload, expires_at = entry
+            if expires_at <= time.time():
+                del self._entries[digest]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(digest)
+            self.hits += 1
+            return payload
+
+    def put(self, digest: str, payload: Dict):
+        expires_at = payload.get('exp')
+        if expires_at is None:
+            return
+        with self._lock:
+            self._entries[digest] = (payload, float(expires_at))
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def observe_decode(self, milliseconds: float):
+        with self._lock:
+            self.decode_time.observe(milliseconds)
+
+    def revoke(self, token: str):
+        """Reject this token from now on, even though its signature stays valid"""
+        digest = _digest(token)
+        with self._lock:
+            entry = self._entries.pop(digest, None)
+            now = time.time()
+            self._revoked = {key: exp for key, exp in self._revoked.items() if exp > now}
+            self._revoked[digest] = entry[1] if entry else now + JWT_EXPIRATION_HOURS * 3600
+
+    def is_revoked(self, digest: str) -> bool:
+        return digest in self._revoked
+
+    def evict_user(self, user_id: int):
+        """Drop a user's cached payloads so their next request is verified again"""
+        with self._lock:
+            for digest in [key for key, (payload, _) in self._entries.items() if payload.get('user_id') == user_id]:
+                del self._entries[digest]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._revoked.clear()
+            self.decode_time = TimingStats()
+            self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "revoked": len(self._revoked),
+                "decode": self.decode_time.snapshot(),
+            }
+
+
+token_cache = VerifiedTokenCache()
 
 
 def generate_token(user_id: int, username: str, email: str) -> str:
@@ -38,6 +144,9 @@ def generate_token(user_id: int, username: str, email: str) -> str:
 def decode_token(token: str) -> Optional[Dict]:
     """
     Decode and validate a JWT token.
+
+    A token seen before is answered from token_cache without repeating the
+    signature check; the first sight of a token pays for jwt.decode.
     
     Args:
         token: The JWT token string
@@ -45,13 +154,25 @@ def decode_token(token: str) -> Optional[Dict]:
     Returns:
         Decoded payload as a dictionary if valid, None otherwise
     """
+    digest = _digest(token)
+    if token_cache.is_revoked(digest):
+        return None
+    payload = token_cache.get(digest)
+    if payload is not None:
+        # Copy: handlers receive current_user and may modify it
+        return dict(payload)
+
+    started = time.perf_counter()
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
-        return payload
     except jwt.ExpiredSignatureError:
         return None
     except jwt.InvalidTokenError:
         return None
+    finally:
+        token_cache.observe_decode((time.perf_counter() - started) * 1000)
+    token_cache.put(digest, payload)
+    return dict(payload)
 
 
 def token_required(f):
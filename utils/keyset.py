@@ -0,0 +1,57 @@
+from operator import attrgetter
+from typing import Any, Callable, Iterator, List, Optional, Sequence
+
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+
+def walk_keyset(fetch_page: Callable[[Optional[Any]], List], batch_size: int,
+                position: Callable[[Any], Any]) -> Iterator:
+    """
+    Every row of a keyset-paged query, one short query per batch_size rows.
+
+    MySQL Connector/Python reads each result set whole into client memory
+    (SQLAlchemy's dialect opens buffered cursors and has no server-side
+    cursor support), so yield_per over one big query still holds the full
+    result in the worker. Seeking from the last row seen keeps only one
+    page in memory and gets the first rows out after one page's query.
+
+    Args:
+        fetch_page: Called as fetch_page(after): the first page with None,
+            then the page following position(last row of the previous one)
+        batch_size: The LIMIT fetch_page applies; a shorter page is the last
+        position: The keyset position of a row
+    """
+    after = None
+    while True:
+        page = fetch_page(after)
+        yield from page
+        if len(page) < batch_size:
+            return
+        after = position(page[-1])
+
+
+def after_position(keys: Sequence, values: Sequence):
+    """Predicate for rows sorting after values in ascending (keys...) order"""
+    predicate = keys[-1] > values[-1]
+    for key, value in zip(reversed(keys[:-1]), reversed(values[:-1])):
+        predicate = or_(key > value, and_(key == value, predicate))
+    return predicate
+
+
+def walk_select(db: Session, query: Select, keys: Sequence, batch_size: int) -> Iterator[Row]:
+    """
+    Rows of a column select in ascending (keys...) order through
+    walk_keyset. keys must be unique together and among the selected
+    columns; query must not be ordered or limited already.
+    """
+    query = query.order_by(*keys).limit(batch_size)
+    names = [key.key for key in keys]
+
+    def page(after: Optional[Sequence]) -> List[Row]:
+        if after is None:
+            return db.execute(query).all()
+        return db.execute(query.where(after_position(keys, after))).all()
+
+    return walk_keyset(page, batch_size, lambda row: [getattr(row, name) for name in names])
@@ -0,0 +1,59 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, Tuple
+
+# Upper bounds (milliseconds) of the latency histogram buckets; the last
+# bucket catches everything slower.
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+
+class TimingStats:
+    """Count, total, max and a fixed-bucket histogram of one timed operation"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, milliseconds: float):
+        self.count += 1
+        self.total_ms += milliseconds
+        self.max_ms = max(self.max_ms, milliseconds)
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, milliseconds)] += 1
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={bound}ms" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+            "histogram": dict(zip(labels, self.buckets)),
+        }
+
+
+class TimingRegistry:
+    """Thread-safe TimingStats keyed by (group, metric), e.g. (route, "hold")"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], TimingStats] = {}
+
+    def observe(self, group: str, metric: str, milliseconds: float):
+        with self._lock:
+            stats = self._stats.get((group, metric))
+            if stats is None:
+                stats = self._stats[(group, metric)] = TimingStats()
+            stats.observe(milliseconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Dict]]:
+        with self._lock:
+            result: Dict[str, Dict[str, Dict]] = {}
+            for (group, metric), stats in sorted(self._stats.items()):
+                result.setdefault(group, {})[metric] = stats.snapshot()
+            return result
+
+    def clear(self):
+        with self._lock:
+            self._stats.clear()
@@ -0,0 +1,58 @@
+import os
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+# Most ids one multi-get request may ask for; keeps the IN (...) list and the
+# response bounded.
+MULTI_GET_MAX_IDS = int(os.getenv('MULTI_GET_MAX_IDS', '100'))
+
+
+def wants_ids(args) -> bool:
+    """Return True when the request is a multi-get (?ids=...)"""
+    return 'ids' in args
+
+
+def parse_ids(args) -> List[int]:
+    """
+    Read the requested ids from ?ids=3,1,2 (or repeated ?ids=3&ids=1).
+    Order is kept and duplicates are dropped.
+
+    Raises:
+        ValueError: If an id is not a positive integer, none is given, or
+            more than MULTI_GET_MAX_IDS are asked for
+    """
+    ids = {}
+    for value in args.getlist('ids'):
+        for part in value.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            try:
+                item_id = int(part)
+            except ValueError:
+                raise ValueError(f"ids must be integers, got '{part}'")
+            if item_id < 1:
+                raise ValueError(f"ids must be positive, got {item_id}")
+            ids[item_id] = None
+    if not ids:
+        raise ValueError("ids must list at least one id")
+    if len(ids) > MULTI_GET_MAX_IDS:
+        raise ValueError(f"At most {MULTI_GET_MAX_IDS} ids per request, got {len(ids)}")
+    return list(ids)
+
+
+def in_requested_order(ids: Sequence[int], rows: Sequence,
+                       key: Callable[[Any], int] = lambda row: row.id) -> Tuple[List, List[int]]:
+    """
+    Arrange rows fetched with WHERE id IN (...) in the requested order.
+
+    Returns:
+        Tuple of (rows in request order, requested ids that were not found)
+    """
+    by_id = {key(row): row for row in rows}
+    return [by_id[item_id] for item_id in ids if item_id in by_id], \
+        [item_id for item_id in ids if item_id not in by_id]
+
+
+def ids_envelope(items: List[Any], missing: List[int]) -> Dict[str, Any]:
+    """Response body of a multi-get"""
+    return {"items": items, "missing": missing}
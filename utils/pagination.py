@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+import os
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Page size used when the client asks for a page without a limit, and the hard
+# cap applied to any limit the client sends.
+DEFAULT_PAGE_SIZE = int(os.getenv('PAGE_SIZE_DEFAULT', '20'))
+MAX_PAGE_SIZE = int(os.getenv('PAGE_SIZE_MAX', '100'))
+
+PAGE_ARGS = ('cursor', 'limit')
+
+
+def encode_cursor(position: Dict[str, Any]) -> str:
+    """
+    Encode a keyset position as an opaque, URL-safe cursor string.
+
+    Args:
+        position: The sort-key values of the last row of a page
+
+    Returns:
+        Cursor string to hand back to the client as next_cursor
+    """
+    raw = json.dumps(position, separators=(',', ':'), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, *keys: str) -> Dict[str, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: The cursor string sent by the client
+        keys: Keys the position must contain
+
+    Returns:
+        The keyset position as a dictionary
+
+    Raises:
+        ValueError: If the cursor is malformed or lacks one of the keys
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        position = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(position, dict) or any(key not in position for key in keys):
+        raise ValueError("Invalid cursor")
+    return position
+
+
+def wants_page(args) -> bool:
+    """Return True when the request asks for the paginated envelope"""
+    return any(name in args for name in PAGE_ARGS)
+
+
+def parse_limit(args) -> int:
+    """
+    Read the page size from the query string, clamped to MAX_PAGE_SIZE.
+
+    Raises:
+        ValueError: If limit is not a positive integer
+    """
+    raw = args.get('limit')
+    if raw is None or raw == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        limit = int(raw)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be greater than 0")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def parse_cursor(args, *keys: str) -> Tuple[Optional[Dict[str, Any]], int]:
+    """
+    Read a keyset cursor over the given sort keys and the page size.
+
+    Returns:
+        Tuple of (position or None for the first page, page size)
+    """
+    limit = parse_limit(args)
+    cursor = args.get('cursor')
+    if not cursor:
+        return None, limit
+    return decode_cursor(cursor, *keys), limit
+
+
+def parse_id_cursor(args) -> Tuple[Optional[int], int]:
+    """
+    Read an (id) keyset cursor and page size from the query string.
+
+    Returns:
+        Tuple of (last id seen or None for the first page, page size)
+    """
+    position, limit = parse_cursor(args, 'id')
+    if position is None:
+        return None, limit
+    if not isinstance(position['id'], int):
+        raise ValueError("Invalid cursor")
+    return position['id'], limit
+
+
+def split_page(rows: Sequence, limit: int, position) -> Tuple[List, Optional[str]]:
+    """
+    Trim a "limit + 1" result down to one page and build the next cursor.
+
+    Args:
+        rows: Rows fetched with limit + 1
+        limit: The page size
+        position: Callable returning the keyset position of a row
+
+    Returns:
+        Tuple of (rows of this page, next cursor or None on the last page)
+    """
+    page = list(rows[:limit])
+    if len(rows) > limit and page:
+        return page, encode_cursor(position(page[-1]))
+    return page, None
+
+
+def page_envelope(items: List[dict], next_cursor: Optional[str]) -> dict:
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,148 @@
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple
+
+from utils.metrics import TimingStats
+
+# scrypt cost. Memory per hash is 128 * N * r bytes (16 MiB at the defaults),
+# and doubling N doubles both time and memory. Stored hashes carry their own
+# parameters, so raising these upgrades users as they next log in.
+PASSWORD_SCRYPT_N = int(os.getenv('PASSWORD_SCRYPT_N', str(2 ** 14)))
+PASSWORD_SCRYPT_R = int(os.getenv('PASSWORD_SCRYPT_R', '8'))
+PASSWORD_SCRYPT_P = int(os.getenv('PASSWORD_SCRYPT_P', '1'))
+PASSWORD_SALT_BYTES = 16
+PASSWORD_KEY_BYTES = 64
+
+# hashlib.scrypt releases the GIL, so a small thread pool hashes in parallel
+# while request threads wait. At most WORKERS + QUEUE_LIMIT hashes are
+# admitted at once; beyond that callers are turned away immediately instead
+# of queueing behind a login storm. That caps login latency at roughly
+# (1 + QUEUE_LIMIT / WORKERS) KDF runs, whatever the offered load.
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_QUEUE_LIMIT = int(os.getenv('PASSWORD_HASH_QUEUE_LIMIT', str(4 * PASSWORD_HASH_WORKERS)))
+
+_SCHEME = "scrypt"
+
+
+class PasswordHasherBusy(RuntimeError):
+    """The hashing pool and its queue are full; the caller should retry later"""
+
+
+class PasswordHasher:
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, queue_limit: int = PASSWORD_HASH_QUEUE_LIMIT):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-kdf")
+        self._slots = threading.BoundedSemaphore(workers + queue_limit)
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.in_flight = 0
+        self.rejected = 0
+        self.kdf_time = TimingStats()
+        self.wait_time = TimingStats()
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise PasswordHasherBusy("Too many password operations in progress, retry shortly")
+        with self._lock:
+            self.in_flight += 1
+        submitted = time.perf_counter()
+        try:
+            return self._executor.submit(self._timed, fn, submitted, *args).result()
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def _timed(self, fn, submitted, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                self.wait_time.observe((started - submitted) * 1000)
+                self.kdf_time.observe((finished - started) * 1000)
+
+    def hash(self, password: str) -> str:
+        """Salted scrypt hash in the self-describing form scrypt$N$r$p$salt$key"""
+        return self._run(_scrypt_hash, password, PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+
+    def verify(self, password: str, stored: str) -> Tuple[bool, bool]:
+        """
+        Check a password against a stored hash.
+
+        Returns:
+            (matches, needs_rehash): needs_rehash is True when the stored hash
+            is a legacy unsalted SHA-256 or uses other scrypt parameters
+        """
+        return self._run(_verify, password, stored)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "in_flight": self.in_flight,
+                "rejected": self.rejected,
+                "cost": {"n": PASSWORD_SCRYPT_N, "r": PASSWORD_SCRYPT_R, "p": PASSWORD_SCRYPT_P},
+                "kdf": self.kdf_time.snapshot(),
+                "queue_wait": self.wait_time.snapshot(),
+            }
+
+
+def _b64(raw: bytes) -> str:
+    return base64.b64encode(raw).decode().rstrip("=")
+
+
+def _unb64(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _derive(password: str, salt: bytes, n: int, r: int, p: int, dklen: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=2 * 128 * n * r * p + 1024 * 1024, dklen=dklen)
+
+
+def _scrypt_hash(password: str, n: int, r: int, p: int) -> str:
+    salt = secrets.token_bytes(PASSWORD_SALT_BYTES)
+    key = _derive(password, salt, n, r, p, PASSWORD_KEY_BYTES)
+    return f"{_SCHEME}${n}${r}${p}${_b64(salt)}${_b64(key)}"
+
+
+def _verify(password: str, stored: str) -> Tuple[bool, bool]:
+    if stored.startswith(_SCHEME + "$"):
+        try:
+            _, n, r, p, salt, key = stored.split("$")
+            n, r, p = int(n), int(r), int(p)
+            expected = _unb64(key)
+            derived = _derive(password, _unb64(salt), n, r, p, len(expected))
+        except ValueError:
+            return False, False
+        matches = hmac.compare_digest(derived, expected)
+        return matches, (n, r, p) != (PASSWORD_SCRYPT_N, PASSWORD_SCRYPT_R, PASSWORD_SCRYPT_P)
+    # Legacy: unsalted SHA-256 hex digest from before scrypt
+    legacy = hashlib.sha256(password.encode()).hexdigest()
+    return hmac.compare_digest(legacy, stored), True
+
+
+password_hasher = PasswordHasher()
+
+# Verified against when the email is unknown, so a miss costs as much as a
+# wrong password and response times do not reveal which accounts exist. Only
+# verifying runs the KDF, so a random key in the current format costs the same
+# as a real hash and is made at import without touching the hashing pool.
+_DUMMY_HASH = (f"{_SCHEME}${PASSWORD_SCRYPT_N}${PASSWORD_SCRYPT_R}${PASSWORD_SCRYPT_P}$"
+               f"{_b64(secrets.token_bytes(PASSWORD_SALT_BYTES))}${_b64(secrets.token_bytes(PASSWORD_KEY_BYTES))}")
+
+
+def dummy_hash() -> str:
+    return _DUMMY_HASH
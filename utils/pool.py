@@ -0,0 +1,114 @@
+import threading
+import time
+from typing import Dict
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool
+
+from utils.metrics import TimingStats
+
+
+class PoolStats:
+    """Counters shared by a pool and the pools it is recreated into"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkout = TimingStats()
+        self.waiting = 0
+        self.timeouts = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every checkout (queue wait, connect and ping
+    included) and tracks how many threads are waiting for a connection.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def connect(self):
+        stats = self.stats
+        with stats.lock:
+            stats.waiting += 1
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            with stats.lock:
+                stats.timeouts += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with stats.lock:
+                stats.waiting -= 1
+                stats.checkout.observe(elapsed_ms)
+
+    def recreate(self):
+        # Called on dispose() and after a disconnect wave; keep the counters
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def install_idle_ping(engine, idle_seconds: float):
+    """
+    Ping a pooled connection on checkout only if it sat idle in the pool for
+    longer than idle_seconds.
+
+    A connection returned milliseconds ago is almost certainly alive, so
+    unlike pool_pre_ping this skips the extra round trip on the hot path. A
+    failed ping raises DisconnectionError, which makes the pool discard the
+    connection and retry with a fresh one.
+    """
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at <= idle_seconds:
+            return
+        stats = getattr(engine.pool, "stats", None)
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception as e:
+            if stats is not None:
+                with stats.lock:
+                    stats.ping_failures += 1
+            raise exc.DisconnectionError(f"Idle connection failed liveness ping: {e}") from e
+        finally:
+            if stats is not None:
+                with stats.lock:
+                    stats.pings += 1
+
+
+def pool_status(engine) -> Dict:
+    """Live state of an engine's pool: sizes, waiters, timeouts and checkout latency"""
+    pool = engine.pool
+    status = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # Negative while the pool has not yet opened pool_size connections
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        with stats.lock:
+            status.update({
+                "waiting": stats.waiting,
+                "timeouts": stats.timeouts,
+                "pings": stats.pings,
+                "ping_failures": stats.ping_failures,
+                "checkout": stats.checkout.snapshot(),
+            })
+    return status
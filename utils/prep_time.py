@@ -0,0 +1,90 @@
+import re
+from typing import Optional
+
+# Minutes per unit; the longest spellings come first so "hours" is not read as "h"
+_UNITS = {
+    "days": 1440, "day": 1440, "d": 1440,
+    "hours": 60, "hour": 60, "hrs": 60, "hr": 60, "h": 60,
+    "minutes": 1, "minute": 1, "mins": 1, "min": 1, "m": 1,
+}
+_VULGAR = {"½": 0.5, "¼": 0.25, "¾": 0.75}
+
+# Longer times are treated as unreadable: they are typos or junk, and would
+# overflow the INT column
+MAX_PREPARATION_MINUTES = 10 * 1440
+
+_QUANTITY = r"\d+\s+\d+\s*/\s*\d+|\d+\s*/\s*\d+|\d+(?:[.,]\d+)?\s*[½¼¾]?|[½¼¾]|half\s+an?|an?"
+_PART = re.compile(rf"(?<![a-z0-9.,/])({_QUANTITY})\s*({'|'.join(_UNITS)})(?![a-z])")
+_CLOCK = re.compile(r"^(\d+):([0-5]\d)$")
+_NUMBER = re.compile(r"^\d+(?:[.,]\d+)?$")
+_RANGE = re.compile(r"\s*[-–]\s*|\s+(?:to|or)\s+")
+_APPROXIMATE = re.compile(r"\b(?:about|around|approximately|approx\.?)\s*")
+
+
+def _quantity(text: str) -> Optional[float]:
+    text = text.strip()
+    if text.startswith("half"):
+        return 0.5
+    if text in ("a", "an"):
+        return 1.0
+    if "/" in text:
+        parts = re.sub(r"\s*/\s*", "/", text).split()
+        numerator, denominator = (int(part) for part in parts[-1].split("/"))
+        if not denominator:
+            return None
+        whole = int(parts[0]) if len(parts) == 2 else 0
+        return whole + numerator / denominator
+    vulgar = _VULGAR.get(text[-1], 0.0)
+    number = text.rstrip("½¼¾").strip().replace(",", ".")
+    return (float(number) if number else 0.0) + vulgar
+
+
+def _single_duration(text: str) -> Optional[float]:
+    """Minutes in one duration such as "1 hour 30 min", "1h30", "1:30" or "45"; None if unreadable"""
+    text = text.strip(" .~+")
+    clock = _CLOCK.match(text)
+    if clock:
+        return int(clock.group(1)) * 60 + int(clock.group(2))
+    if _NUMBER.match(text):
+        return float(text.replace(",", "."))
+    minutes = 0.0
+    end = None
+    unit = None
+    for match in _PART.finditer(text):
+        unit = _UNITS[match.group(2)]
+        quantity = _quantity(match.group(1))
+        if quantity is None:
+            return None
+        minutes += quantity * unit
+        end = match.end()
+    if end is None:
+        return None
+    # "1h30" and "1 hour 30": a bare number after hours counts as minutes
+    rest = text[end:].strip(" .")
+    if unit == 60 and rest.isdigit():
+        minutes += int(rest)
+    return minutes
+
+
+def parse_minutes(text: Optional[str]) -> Optional[int]:
+    """
+    Normalize a free-text preparation time into whole minutes.
+
+    Understands units ("30 minutes", "1 hr 15 mins", "1h30", "2 days"),
+    fractions ("1 1/2 hours", "½ hour", "half an hour"), clock notation
+    ("1:30") and bare numbers, which are read as minutes. A range such as
+    "20-30 minutes" or "1 to 2 hours" gives its upper bound, so filtering
+    on a maximum never returns a recipe that may take longer.
+
+    Returns:
+        The minutes, or None when the text has no recognizable duration
+        (e.g. "overnight") or one over MAX_PREPARATION_MINUTES
+    """
+    if not text:
+        return None
+    text = _APPROXIMATE.sub("", text.lower()).strip()
+    durations = [_single_duration(part) for part in _RANGE.split(text) if part.strip()]
+    durations = [duration for duration in durations if duration is not None]
+    if not durations or max(durations) > MAX_PREPARATION_MINUTES:
+        return None
+    return int(round(max(durations)))
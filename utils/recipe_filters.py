@@ -0,0 +1,43 @@
+from typing import Any, Dict
+
+from repositories.recipe_repository import RECIPE_FILTERS
+
+_TEXT_FILTERS = ("dish_type", "origin")
+
+
+def wants_filters(args) -> bool:
+    """Return True when the request filters the recipe collection"""
+    return any(name in args for name in RECIPE_FILTERS)
+
+
+def parse_recipe_filters(args) -> Dict[str, Any]:
+    """
+    Read the GET /recipes filters from the query string: dish_type and origin
+    match exactly; author is a user id; min_servings, max_servings and
+    max_minutes are inclusive bounds.
+
+    Raises:
+        ValueError: If a numeric filter is not a non-negative integer, a text
+            filter is empty, or min_servings exceeds max_servings
+    """
+    filters = {}
+    for name in RECIPE_FILTERS:
+        raw = args.get(name)
+        if raw is None:
+            continue
+        raw = raw.strip()
+        if name in _TEXT_FILTERS:
+            if not raw:
+                raise ValueError(f"{name} cannot be empty")
+            filters[name] = raw
+            continue
+        try:
+            value = int(raw)
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+        if value < 0:
+            raise ValueError(f"{name} cannot be negative")
+        filters[name] = value
+    if filters.get("min_servings", 0) > filters.get("max_servings", float("inf")):
+        raise ValueError("min_servings cannot be greater than max_servings")
+    return filters
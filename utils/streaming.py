@@ -0,0 +1,83 @@
+import os
+from typing import Callable, Iterator, Optional
+
+from flask import Response, current_app, stream_with_context
+
+from utils.db_session import get_db
+
+# Rows read per keyset query, and bytes buffered before a chunk is flushed
+# to the client.
+STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '500'))
+STREAM_CHUNK_BYTES = int(os.getenv('STREAM_CHUNK_BYTES', str(64 * 1024)))
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+def stream_format(req) -> Optional[str]:
+    """
+    Streaming mode requested by the client, if any.
+
+    ?stream=json (or a bare ?stream) streams a JSON array, ?stream=ndjson
+    streams one JSON document per line; an Accept header preferring
+    application/x-ndjson also selects NDJSON.
+
+    Raises:
+        ValueError: If the stream parameter has an unknown value
+    """
+    requested = req.args.get('stream')
+    if requested is None:
+        preferred = req.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE])
+        return "ndjson" if preferred == NDJSON_MIMETYPE else None
+    if requested in ("", "1", "true", "json"):
+        return "json"
+    if requested == "ndjson":
+        return "ndjson"
+    raise ValueError("stream must be 'json' or 'ndjson'")
+
+
+def _encode(items: Iterator, fmt: str) -> Iterator[str]:
+    dumps = current_app.json.dumps
+    if fmt == "ndjson":
+        for item in items:
+            yield dumps(item.model_dump()) + "\n"
+        return
+    yield "["
+    separator = ""
+    for item in items:
+        yield separator + dumps(item.model_dump())
+        separator = ","
+    yield "]"
+
+
+def stream_collection(produce: Callable, fmt: str, *args) -> Response:
+    """
+    Stream a collection as a JSON array or NDJSON without materializing it.
+
+    The generator keeps using the request session: stream_with_context holds
+    the request open, and the session is only closed in teardown once the
+    body has been sent. Rows are read in keyset pages of STREAM_BATCH_SIZE,
+    each its own query (see utils.keyset.walk_keyset), and encoded one at a
+    time, so memory stays flat regardless of the result size.
+
+    Args:
+        produce: Called as produce(db, batch_size, *args); yields Pydantic models
+        fmt: "json" or "ndjson", see stream_format()
+    """
+    def generate():
+        buffered = []
+        size = 0
+        flushed = False
+        for piece in _encode(produce(get_db(), STREAM_BATCH_SIZE, *args), fmt):
+            buffered.append(piece)
+            size += len(piece)
+            # The first rows go out right away for a fast first byte
+            if size >= STREAM_CHUNK_BYTES or not flushed:
+                yield "".join(buffered)
+                buffered = []
+                size = 0
+                flushed = piece != "["
+        if buffered:
+            yield "".join(buffered)
+
+    mimetype = NDJSON_MIMETYPE if fmt == "ndjson" else "application/json"
+    return Response(stream_with_context(generate()), mimetype=mimetype)
@@ -0,0 +1,80 @@
+import re
+import unicodedata
+from typing import Iterator, List, Tuple
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# English and Spanish function words; recipes on the site are written in both.
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in into is it its of on or that the
+their then there these this to was were will with your you
+al con de del el en la las los o para por que se sin su un una unos unas y
+""".split())
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase text and strip accents, so "Crème Brûlée" folds to "creme brulee".
+
+    Args:
+        text: Any unicode text
+
+    Returns:
+        ASCII-only lowercase text
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(word: str) -> str:
+    """
+    Light suffix-stripping stemmer for recipe text.
+
+    It is deliberately conservative: it conflates plurals and the common verb
+    forms used in instructions ("bake", "baked", "baking" -> "bak"; "berry",
+    "berries" -> "berri") without the aggressive rewrites of a full Porter
+    stemmer. Stems are index keys, not words meant to be displayed.
+    """
+    if len(word) <= 3 or word.isdigit():
+        return word
+    if word.endswith("ies"):
+        word = word[:-2]
+    elif word.endswith(("sses", "shes", "ches", "xes", "zes", "oes")):
+        word = word[:-2]
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+    for suffix in ("ing", "ed"):
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            word = word[:-len(suffix)]
+            # "chopp" -> "chop", "stirr" -> "stir"
+            if len(word) > 3 and word[-1] == word[-2] and word[-1] not in "lsz":
+                word = word[:-1]
+            break
+    if len(word) > 3 and word.endswith("y"):
+        word = word[:-1] + "i"
+    elif len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into folded, stemmed tokens with stopwords removed"""
+    return [stem(word) for word in _WORD_RE.findall(fold(text)) if word not in STOPWORDS]
+
+
+def tokenize_with_offsets(text: str) -> Iterator[Tuple[str, int, int]]:
+    """
+    Tokenize text and keep each token's position in the original string.
+
+    Folding never changes the length of the characters we keep, except for
+    decomposed accents, so offsets are computed on a per-character fold.
+
+    Yields:
+        Tuples of (stemmed token, start offset, end offset)
+    """
+    folded = "".join(fold(ch)[:1] or " " for ch in text)
+    for match in _WORD_RE.finditer(folded):
+        word = match.group()
+        if word in STOPWORDS:
+            continue
+        yield stem(word), match.start(), match.end()